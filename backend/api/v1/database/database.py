@@ -1,10 +1,11 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from logger import create_logger
+from ..utils.request_logging import install_db_timing
 
 logger = create_logger(__name__)
 
@@ -49,6 +50,7 @@ try:
             "autocommit": True
         }
     )
+    install_db_timing(engine)
     logger.info("Database engine created successfully")
 except Exception as e:
     logger.error(f"Failed to create engine: {str(e)}")
@@ -74,6 +76,17 @@ def get_db():
     finally:
         db.close()
 
+def begin_transaction(db) -> None:
+    """
+    Start an explicit transaction on the session's connection.
+
+    Connections are opened with driver-level autocommit, so writes that must
+    land together (bulk inserts) open one explicitly; db.commit() and
+    db.rollback() end it as usual.
+    """
+    if db.get_bind().dialect.name == "mysql":
+        db.execute(text("START TRANSACTION"))
+
 def test_connection() -> bool:
     """Ping database to confirm connection"""
     try:
@@ -118,4 +131,32 @@ def create_tables():
         return True
     except Exception as e:
         logger.error(f"Failed to create tables: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+def apply_index_migrations(bind=None) -> list:
+    """
+    Create indexes declared on the models that are missing from existing tables.
+
+    create_all() only emits CREATE INDEX for tables it creates itself, so indexes
+    added to a model after its table exists are applied here. Safe to run on
+    every startup; returns the names of the indexes that were created.
+    """
+    bind = bind if bind is not None else engine
+    created = []
+    try:
+        inspector = inspect(bind)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in present:
+                    continue
+                logger.info(f"Creating missing index {index.name} on {table.name}")
+                index.create(bind=bind)
+                created.append(index.name)
+        return created
+    except Exception as e:
+        logger.error(f"Failed to apply index migrations: {str(e)}")
+        raise
@@ -8,9 +8,10 @@ from sqlalchemy import (
     ForeignKey,
     Boolean,
     DateTime,
+    Index,
     UniqueConstraint
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from ..database.database import Base
 from enum import Enum
 from pydantic import BaseModel
@@ -64,6 +65,8 @@ class UserSession(Base):
     created_at = Column(DateTime, nullable=False)
     expires_at = Column(DateTime, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+
+    __table_args__ = (Index('ix_user_sessions_client_active', 'client_id', 'is_active'),)
     
     # Relationship with Client model
     client = relationship("Client", back_populates="sessions")
@@ -111,7 +114,8 @@ class Brand(Base):
     gstin = Column(String(15), unique=True, nullable=False)
     legal_name_of_business = Column(String(255), nullable=False)
     date_of_registration = Column(Date, nullable=False)
-    gstdoc = Column(JSON, nullable=False)
+    # Loaded only when asked for; large documents hold a reference into the GST blob store
+    gstdoc = deferred(Column(JSON, nullable=False))
     created_at = Column(DateTime, default=lambda: datetime.now(IST))
     updated_at = Column(DateTime, onupdate=lambda: datetime.now(IST))
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
@@ -162,7 +166,10 @@ class Outlet(Base):
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
     brand_id = Column(Integer, ForeignKey("brands.id"), nullable=False)
 
-    __table_args__ = (UniqueConstraint('aggregator', 'resid', name='uq_aggregator_resid'),)
+    __table_args__ = (
+        UniqueConstraint('aggregator', 'resid', name='uq_aggregator_resid'),
+        Index('ix_outlets_client_active', 'client_id', 'is_active'),
+    )
 
     # Relationships
     client = relationship("Client", back_populates="outlets")
@@ -187,7 +194,9 @@ class User(Base):
     updated_at = Column(DateTime, onupdate=datetime.now(IST))
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
 
-    __table_args__ = (UniqueConstraint('usernumber', 'useremail', name='uq_number_email'),)
+    __table_args__ = (
+        UniqueConstraint('usernumber', 'useremail', name='uq_number_email'),
+    )
 
     # Relationships
     client = relationship("Client", back_populates="users")
@@ -225,7 +234,10 @@ class OutletService(Base):
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False) 
     created_at = Column(DateTime, default=datetime.now(IST))
 
-    __table_args__ = (UniqueConstraint('outlet_id', 'service_id', name='uq_outlet_service'),)
+    __table_args__ = (
+        UniqueConstraint('outlet_id', 'service_id', name='uq_outlet_service'),
+        Index('ix_outlet_services_client_outlet', 'client_id', 'outlet_id'),
+    )
 
     # Relationships
     client = relationship("Client", back_populates="outlet_services")
@@ -246,7 +258,10 @@ class UserService(Base):
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False) 
     created_at = Column(DateTime, default=datetime.now(IST))
 
-    __table_args__ = (UniqueConstraint('user_id', 'service_id', name='uq_user_service'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'service_id', name='uq_user_service'),
+        Index('ix_user_services_client_user', 'client_id', 'user_id'),
+    )
 
     # Relationships
     client = relationship("Client", back_populates="user_services")
@@ -267,7 +282,10 @@ class UserOutlet(Base):
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False) 
     created_at = Column(DateTime, default=datetime.now(IST))
 
-    __table_args__ = (UniqueConstraint('user_id', 'outlet_id', name='uq_user_outlet'),)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'outlet_id', name='uq_user_outlet'),
+        Index('ix_user_outlets_client_user', 'client_id', 'user_id'),
+    )
 
     # Relationships
     client = relationship("Client", back_populates="user_outlets")
@@ -1,20 +1,117 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import distinct, select
+from sqlalchemy.orm import Session, joinedload
 
-from .admin import verify_request
+from .admin import export_filename, export_tenant, verify_request
 from .auth import get_current_session
-from ..database.database import get_db
+from ..database.database import begin_transaction, get_db
 from ..schemas import schemas
 from ..database import models
+from ..utils.pagination import paginate, set_next_cursor
+from ..utils.catalogue import CATALOGUE
+from ..utils.etag import check_not_modified, list_tenant
+from ..utils.serialization import json_response
+from ..utils.table_query import SparseFields, count_rows, parse_fields, pick_fields, search_clause
+from ..utils.export import export_response
+from ..utils.ownership import OWNED_KINDS, OWNERSHIP_CACHE, verify_ownership
+from ..utils.mapping_bulk import (
+    OUTLET_REFS, SERVICE_REFS, USER_REFS, insert_mappings, owner_of, reconcile_mappings, resolve_pairs
+)
 from logger import create_logger
 
 # Initialize logger
 logger = create_logger(__name__)
 
 router = APIRouter() 
-INTERNAL_CLIENT_IDS = {1,2,3,4,5,6}
+
+# ?fields= sparse fieldsets. The flat outlet-service view projects them in the
+# page query; the dict-shaped views keep just the requested keys.
+OUTLET_SERVICE_FIELDS = SparseFields(schemas.DisplayOutletService, models.OutletService, {
+    "outlet": models.OutletService.outlet,
+    "service": models.OutletService.service,
+    "client": models.OutletService.client,
+}, full=schemas.OUTLET_SERVICE_LIST)
+GROUPED_OUTLET_SERVICE_KEYS = ("mapping_id", "aggregator", "resid", "subzone", "resshortcode", "city", "is_active",
+                               "servicename", "servicevariant")
+GROUPED_USER_SERVICE_KEYS = ("mapping_id", "username", "usernumber", "useremail", "service", "service_variant",
+                             "service_id", "created_at", "user_id", "client_id")
+USER_SERVICE_KEYS = ("id", "user_id", "service_id", "client_id", "created_at")
+USER_OUTLET_KEYS = ("email", "name", "number", "mapping_id")
+GROUPED_USER_OUTLET_KEYS = tuple(schemas.DisplayUserOutletGrouped.model_fields)
+
+
+def mapping_page(params, items, query, id_column, next_cursor):
+    """Returns ``items`` as-is, or wrapped with the total count when ``with_meta`` is requested."""
+    if not params.with_meta:
+        return items
+    return {
+        "items": items or [],
+        "total": count_rows(query, id_column),
+        "next_cursor": next_cursor
+    }
+
+def grouped_user_outlets(response: Response, params: schemas.QueryUserOutlet, query, joined: bool,
+                         selected: Optional[Sequence[str]] = None):
+    """
+    Grouped user-outlet view, paginated by outlet rather than by mapping row.
+
+    Outlets with at least one matching mapping are grouped and paged in SQL,
+    so every page holds exactly ``limit`` outlets (never split across pages);
+    the user names for just those outlets come from one more query.
+    """
+    if not joined:
+        query = query.join(models.UserOutlet.user).join(models.UserOutlet.outlet)
+    outlet_columns = [models.Outlet.id, models.Outlet.aggregator, models.Outlet.resshortcode, models.Brand.brandname]
+    outlets = query.outerjoin(models.Outlet.brand).with_entities(*outlet_columns).group_by(*outlet_columns)
+    page, next_cursor = paginate(outlets, models.Outlet.id, params.limit, params.skip, params.cursor)
+    set_next_cursor(response, next_cursor)
+    logger.info("Retrieved %s grouped outlets with skip=%s, limit=%s", len(page), params.skip, params.limit)
+
+    users = {}
+    # The user names are a second query, skipped when ?fields= leaves them out
+    if page and (not selected or "users" in selected):
+        rows = query.with_entities(models.UserOutlet.outlet_id, models.User.username).filter(
+            models.UserOutlet.outlet_id.in_([row.id for row in page])
+        ).distinct().order_by(models.User.username)
+        for outlet_id, username in rows:
+            users.setdefault(outlet_id, []).append(username)
+
+    items = [
+        schemas.DisplayUserOutletGrouped(
+            aggregator=row.aggregator,
+            brand=row.brandname,
+            res_id=row.id,
+            shortcode=row.resshortcode,
+            users=users.get(row.id, []),
+        )
+        for row in page
+    ]
+    if selected:
+        items = pick_fields(items, selected)
+    # Totals count outlets, the unit of this view
+    return mapping_page(params, items, query, distinct(models.UserOutlet.outlet_id), next_cursor)
+
+def check_mapping_client(current_session, client_id: int) -> None:
+    """Non-internal clients may only create mappings for themselves."""
+    if not current_session.is_internal and client_id != current_session.client_id:
+        logger.warning("Client %s tried to create mappings for client %s", current_session.client_id, client_id)
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Unauthorized access to create mappings")
+
+def bulk_insert_mappings(db: Session, mapping_model, left_field: str, right_field: str, pairs, client_id: int):
+    """Inserts resolved pairs in one transaction and returns the BulkMappingResult."""
+    try:
+        begin_transaction(db)
+        created, existing = insert_mappings(db, mapping_model, left_field, right_field, pairs, client_id)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Bulk %s insert failed: %s", mapping_model.__tablename__, str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create mappings")
+    OWNERSHIP_CACHE.invalidate(OWNED_KINDS[mapping_model], client_id)
+    logger.info("Bulk %s: requested=%s, created=%s, existing=%s", mapping_model.__tablename__, len(pairs), created, existing)
+    return schemas.BulkMappingResult(requested=len(pairs), created=created, existing=existing)
 
 #______________________________________ Outlet <> Service routes ______________________________________
 @router.post("/outlet-service-mappings/", response_model=List[schemas.DisplayOutletService])
@@ -23,30 +120,28 @@ async def create_outlet_service_mapping(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to map {len(mappings)} mappings by client ID: {current_session.client_id}")
+    logger.info("Received request to map %s mappings by client ID: %s", len(mappings), current_session.client_id)
 
     created_mappings = []
 
     for mapping in mappings:
-        logger.info(f"Processing Map: outlet={mapping.outlet_id}, service={mapping.service_id}")
+        logger.info("Processing Map: outlet=%s, service=%s", mapping.outlet_id, mapping.service_id)
 
         # Check if outlet exists
         existing_outlet = db.query(models.Outlet).filter(
             (models.Outlet.id == mapping.outlet_id)
         ).first()
         if not existing_outlet:
-            logger.warning(f"Unknown outlet ID: {mapping.outlet_id}")
+            logger.warning("Unknown outlet ID: %s", mapping.outlet_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Unknown outlet ID passed"
             )
         
         # Check if service exists
-        existing_service = db.query(models.Service).filter(
-            (models.Service.id == mapping.service_id)
-        ).first()
+        existing_service = CATALOGUE.service(db, mapping.service_id)
         if not existing_service:
-            logger.warning(f"Unknown service ID: {mapping.service_id}")
+            logger.warning("Unknown service ID: %s", mapping.service_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Unknown service ID passed"
@@ -73,11 +168,11 @@ async def create_outlet_service_mapping(
         try:
             db.commit()
             db.refresh(db_mapping)
-            logger.info(f"Successfully created mapping: outlet={mapping.outlet_id} to service={mapping.service_id}")
+            logger.info("Successfully created mapping: outlet=%s to service=%s", mapping.outlet_id, mapping.service_id)
             created_mappings.append(db_mapping)
         except Exception as e:
             db.rollback()
-            logger.error(f"Failed to create mapping: outlet={mapping.outlet_id} to service={mapping.service_id}, error={str(e)}")
+            logger.error("Failed to create mapping: outlet=%s to service=%s, error=%s", mapping.outlet_id, mapping.service_id, str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
                 detail="Failed to create outlet due to internal error"
@@ -90,19 +185,34 @@ async def create_outlet_service_mapping(
             detail="No mappings were created. All were duplicates or failed."
             )
 
-    logger.info(f"Successfully created {len(created_mappings)} mappings")
+    logger.info("Successfully created %s mappings", len(created_mappings))
     return created_mappings
 
+@router.post("/outlet-service-mappings/bulk", response_model=schemas.BulkMappingResult)
+async def bulk_create_outlet_service_mappings(
+    request: schemas.BulkOutletServiceMappings,
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Maps outlets (by ID or aggregator/resid) to services (by ID or name/variant); existing pairs are ignored."""
+    check_mapping_client(current_session, request.client_id)
+    pairs = resolve_pairs(db, request.client_id, OUTLET_REFS, SERVICE_REFS, request.outlets, request.services,
+                          [(pair.outlet, pair.service) for pair in request.pairs])
+    return bulk_insert_mappings(db, models.OutletService, "outlet_id", "service_id", pairs, request.client_id)
+
 @router.get("/outlet-service-mappings/")
 async def read_outlet_service_mappings(
+    request: Request,
+    response: Response,
     params: schemas.QueryOutletService = Depends(), 
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to get mappings with params : {params}")
+    logger.info("Received request to get mappings for client ID %s (grouped=%s, skip=%s, limit=%s)",
+                params.client_id, params.grouped, params.skip, params.limit)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    is_internal_client = current_session.is_internal
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     # Only verify request for non-internal clients
     if not is_internal_client:
@@ -112,12 +222,18 @@ async def read_outlet_service_mappings(
                             outlet_id=params.outlet_id,
                             db=db)
             except Exception as e:
-                logger.error(f"Request verification failed: {str(e)}")
+                logger.error("Request verification failed: %s", str(e))
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Unauthorized access to get outlet"
                 )
 
+    if params.grouped:
+        selected = parse_fields(params.fields, GROUPED_OUTLET_SERVICE_KEYS)
+    else:
+        selected = OUTLET_SERVICE_FIELDS.parse(params.fields)
+    check_not_modified(request, response, current_session, ("outlet_services", "outlets", "services", "clients"),
+                       list_tenant(current_session, params.client_id))
     query = db.query(models.OutletService)
 
     try:
@@ -125,17 +241,33 @@ async def read_outlet_service_mappings(
 
         if not is_internal_client:
             if params.client_id is not None:
-                logger.info(f"Filtering mappings by client ID {params.client_id}")
+                logger.info("Filtering mappings by client ID %s", params.client_id)
                 query = query.filter(models.OutletService.client_id == params.client_id)
             if params.outlet_id is not None:
-                logger.info(f"Filtering mappings by outlet ID {params.outlet_id}")
+                logger.info("Filtering mappings by outlet ID %s", params.outlet_id)
                 query = query.filter(models.OutletService.outlet_id == params.outlet_id)
             if params.service_id is not None:
-                logger.info(f"Filtering mappings by service ID {params.service_id}")
+                logger.info("Filtering mappings by service ID %s", params.service_id)
                 query = query.filter(models.OutletService.service_id == params.service_id)
 
-        allmappings = query.offset(params.skip).limit(params.limit).all()
-        logger.info(f"Retrieved {len(allmappings)} mappings with skip={params.skip}, limit={params.limit}")
+        search = search_clause(params.search, [
+            models.Outlet.resshortcode, models.Outlet.resid, models.Outlet.city, models.Service.servicename
+        ])
+        if search is not None:
+            query = query.join(models.OutletService.outlet).join(models.OutletService.service).filter(search)
+
+        # Outlet and service (and the client, for DisplayOutletService) come from
+        # the page query's own joins rather than one lazy load per row
+        loaders = [joinedload(models.OutletService.outlet), joinedload(models.OutletService.service)]
+        if not getattr(params, "grouped", False):
+            if selected:
+                # Only the requested columns and relationships are selected
+                loaders = OUTLET_SERVICE_FIELDS.options(selected)
+            else:
+                loaders.append(joinedload(models.OutletService.client))
+        allmappings, next_cursor = paginate(query.options(*loaders), models.OutletService.id, params.limit, params.skip, params.cursor)
+        set_next_cursor(response, next_cursor)
+        logger.info("Retrieved %s mappings with skip=%s, limit=%s", len(allmappings), params.skip, params.limit)
 
         # If grouped, return custom schema (list of dicts)
         if allmappings and getattr(params, "grouped", False):
@@ -152,14 +284,42 @@ async def read_outlet_service_mappings(
                     "servicename": getattr(m.service, "servicename", None),
                     "servicevariant": getattr(m.service, "servicevariant", None)
                 })
-            return result
-        # Default: return as per DisplayOutletService schema
-        return [schemas.DisplayOutletService.model_validate(m) for m in allmappings]
-
+            if selected:
+                result = pick_fields(result, selected)
+            return mapping_page(params, result, query, models.OutletService.id, next_cursor)
+        # Default: return as per DisplayOutletService schema, validated in one pass and
+        # encoded by pydantic-core rather than walked again by jsonable_encoder
+        result = OUTLET_SERVICE_FIELDS.dump(allmappings, selected)
+        return json_response(mapping_page(params, result, query, models.OutletService.id, next_cursor), response)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error while retrieving mappings: {str(e)}")
+        logger.error("Error while retrieving mappings: %s", str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve mappings")
 
+@router.get("/outlet-service-mappings/export")
+async def export_outlet_service_mappings(
+    params: schemas.ExportQueryParams = Depends(),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Streams outlet <> service mappings, with outlet and service natural keys, as CSV or NDJSON."""
+    tenant_id = export_tenant(current_session, params)
+    statement = (
+        select(
+            models.OutletService.id, models.OutletService.outlet_id, models.Outlet.aggregator, models.Outlet.resid,
+            models.Outlet.resshortcode, models.OutletService.service_id, models.Service.servicename,
+            models.Service.servicevariant, models.OutletService.client_id, models.OutletService.created_at
+        )
+        .join(models.Outlet, models.Outlet.id == models.OutletService.outlet_id)
+        .join(models.Service, models.Service.id == models.OutletService.service_id)
+        .order_by(models.OutletService.id)
+    )
+    if tenant_id is not None:
+        statement = statement.where(models.OutletService.client_id == tenant_id)
+    return export_response(db.get_bind(), statement, params.format, export_filename("outlet-services", tenant_id))
+
 @router.put("/outlet-service-mappings/{mapping_id}", response_model=schemas.DisplayOutletService)
 async def update_outlet_service_mapping(
     mapping_id: int,
@@ -167,10 +327,10 @@ async def update_outlet_service_mapping(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to update OutletService Mapping with ID {mapping_id}")
+    logger.info("Received request to update OutletService Mapping with ID %s", mapping_id)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    is_internal_client = current_session.is_internal
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     if not is_internal_client:
         is_client_same = (
@@ -178,7 +338,7 @@ async def update_outlet_service_mapping(
             hasattr(mapping_update, "client_id") and 
             current_session.client_id == mapping_update.client_id
         )
-        logger.info(f"Client ID match check: {is_client_same}")
+        logger.info("Client ID match check: %s", is_client_same)
 
         if is_client_same:
             try:
@@ -187,25 +347,25 @@ async def update_outlet_service_mapping(
                     outlet_service_mapping_id=mapping_id,
                     db=db
                 )
-                logger.info(f"Request verification successful for client {current_session.client_id}")
+                logger.info("Request verification successful for client %s", current_session.client_id)
             except Exception as e:
-                logger.error(f"Request verification failed: {str(e)}")
+                logger.error("Request verification failed: %s", str(e))
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Unauthorized access to update OutletService Mapping"
                 )
 
-    logger.info(f"Fetching OutletService Mapping with ID {mapping_id}")
+    logger.info("Fetching OutletService Mapping with ID %s", mapping_id)
     db_mapping = db.query(models.OutletService).filter(models.OutletService.id == mapping_id).first()
 
     if not db_mapping:
-        logger.warning(f"OutletService Mapping with ID {mapping_id} not found in database")
+        logger.warning("OutletService Mapping with ID %s not found in database", mapping_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"OutletService Mapping with ID {mapping_id} not found"
         )
 
-    logger.info(f"Checking for duplicates: outlet_id={mapping_update.outlet_id} <> service_id={mapping_update.service_id}")
+    logger.info("Checking for duplicates: outlet_id=%s <> service_id=%s", mapping_update.outlet_id, mapping_update.service_id)
     existing = db.query(models.User).filter(
         models.OutletService.outlet_id == mapping_update.outlet_id,
         models.OutletService.service_id == mapping_update.service_id,
@@ -219,16 +379,16 @@ async def update_outlet_service_mapping(
         )
 
     updated_fields = mapping_update.model_dump(exclude_unset=True)
-    logger.info(f"Updating fields: {updated_fields}")
+    logger.info("Updating fields: %s", updated_fields)
     for field, value in updated_fields.items():
         setattr(db_mapping, field, value)
 
     try:
         db.commit()
         db.refresh(db_mapping)
-        logger.info(f"Successfully updated OutletService Mapping with ID {mapping_id}")
+        logger.info("Successfully updated OutletService Mapping with ID %s", mapping_id)
     except Exception as e:
-        logger.error(f"Failed to update OutletService Mapping ID {mapping_id}: {str(e)}")
+        logger.error("Failed to update OutletService Mapping ID %s: %s", mapping_id, str(e))
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -243,7 +403,7 @@ async def delete_outlet_service_mapping(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
     ):
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
+    is_internal_client = current_session.is_internal
     # Only verify request for non-internal clients
     if not is_internal_client:
         try:
@@ -252,20 +412,20 @@ async def delete_outlet_service_mapping(
                 outlet_service_mapping_id=mapping_id,
                 db=db
             )
-            logger.info(f"Request verification successful for client {current_session.client_id}")
+            logger.info("Request verification successful for client %s", current_session.client_id)
         except Exception as e:
-            logger.error(f"Request verification failed: {str(e)}")
+            logger.error("Request verification failed: %s", str(e))
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Unauthorized access to update OutletService Mapping"
             )
             
     try:
-        logger.info(f"Attempting to delete OutletService Mapping with ID {mapping_id}")
+        logger.info("Attempting to delete OutletService Mapping with ID %s", mapping_id)
         db_mapping = db.query(models.OutletService).filter(models.OutletService.id == mapping_id).first()
 
         if not db_mapping:
-            logger.warning(f"OutletService Mapping with ID {mapping_id} not found for deletion")
+            logger.warning("OutletService Mapping with ID %s not found for deletion", mapping_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"OutletService Mapping with ID {mapping_id} not found"
@@ -273,14 +433,14 @@ async def delete_outlet_service_mapping(
 
         db.delete(db_mapping)
         db.commit()
-        logger.info(f"Successfully deleted OutletService Mapping with ID {mapping_id}")
+        logger.info("Successfully deleted OutletService Mapping with ID %s", mapping_id)
         return JSONResponse(
             content={"message": f"OutletService Mapping with ID {mapping_id} successfully deleted"},
             status_code=status.HTTP_200_OK
         )
     except Exception as e:
         db.rollback()
-        logger.error(f"Error occurred while deleting OutletService Mapping ID {mapping_id}: {str(e)}")
+        logger.error("Error occurred while deleting OutletService Mapping ID %s: %s", mapping_id, str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while deleting the OutletService Mapping"
@@ -294,30 +454,28 @@ async def create_user_service_mapping(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to map {len(mappings)} mappings by client ID: {current_session.client_id}")
+    logger.info("Received request to map %s mappings by client ID: %s", len(mappings), current_session.client_id)
 
     created_mappings = []
 
     for mapping in mappings:
-        logger.info(f"Processing Map: user={mapping.user_id}, service={mapping.service_id}")
+        logger.info("Processing Map: user=%s, service=%s", mapping.user_id, mapping.service_id)
 
         # Check if user exists
         existing_user = db.query(models.User).filter(
             (models.User.id == mapping.user_id)
         ).first()
         if not existing_user:
-            logger.warning(f"Unknown user ID: {mapping.user_id}")
+            logger.warning("Unknown user ID: %s", mapping.user_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Unknown user ID passed"
             )
         
         # Check if service exists
-        existing_service = db.query(models.Service).filter(
-            (models.Service.id == mapping.service_id)
-        ).first()
+        existing_service = CATALOGUE.service(db, mapping.service_id)
         if not existing_service:
-            logger.warning(f"Unknown service ID: {mapping.service_id}")
+            logger.warning("Unknown service ID: %s", mapping.service_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Unknown service ID passed"
@@ -344,11 +502,11 @@ async def create_user_service_mapping(
         try:
             db.commit()
             db.refresh(db_mapping)
-            logger.info(f"Successfully created mapping: user={mapping.user_id} to service={mapping.service_id}")
+            logger.info("Successfully created mapping: user=%s to service=%s", mapping.user_id, mapping.service_id)
             created_mappings.append(db_mapping)
         except Exception as e:
             db.rollback()
-            logger.error(f"Failed to create mapping: user={mapping.user_id} to service={mapping.service_id}, error={str(e)}")
+            logger.error("Failed to create mapping: user=%s to service=%s, error=%s", mapping.user_id, mapping.service_id, str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
                 detail="Failed to create user due to internal error"
@@ -361,20 +519,35 @@ async def create_user_service_mapping(
             detail="No mappings were created. All were duplicates or failed."
             )
 
-    logger.info(f"Successfully created {len(created_mappings)} mappings")
+    logger.info("Successfully created %s mappings", len(created_mappings))
     return created_mappings
 
 
+@router.post("/user-service-mappings/bulk", response_model=schemas.BulkMappingResult)
+async def bulk_create_user_service_mappings(
+    request: schemas.BulkUserServiceMappings,
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Maps users (by ID or usernumber) to services (by ID or name/variant); existing pairs are ignored."""
+    check_mapping_client(current_session, request.client_id)
+    pairs = resolve_pairs(db, request.client_id, USER_REFS, SERVICE_REFS, request.users, request.services,
+                          [(pair.user, pair.service) for pair in request.pairs])
+    return bulk_insert_mappings(db, models.UserService, "user_id", "service_id", pairs, request.client_id)
+
 @router.get("/user-service-mappings/")
 async def read_user_service_mappings(
+    request: Request,
+    response: Response,
     params: schemas.QueryUserService = Depends(), 
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to get mappings with params : {params}")
+    logger.info("Received request to get mappings for client ID %s (grouped=%s, skip=%s, limit=%s)",
+                params.client_id, params.grouped, params.skip, params.limit)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    is_internal_client = current_session.is_internal
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     # Only verify request for non-internal clients
     if not is_internal_client:
@@ -384,12 +557,15 @@ async def read_user_service_mappings(
                             user_id=params.user_id,
                             db=db)
             except Exception as e:
-                logger.error(f"Request verification failed: {str(e)}")
+                logger.error("Request verification failed: %s", str(e))
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Unauthorized access to get user"
                 )
 
+    selected = parse_fields(params.fields, GROUPED_USER_SERVICE_KEYS if params.grouped else USER_SERVICE_KEYS)
+    check_not_modified(request, response, current_session, ("user_services", "users", "services", "clients"),
+                       list_tenant(current_session, params.client_id))
     query = db.query(models.UserService)
 
     try:
@@ -397,21 +573,31 @@ async def read_user_service_mappings(
 
         if not is_internal_client:
             if params.client_id is not None:
-                logger.info(f"Filtering mappings by client ID {params.client_id}")
+                logger.info("Filtering mappings by client ID %s", params.client_id)
                 query = query.filter(models.UserService.client_id == params.client_id)
             if params.user_id is not None:
-                logger.info(f"Filtering mappings by user ID {params.user_id}")
+                logger.info("Filtering mappings by user ID %s", params.user_id)
                 query = query.filter(models.UserService.user_id == params.user_id)
             if params.service_id is not None:
-                logger.info(f"Filtering mappings by service ID {params.service_id}")
+                logger.info("Filtering mappings by service ID %s", params.service_id)
                 query = query.filter(models.UserService.service_id == params.service_id)
 
-        allmappings = query.offset(params.skip).limit(params.limit).all()
-        logger.info(f"Retrieved {len(allmappings)} mappings with skip={params.skip}, limit={params.limit}")
+        search = search_clause(params.search, [
+            models.User.username, models.User.usernumber, models.User.useremail, models.Service.servicename
+        ])
+        if search is not None:
+            query = query.join(models.UserService.user).join(models.UserService.service).filter(search)
+
+        page_query = query
+        if getattr(params, "grouped", False):
+            page_query = query.options(joinedload(models.UserService.user), joinedload(models.UserService.service))
+        allmappings, next_cursor = paginate(page_query, models.UserService.id, params.limit, params.skip, params.cursor)
+        set_next_cursor(response, next_cursor)
+        logger.info("Retrieved %s mappings with skip=%s, limit=%s", len(allmappings), params.skip, params.limit)
 
         if allmappings and getattr(params, "grouped", False):
             result = []
-            logger.info("Grouping mappings by user and service: ", allmappings)
+            logger.info("Grouping %s mappings by user and service", len(allmappings))
             for m in allmappings:
                 mapping_id = m.id
                 user = m.user
@@ -435,14 +621,42 @@ async def read_user_service_mappings(
                     "user_id": user_id,
                     "client_id": client_id
                 })
-            return result
+            if selected:
+                result = pick_fields(result, selected)
+            return mapping_page(params, result, query, models.UserService.id, next_cursor)
         else:
-            return allmappings
+            if selected:
+                allmappings = pick_fields(allmappings, selected)
+            return mapping_page(params, allmappings, query, models.UserService.id, next_cursor)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error while retrieving mappings: {str(e)}")
+        logger.error("Error while retrieving mappings: %s", str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve mappings")
 
+@router.get("/user-service-mappings/export")
+async def export_user_service_mappings(
+    params: schemas.ExportQueryParams = Depends(),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Streams user <> service mappings, with user and service natural keys, as CSV or NDJSON."""
+    tenant_id = export_tenant(current_session, params)
+    statement = (
+        select(
+            models.UserService.id, models.UserService.user_id, models.User.username, models.User.usernumber,
+            models.UserService.service_id, models.Service.servicename, models.Service.servicevariant,
+            models.UserService.client_id, models.UserService.created_at
+        )
+        .join(models.User, models.User.id == models.UserService.user_id)
+        .join(models.Service, models.Service.id == models.UserService.service_id)
+        .order_by(models.UserService.id)
+    )
+    if tenant_id is not None:
+        statement = statement.where(models.UserService.client_id == tenant_id)
+    return export_response(db.get_bind(), statement, params.format, export_filename("user-services", tenant_id))
+
 @router.put("/user-service-mappings/{mapping_id}", response_model=schemas.DisplayUserService)
 async def update_user_service_mapping(
     mapping_id: int,
@@ -450,10 +664,10 @@ async def update_user_service_mapping(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to update UserService Mapping with ID {mapping_id}")
+    logger.info("Received request to update UserService Mapping with ID %s", mapping_id)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    is_internal_client = current_session.is_internal
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     if not is_internal_client:
         is_client_same = (
@@ -461,7 +675,7 @@ async def update_user_service_mapping(
             hasattr(mapping_update, "client_id") and 
             current_session.client_id == mapping_update.client_id
         )
-        logger.info(f"Client ID match check: {is_client_same}")
+        logger.info("Client ID match check: %s", is_client_same)
 
         if is_client_same:
             try:
@@ -470,25 +684,25 @@ async def update_user_service_mapping(
                     user_service_mapping_id=mapping_id,
                     db=db
                 )
-                logger.info(f"Request verification successful for client {current_session.client_id}")
+                logger.info("Request verification successful for client %s", current_session.client_id)
             except Exception as e:
-                logger.error(f"Request verification failed: {str(e)}")
+                logger.error("Request verification failed: %s", str(e))
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Unauthorized access to update UserService Mapping"
                 )
 
-    logger.info(f"Fetching UserService Mapping with ID {mapping_id}")
+    logger.info("Fetching UserService Mapping with ID %s", mapping_id)
     db_mapping = db.query(models.UserService).filter(models.UserService.id == mapping_id).first()
 
     if not db_mapping:
-        logger.warning(f"UserService Mapping with ID {mapping_id} not found in database")
+        logger.warning("UserService Mapping with ID %s not found in database", mapping_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"UserService Mapping with ID {mapping_id} not found"
         )
 
-    logger.info(f"Checking for duplicates: user_id={mapping_update.user_id} <> service_id={mapping_update.service_id}")
+    logger.info("Checking for duplicates: user_id=%s <> service_id=%s", mapping_update.user_id, mapping_update.service_id)
     existing = db.query(models.User).filter(
         models.UserService.user_id == mapping_update.user_id,
         models.UserService.service_id == mapping_update.service_id,
@@ -502,16 +716,16 @@ async def update_user_service_mapping(
         )
 
     updated_fields = mapping_update.model_dump(exclude_unset=True)
-    logger.info(f"Updating fields: {updated_fields}")
+    logger.info("Updating fields: %s", updated_fields)
     for field, value in updated_fields.items():
         setattr(db_mapping, field, value)
 
     try:
         db.commit()
         db.refresh(db_mapping)
-        logger.info(f"Successfully updated UserService Mapping with ID {mapping_id}")
+        logger.info("Successfully updated UserService Mapping with ID %s", mapping_id)
     except Exception as e:
-        logger.error(f"Failed to update UserService Mapping ID {mapping_id}: {str(e)}")
+        logger.error("Failed to update UserService Mapping ID %s: %s", mapping_id, str(e))
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -526,7 +740,7 @@ async def delete_user_service_mapping(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
     ):
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
+    is_internal_client = current_session.is_internal
     # Only verify request for non-internal clients
     if not is_internal_client:
         try:
@@ -535,20 +749,20 @@ async def delete_user_service_mapping(
                 user_service_mapping_id=mapping_id,
                 db=db
             )
-            logger.info(f"Request verification successful for client {current_session.client_id}")
+            logger.info("Request verification successful for client %s", current_session.client_id)
         except Exception as e:
-            logger.error(f"Request verification failed: {str(e)}")
+            logger.error("Request verification failed: %s", str(e))
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Unauthorized access to update UserService Mapping"
             )
             
     try:
-        logger.info(f"Attempting to delete UserService Mapping with ID {mapping_id}")
+        logger.info("Attempting to delete UserService Mapping with ID %s", mapping_id)
         db_mapping = db.query(models.UserService).filter(models.UserService.id == mapping_id).first()
 
         if not db_mapping:
-            logger.warning(f"UserService Mapping with ID {mapping_id} not found for deletion")
+            logger.warning("UserService Mapping with ID %s not found for deletion", mapping_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"UserService Mapping with ID {mapping_id} not found"
@@ -556,14 +770,14 @@ async def delete_user_service_mapping(
 
         db.delete(db_mapping)
         db.commit()
-        logger.info(f"Successfully deleted UserService Mapping with ID {mapping_id}")
+        logger.info("Successfully deleted UserService Mapping with ID %s", mapping_id)
         return JSONResponse(
             content={"message": f"UserService Mapping with ID {mapping_id} successfully deleted"},
             status_code=status.HTTP_200_OK
         )
     except Exception as e:
         db.rollback()
-        logger.error(f"Error occurred while deleting UserService Mapping ID {mapping_id}: {str(e)}")
+        logger.error("Error occurred while deleting UserService Mapping ID %s: %s", mapping_id, str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while deleting the UserService Mapping"
@@ -577,19 +791,19 @@ async def create_user_outlet_mapping(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to map {len(mappings)} mappings by client ID: {current_session.client_id}")
+    logger.info("Received request to map %s mappings by client ID: %s", len(mappings), current_session.client_id)
 
     created_mappings = []
 
     for mapping in mappings:
-        logger.info(f"Processing Map: user={mapping.user_id}, outlet={mapping.outlet_id}")
+        logger.info("Processing Map: user=%s, outlet=%s", mapping.user_id, mapping.outlet_id)
 
         # Check if user exists
         existing_user = db.query(models.User).filter(
             (models.User.id == mapping.user_id)
         ).first()
         if not existing_user:
-            logger.warning(f"Unknown user ID: {mapping.user_id}")
+            logger.warning("Unknown user ID: %s", mapping.user_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Unknown user ID passed"
@@ -600,7 +814,7 @@ async def create_user_outlet_mapping(
             (models.Outlet.id == mapping.outlet_id)
         ).first()
         if not existing_outlet:
-            logger.warning(f"Unknown outlet ID: {mapping.outlet_id}")
+            logger.warning("Unknown outlet ID: %s", mapping.outlet_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Unknown outlet ID passed"
@@ -627,11 +841,11 @@ async def create_user_outlet_mapping(
         try:
             db.commit()
             db.refresh(db_mapping)
-            logger.info(f"Successfully created mapping: user={mapping.user_id} to outlet={mapping.outlet_id}")
+            logger.info("Successfully created mapping: user=%s to outlet=%s", mapping.user_id, mapping.outlet_id)
             created_mappings.append(db_mapping)
         except Exception as e:
             db.rollback()
-            logger.error(f"Failed to create mapping: user={mapping.user_id} to outlet={mapping.outlet_id}, error={str(e)}")
+            logger.error("Failed to create mapping: user=%s to outlet=%s, error=%s", mapping.user_id, mapping.outlet_id, str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
                 detail="Failed to create user due to internal error"
@@ -644,20 +858,35 @@ async def create_user_outlet_mapping(
             detail="No mappings were created. All were duplicates or failed."
             )
 
-    logger.info(f"Successfully created {len(created_mappings)} mappings")
+    logger.info("Successfully created %s mappings", len(created_mappings))
     return created_mappings
 
+@router.post("/user-outlet-mappings/bulk", response_model=schemas.BulkMappingResult)
+async def bulk_create_user_outlet_mappings(
+    request: schemas.BulkUserOutletMappings,
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Maps users (by ID or usernumber) to outlets (by ID or aggregator/resid); existing pairs are ignored."""
+    check_mapping_client(current_session, request.client_id)
+    pairs = resolve_pairs(db, request.client_id, USER_REFS, OUTLET_REFS, request.users, request.outlets,
+                          [(pair.user, pair.outlet) for pair in request.pairs])
+    return bulk_insert_mappings(db, models.UserOutlet, "user_id", "outlet_id", pairs, request.client_id)
+
 @router.get("/user-outlet-mappings/")
 async def read_user_outlet_mappings(
+    request: Request,
+    response: Response,
     params: schemas.QueryUserOutlet = Depends(),
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to get mappings with params : {params}")
+    logger.info("Received request to get mappings for client ID %s (grouped=%s, skip=%s, limit=%s)",
+                params.client_id, params.grouped, params.skip, params.limit)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
+    is_internal_client = current_session.is_internal
     # is_internal_client = True
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     # Only verify request for non-internal clients
     if not is_internal_client:
@@ -667,12 +896,15 @@ async def read_user_outlet_mappings(
                             user_id=params.user_id,
                             db=db)
             except Exception as e:
-                logger.error(f"Request verification failed: {str(e)}")
+                logger.error("Request verification failed: %s", str(e))
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Unauthorized access to get user"
                 )
 
+    selected = parse_fields(params.fields, GROUPED_USER_OUTLET_KEYS if params.grouped else USER_OUTLET_KEYS)
+    check_not_modified(request, response, current_session, ("user_outlets", "users", "outlets", "brands"),
+                       list_tenant(current_session, params.client_id))
     query = db.query(models.UserOutlet)
 
     try:
@@ -681,72 +913,79 @@ async def read_user_outlet_mappings(
         if not is_internal_client:
 
             if params.client_id is not None:
-                logger.info(f"Filtering mappings by client ID {params.client_id}")
+                logger.info("Filtering mappings by client ID %s", params.client_id)
                 query = query.filter(models.UserOutlet.client_id == params.client_id)
 
             if params.user_id is not None:
-                logger.info(f"Filtering mappings by user ID {params.user_id}")
+                logger.info("Filtering mappings by user ID %s", params.user_id)
                 query = query.filter(models.UserOutlet.user_id == params.user_id)
 
             if params.outlet_id is not None:
-                logger.info(f"Filtering mappings by outlet ID {params.outlet_id}")
+                logger.info("Filtering mappings by outlet ID %s", params.outlet_id)
                 query = query.filter(models.UserOutlet.outlet_id == params.outlet_id)
 
-        allmappings = query.offset(params.skip).limit(params.limit).all()
-        logger.info(f"Retrieved {len(allmappings)} mappings with skip={params.skip}, limit={params.limit}")
+        search = search_clause(params.search, [
+            models.User.username, models.User.usernumber, models.User.useremail,
+            models.Outlet.resshortcode, models.Outlet.resid
+        ])
+        if search is not None:
+            query = query.join(models.UserOutlet.user).join(models.UserOutlet.outlet).filter(search)
+
+        if params.grouped:
+            return grouped_user_outlets(response, params, query, joined=search is not None, selected=selected)
+
+        allmappings, next_cursor = paginate(query.options(joinedload(models.UserOutlet.user)), models.UserOutlet.id,
+                                            params.limit, params.skip, params.cursor)
+        set_next_cursor(response, next_cursor)
+        logger.info("Retrieved %s mappings with skip=%s, limit=%s", len(allmappings), params.skip, params.limit)
 
         if allmappings:
-            if params.grouped:
-                grouped = {}
-                for m in allmappings:
-                    outlet = m.outlet
-                    user = m.user
-                    res_id = outlet.id
-                    mapping_id = m.id
-                    brandname = outlet.brand.brandname if outlet and outlet.brand else None
-                    key = res_id
-                    if key not in grouped:
-                        grouped[key] = {
-                            "aggregator": outlet.aggregator,
-                            "brand": brandname,
-                            "res_id": res_id,
-                            "shortcode": outlet.resshortcode,
-                            "users": set()
-                        }
-                    grouped[key]["users"].add(user.username)
-
-                response = []
-                for g in grouped.values():
-                    response.append(
-                        schemas.DisplayUserOutletGrouped(
-                            aggregator=g["aggregator"],
-                            brand=g["brand"],
-                            res_id=g["res_id"],
-                            shortcode=g["shortcode"],
-                            users=list(g["users"]),
-                        )
-                    )
-                return response
-            else:
-                result = []
-                for m in allmappings:
-                    user = m.user
-                    result.append({
-                        "email": getattr(user, "useremail", ""),
-                        "name": getattr(user, "username", ""),
-                        "number": str(getattr(user, "usernumber", "")),
-                        "mapping_id": m.id
-                    })
-                return result
-                # return [
-                #     schemas.DisplayUserOutlet.from_orm(m) for m in allmappings
-                # ]
+            result = []
+            for m in allmappings:
+                user = m.user
+                result.append({
+                    "email": getattr(user, "useremail", ""),
+                    "name": getattr(user, "username", ""),
+                    "number": str(getattr(user, "usernumber", "")),
+                    "mapping_id": m.id
+                })
+            if selected:
+                result = pick_fields(result, selected)
+            return mapping_page(params, result, query, models.UserOutlet.id, next_cursor)
+            # return [
+            #     schemas.DisplayUserOutlet.from_orm(m) for m in allmappings
+            # ]
+        return mapping_page(params, allmappings, query, models.UserOutlet.id, next_cursor)
             
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error while retrieving mappings: {str(e)}")
+        logger.error("Error while retrieving mappings: %s", str(e))
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve mappings")
     
 
+@router.get("/user-outlet-mappings/export")
+async def export_user_outlet_mappings(
+    params: schemas.ExportQueryParams = Depends(),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Streams user <> outlet mappings, with user and outlet natural keys, as CSV or NDJSON."""
+    tenant_id = export_tenant(current_session, params)
+    statement = (
+        select(
+            models.UserOutlet.id, models.UserOutlet.user_id, models.User.username, models.User.usernumber,
+            models.UserOutlet.outlet_id, models.Outlet.aggregator, models.Outlet.resid, models.Outlet.resshortcode,
+            models.UserOutlet.client_id, models.UserOutlet.created_at
+        )
+        .join(models.User, models.User.id == models.UserOutlet.user_id)
+        .join(models.Outlet, models.Outlet.id == models.UserOutlet.outlet_id)
+        .order_by(models.UserOutlet.id)
+    )
+    if tenant_id is not None:
+        statement = statement.where(models.UserOutlet.client_id == tenant_id)
+    return export_response(db.get_bind(), statement, params.format, export_filename("user-outlets", tenant_id))
+
 @router.put("/user-outlet-mappings/{mapping_id}", response_model=schemas.DisplayUserOutlet)
 async def update_user_outlet_mapping(
     mapping_id: int,
@@ -754,10 +993,10 @@ async def update_user_outlet_mapping(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to update UserOutlet Mapping with ID {mapping_id}")
+    logger.info("Received request to update UserOutlet Mapping with ID %s", mapping_id)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    is_internal_client = current_session.is_internal
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     if not is_internal_client:
         is_client_same = (
@@ -765,7 +1004,7 @@ async def update_user_outlet_mapping(
             hasattr(mapping_update, "client_id") and 
             current_session.client_id == mapping_update.client_id
         )
-        logger.info(f"Client ID match check: {is_client_same}")
+        logger.info("Client ID match check: %s", is_client_same)
 
         if is_client_same:
             try:
@@ -774,25 +1013,25 @@ async def update_user_outlet_mapping(
                     user_outlet_mapping_id=mapping_id,
                     db=db
                 )
-                logger.info(f"Request verification successful for client {current_session.client_id}")
+                logger.info("Request verification successful for client %s", current_session.client_id)
             except Exception as e:
-                logger.error(f"Request verification failed: {str(e)}")
+                logger.error("Request verification failed: %s", str(e))
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Unauthorized access to update UserOutlet Mapping"
                 )
 
-    logger.info(f"Fetching UserOutlet Mapping with ID {mapping_id}")
+    logger.info("Fetching UserOutlet Mapping with ID %s", mapping_id)
     db_mapping = db.query(models.UserOutlet).filter(models.UserOutlet.id == mapping_id).first()
 
     if not db_mapping:
-        logger.warning(f"UserOutlet Mapping with ID {mapping_id} not found in database")
+        logger.warning("UserOutlet Mapping with ID %s not found in database", mapping_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"UserOutlet Mapping with ID {mapping_id} not found"
         )
 
-    logger.info(f"Checking for duplicates: user_id={mapping_update.user_id} <> outlet_id={mapping_update.outlet_id}")
+    logger.info("Checking for duplicates: user_id=%s <> outlet_id=%s", mapping_update.user_id, mapping_update.outlet_id)
     existing = db.query(models.User).filter(
         models.UserOutlet.user_id == mapping_update.user_id,
         models.UserOutlet.outlet_id == mapping_update.outlet_id,
@@ -806,16 +1045,16 @@ async def update_user_outlet_mapping(
         )
 
     updated_fields = mapping_update.model_dump(exclude_unset=True)
-    logger.info(f"Updating fields: {updated_fields}")
+    logger.info("Updating fields: %s", updated_fields)
     for field, value in updated_fields.items():
         setattr(db_mapping, field, value)
 
     try:
         db.commit()
         db.refresh(db_mapping)
-        logger.info(f"Successfully updated UserOutlet Mapping with ID {mapping_id}")
+        logger.info("Successfully updated UserOutlet Mapping with ID %s", mapping_id)
     except Exception as e:
-        logger.error(f"Failed to update UserOutlet Mapping ID {mapping_id}: {str(e)}")
+        logger.error("Failed to update UserOutlet Mapping ID %s: %s", mapping_id, str(e))
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -830,7 +1069,7 @@ async def delete_user_outlet_mapping(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
     ):
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
+    is_internal_client = current_session.is_internal
     # Only verify request for non-internal clients
     if not is_internal_client:
         try:
@@ -839,20 +1078,20 @@ async def delete_user_outlet_mapping(
                 user_outlet_mapping_id=mapping_id,
                 db=db
             )
-            logger.info(f"Request verification successful for client {current_session.client_id}")
+            logger.info("Request verification successful for client %s", current_session.client_id)
         except Exception as e:
-            logger.error(f"Request verification failed: {str(e)}")
+            logger.error("Request verification failed: %s", str(e))
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Unauthorized access to update UserOutlet Mapping"
             )
             
     try:
-        logger.info(f"Attempting to delete UserOutlet Mapping with ID {mapping_id}")
+        logger.info("Attempting to delete UserOutlet Mapping with ID %s", mapping_id)
         db_mapping = db.query(models.UserOutlet).filter(models.UserOutlet.id == mapping_id).first()
 
         if not db_mapping:
-            logger.warning(f"UserOutlet Mapping with ID {mapping_id} not found for deletion")
+            logger.warning("UserOutlet Mapping with ID %s not found for deletion", mapping_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"UserOutlet Mapping with ID {mapping_id} not found"
@@ -860,15 +1099,117 @@ async def delete_user_outlet_mapping(
 
         db.delete(db_mapping)
         db.commit()
-        logger.info(f"Successfully deleted UserOutlet Mapping with ID {mapping_id}")
+        logger.info("Successfully deleted UserOutlet Mapping with ID %s", mapping_id)
         return JSONResponse(
             content={"message": f"UserOutlet Mapping with ID {mapping_id} successfully deleted"},
             status_code=status.HTTP_200_OK
         )
     except Exception as e:
         db.rollback()
-        logger.error(f"Error occurred while deleting UserOutlet Mapping ID {mapping_id}: {str(e)}")
+        logger.error("Error occurred while deleting UserOutlet Mapping ID %s: %s", mapping_id, str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred while deleting the UserOutlet Mapping"
         )
+
+
+#______________________________________ Exact mapping sets ______________________________________
+def set_exact_mappings(db: Session, current_session, mapping_model, anchor, anchor_field: str, anchor_id: int,
+                       other, other_field: str, desired: schemas.MappingSet) -> schemas.MappingDelta:
+    """Shared body of the PUT routes below: diff, apply in one transaction, return the delta."""
+    is_internal_client = current_session.is_internal
+    client_id = owner_of(db, anchor, anchor_id, None if is_internal_client else current_session.client_id)
+
+    try:
+        begin_transaction(db)
+        added, removed, unchanged = reconcile_mappings(
+            db, mapping_model, anchor_field, anchor_id, other_field, other, desired.ids, client_id, desired.dry_run
+        )
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error("Failed to reconcile %s for %s %s: %s", mapping_model.__tablename__, anchor.label, anchor_id, str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update mappings")
+
+    if not desired.dry_run and (added or removed):
+        OWNERSHIP_CACHE.invalidate(OWNED_KINDS[mapping_model], client_id)
+    logger.info("Reconciled %s for %s %s: +%s -%s =%s (dry_run=%s)", mapping_model.__tablename__,
+                anchor.label, anchor_id, len(added), len(removed), unchanged, desired.dry_run)
+    return schemas.MappingDelta(added=added, removed=removed, unchanged=unchanged, dry_run=desired.dry_run)
+
+@router.put("/users/{user_id}/outlets", response_model=schemas.MappingDelta)
+async def set_user_outlets(
+    user_id: int,
+    desired: schemas.MappingSet,
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Sets exactly which outlets a user is mapped to."""
+    return set_exact_mappings(db, current_session, models.UserOutlet, USER_REFS, "user_id", user_id,
+                              OUTLET_REFS, "outlet_id", desired)
+
+@router.put("/users/{user_id}/services", response_model=schemas.MappingDelta)
+async def set_user_services(
+    user_id: int,
+    desired: schemas.MappingSet,
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Sets exactly which services a user is mapped to."""
+    return set_exact_mappings(db, current_session, models.UserService, USER_REFS, "user_id", user_id,
+                              SERVICE_REFS, "service_id", desired)
+
+@router.put("/outlets/{outlet_id}/users", response_model=schemas.MappingDelta)
+async def set_outlet_users(
+    outlet_id: int,
+    desired: schemas.MappingSet,
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Sets exactly which users are mapped to an outlet."""
+    return set_exact_mappings(db, current_session, models.UserOutlet, OUTLET_REFS, "outlet_id", outlet_id,
+                              USER_REFS, "user_id", desired)
+
+@router.post("/mappings/batch-delete", response_model=schemas.MappingDeleteResult)
+async def delete_mappings(
+    batch: schemas.MappingDeleteBatch,
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Deletes mappings of any of the three kinds by ID: one ownership query and one DELETE per table."""
+    ids = {
+        "outlet_service_mapping": batch.outlet_service_ids,
+        "user_service_mapping": batch.user_service_ids,
+        "user_outlet_mapping": batch.user_outlet_ids,
+    }
+    is_internal_client = current_session.is_internal
+    verify_ownership(db, None if is_internal_client else current_session.client_id, ids)
+
+    deleted = {}
+    try:
+        begin_transaction(db)
+        for kind, mapping_model in (("outlet_service_mapping", models.OutletService),
+                                    ("user_service_mapping", models.UserService),
+                                    ("user_outlet_mapping", models.UserOutlet)):
+            deleted[kind] = 0
+            if ids[kind]:
+                deleted[kind] = db.query(mapping_model).filter(
+                    mapping_model.id.in_(ids[kind])
+                ).delete(synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Batch mapping delete failed: %s", str(e))
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete mappings")
+
+    for kind, mapping_ids in ids.items():
+        OWNERSHIP_CACHE.forget(kind, mapping_ids)
+    logger.info("Batch-deleted mappings for client %s: %s", current_session.client_id, deleted)
+    return schemas.MappingDeleteResult(
+        outlet_service=deleted["outlet_service_mapping"],
+        user_service=deleted["user_service_mapping"],
+        user_outlet=deleted["user_outlet_mapping"],
+    )
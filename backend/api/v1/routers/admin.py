@@ -1,12 +1,29 @@
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
 from fastapi.responses import JSONResponse
+from sqlalchemy import select, update as sql_update
 from sqlalchemy.orm import Session
 from .auth import get_current_session
-from ..database.database import get_db
+from ..database.database import begin_transaction, get_db
 from ..schemas import schemas
 from ..database import models
+from ..utils.pagination import paginate, paginate_list, set_next_cursor
+from ..utils.blob_store import blob_digest, read_gstdoc
+from ..utils.catalogue import CATALOGUE
+from ..utils.compression import body_encoding
+from ..utils.etag import check_not_modified, list_tenant
+from ..utils.serialization import json_response
+from ..utils.table_query import (
+    FilterSet, SparseFields, count_rows, csv_ints, csv_values, facet_counts, parse_sort, search_clause
+)
+from ..utils.search_index import OUTLET_SEARCH, USER_SEARCH, load_ranked
+from ..utils.export import export_response
+from ..utils.outlet_bulk import ALL_OR_NOTHING, OutletImporter, create_outlet_batch, read_outlet_rows
+from ..utils.outlet_sync import OutletFeedSync
+from ..utils.ownership import OWNERSHIP_CACHE, verify_ownership
+from ..utils.user_bulk import create_user_batch
 from logger import create_logger
 
 # Initialize logger
@@ -14,7 +31,70 @@ logger = create_logger(__name__)
 
 
 router = APIRouter() 
-INTERNAL_CLIENT_IDS = {1,2,3,4,5,6}
+
+# Server-side table support for the outlet and user lists
+OUTLET_SORT_COLUMNS = {
+    "id": models.Outlet.id,
+    "aggregator": models.Outlet.aggregator,
+    "resid": models.Outlet.resid,
+    "subzone": models.Outlet.subzone,
+    "resshortcode": models.Outlet.resshortcode,
+    "city": models.Outlet.city,
+    "is_active": models.Outlet.is_active,
+    "created_at": models.Outlet.created_at,
+}
+OUTLET_SEARCH_COLUMNS = [models.Outlet.resshortcode, models.Outlet.resid, models.Outlet.city, models.Outlet.subzone]
+OUTLET_FACETS = {
+    "city": models.Outlet.city,
+    "subzone": models.Outlet.subzone,
+    "aggregator": models.Outlet.aggregator,
+    "brand_id": models.Outlet.brand_id,
+    "is_active": models.Outlet.is_active,
+}
+USER_SORT_COLUMNS = {
+    "id": models.User.id,
+    "username": models.User.username,
+    "usernumber": models.User.usernumber,
+    "useremail": models.User.useremail,
+    "is_active": models.User.is_active,
+    "created_at": models.User.created_at,
+}
+USER_SEARCH_COLUMNS = [models.User.username, models.User.usernumber, models.User.useremail]
+USER_FACETS = {"is_active": models.User.is_active}
+# ?fields= sparse fieldsets for the list endpoints
+BRAND_FIELDS = SparseFields(schemas.DisplayBrand, models.Brand, {"client": models.Brand.client})
+OUTLET_FIELDS = SparseFields(schemas.DisplayOutlet, models.Outlet, full=schemas.OUTLET_LIST)
+USER_FIELDS = SparseFields(schemas.DisplayUser, models.User, full=schemas.USER_LIST)
+SERVICE_FIELDS = SparseFields(schemas.DisplayService, models.Service)
+
+
+def page_offset(page, skip: int, limit: int) -> int:
+    """Translates an optional 1-based page number into an offset."""
+    return (max(page, 1) - 1) * limit if page else skip
+
+def search_tenant(current_session, params: schemas.SearchQueryParams) -> int:
+    """Clients search their own rows; internal clients must name the tenant."""
+    if not current_session.is_internal:
+        return current_session.client_id
+    if params.client_id is None:
+        raise HTTPException(status_code=400, detail="client_id is required for internal search")
+    return params.client_id
+
+def export_tenant(current_session, params: schemas.ExportQueryParams):
+    """Clients export their own rows; internal clients may pick a tenant or export all (None)."""
+    if not current_session.is_internal:
+        return current_session.client_id
+    return params.client_id
+
+def export_filename(table: str, tenant_id) -> str:
+    return f"{table}-{tenant_id or 'all'}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+def status_filter(status_value) -> dict:
+    if status_value == schemas.StatusEnum.active:
+        return {"is_active": True}
+    if status_value == schemas.StatusEnum.inactive:
+        return {"is_active": False}
+    return {}
 
 def verify_request(client_id: int, 
                    db: Session, 
@@ -24,56 +104,20 @@ def verify_request(client_id: int,
                    service_id: int = None,
                    outlet_service_mapping_id: int = None,
                    user_service_mapping_id: int = None,
-                   outlet_user_mapping_id: int = None
+                   outlet_user_mapping_id: int = None,
+                   user_outlet_mapping_id: int = None
                    ):
-    
-    if outlet_id is not None:
-        outlet = db.query(models.Outlet).filter(models.Outlet.id == outlet_id).first()
-        if outlet:
-            if outlet.client_id != client_id:
-                raise HTTPException(status_code=403, detail="Forbidden: You don't own this outlet")
-        else:
-            raise HTTPException(status_code=404, detail="Outlet not found")
-    
-    elif brand_id is not None:
-        brand = db.query(models.Brand).filter(models.Brand.id == brand_id).first()
-        if brand:
-            if brand.client_id != client_id:
-                raise HTTPException(status_code=403, detail="Forbidden: You don't own this brand")
-        else:
-            raise HTTPException(status_code=404, detail="Brand not found")
-        
-    elif user_id is not None:
-        user = db.query(models.User).filter(models.User.id == user_id).first()
-        if user:
-            if user.client_id != client_id:
-                raise HTTPException(status_code=403, detail="Forbidden: You don't own this brand")
-        else:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-    elif outlet_service_mapping_id is not None:
-        outlet_service_mapping = db.query(models.OutletService).filter(models.OutletService.id == outlet_service_mapping_id).first()
-        if outlet_service_mapping:
-            if outlet_service_mapping.client_id != client_id:
-                raise HTTPException(status_code=403, detail="Forbidden: You don't own this mapping")
-        else:
-            raise HTTPException(status_code=505, detail="Mapping not found")
-        
-    elif user_service_mapping_id is not None:
-        user_service_mapping = db.query(models.UserService).filter(models.UserService.id == user_service_mapping_id).first()
-        if user_service_mapping:
-            if user_service_mapping.client_id != client_id:
-                raise HTTPException(status_code=403, detail="Forbidden: You don't own this mapping")
-        else:
-            raise HTTPException(status_code=505, detail="Mapping not found")
-        
-    elif outlet_user_mapping_id is not None:
-        outlet_user_mapping = db.query(models.UserOutlet).filter(models.UserOutlet.id == outlet_user_mapping_id).first()
-        if outlet_user_mapping:
-            if outlet_user_mapping.client_id != client_id:
-                raise HTTPException(status_code=403, detail="Forbidden: You don't own this mapping")
-        else:
-            raise HTTPException(status_code=505, detail="Mapping not found")
+    """Single-entity ownership check; see verify_ownership for checking many IDs at once."""
+    entities = {
+        "outlet": outlet_id,
+        "brand": brand_id,
+        "user": user_id,
+        "outlet_service_mapping": outlet_service_mapping_id,
+        "user_service_mapping": user_service_mapping_id,
+        "user_outlet_mapping": user_outlet_mapping_id if user_outlet_mapping_id is not None else outlet_user_mapping_id,
+    }
+    # Services are shared across clients, so service_id needs no check
+    verify_ownership(db, client_id, {kind: [entity_id] for kind, entity_id in entities.items() if entity_id is not None})
                 
 
 #______________________________________ Brand routes ______________________________________
@@ -84,30 +128,28 @@ async def get_brand_names_and_id(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    brands = db.query(models.Brand).all()
-    result = []
-    for db_brand in brands:
-        brand_name_words = (db_brand.brandname.strip()).split()
-        if len(brand_name_words) > 1:
-            abbreviation = ''.join([word[0].upper() for word in brand_name_words if word])
-        else:
-            abbreviation = db_brand.brandname
-        result.append({"brand_name": abbreviation, "id": db_brand.id})
-    return result
+    # Served from the in-process brand directory; abbreviations are precomputed per load
+    return CATALOGUE.brand_names(db)
 
 @router.get("/brands/", response_model=List[schemas.DisplayBrand])
 async def get_brands(
+    response: Response,
     params: schemas.BrandQueryParams = Depends(),
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
     query = db.query(models.Brand)
+    selected = BRAND_FIELDS.parse(params.fields)
+    if selected:
+        query = query.options(*BRAND_FIELDS.options(selected))
 
     # Filter by brand_id (single brand)
     if params.brand_id is not None:
         brand = query.filter(models.Brand.id == params.brand_id).first()
         if brand is None:
             raise HTTPException(status_code=404, detail="Brand not found")
+        if selected:
+            return json_response(BRAND_FIELDS.dump([brand], selected), response)
         return [brand]
 
     # Filter by client_id
@@ -115,9 +157,46 @@ async def get_brands(
         query = query.filter(models.Brand.client_id == params.client_id)
 
     # Apply pagination
-    brands = query.offset(params.skip).limit(params.limit).all()
+    brands, next_cursor = paginate(query, models.Brand.id, params.limit, params.skip, params.cursor)
+    set_next_cursor(response, next_cursor)
+    if selected:
+        return json_response(BRAND_FIELDS.dump(brands, selected), response)
     return brands
 
+# GET API to return a brand's GST document, which brand listings leave out
+@router.get("/brands/{brand_id}/gstdoc", response_model=dict)
+async def get_brand_gstdoc(
+    brand_id: int,
+    request: Request,
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    verify_request(client_id=current_session.client_id,
+                   brand_id=brand_id,
+                   db=db)
+
+    gstdoc = db.query(models.Brand.gstdoc).filter(models.Brand.id == brand_id).scalar()
+    if gstdoc is None:
+        raise HTTPException(status_code=404, detail=f"Brand with ID {brand_id} not found")
+
+    digest = blob_digest(gstdoc)
+    if digest is None:
+        return json_response(gstdoc)
+
+    data = read_gstdoc(gstdoc)
+    if data is None:
+        logger.error("GST document blob %r of brand %s is missing or invalid", digest, brand_id)
+        raise HTTPException(status_code=404, detail=f"GST document of brand {brand_id} is missing")
+
+    # Blob contents never change, so the digest is a strong validator; each
+    # content coding is a different byte sequence and gets its own tag
+    encoding = body_encoding(request.headers.get("accept-encoding"), len(data))
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=data, media_type="application/json", headers=headers)
+
 @router.put("/brands/{brand_id}", response_model=schemas.DisplayBrand)
 async def update_brand(
     brand_id: int,
@@ -129,11 +208,11 @@ async def update_brand(
                    brand_id=brand_id,
                    db=db)
     
-    logger.info(f"Attempting to update brand with ID {brand_id}")
+    logger.info("Attempting to update brand with ID %s", brand_id)
     db_brand = db.query(models.Brand).filter(models.Brand.id == brand_id).first()
 
     if not db_brand:
-        logger.warning(f"Brand with ID {brand_id} not found")
+        logger.warning("Brand with ID %s not found", brand_id)
         raise HTTPException(
             status_code=404,
             detail=f"Brand with ID {brand_id} not found"
@@ -145,7 +224,7 @@ async def update_brand(
 
     db.commit()
     db.refresh(db_brand)
-    logger.info(f"Successfully updated brand with ID {brand_id}")
+    logger.info("Successfully updated brand with ID %s", brand_id)
     return db_brand
 
 @router.delete("/brands/{brand_id}", status_code=200)
@@ -157,11 +236,11 @@ async def delete_brand(
     verify_request(client_id=current_session.client_id, 
                    brand_id=brand_id,
                    db=db)
-    logger.info(f"Attempting to delete brand with ID {brand_id}")
+    logger.info("Attempting to delete brand with ID %s", brand_id)
     db_brand = db.query(models.Brand).filter(models.Brand.id == brand_id).first()
 
     if not db_brand:
-        logger.warning(f"Brand with ID {brand_id} not found for deletion")
+        logger.warning("Brand with ID %s not found for deletion", brand_id)
         raise HTTPException(
             status_code=404,
             detail=f"Brand with ID {brand_id} not found"
@@ -169,7 +248,7 @@ async def delete_brand(
 
     db.delete(db_brand)
     db.commit()
-    logger.info(f"Successfully deleted Brand with ID {brand_id}")
+    logger.info("Successfully deleted Brand with ID %s", brand_id)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -183,101 +262,128 @@ async def delete_brand(
 @router.post("/outlets/", response_model=List[schemas.DisplayOutlet])
 async def create_outlet(
     outlets: List[schemas.OutletCreate], 
+    mode: str = Query(ALL_OR_NOTHING, description="'all-or-nothing' or 'skip-duplicates'"),
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):  
-    logger.info(f"Received request to create {len(outlets)} outlet(s) by client ID: {current_session.client_id}")
-    
-    created_outlets = []
-
-    for outlet in outlets:
-        logger.info(f"Processing outlet: resid={outlet.resid}, aggregator={outlet.aggregator}")
+    logger.info("Received request to create %s outlet(s) by client ID: %s (mode=%s)",
+                len(outlets), current_session.client_id, mode)
 
-        # Check if client exists
-        existing_client = db.query(models.Client).filter(
-            (models.Client.id == outlet.clientid)
-        ).first()
-        if not existing_client:
-            logger.warning(f"Unknown client ID: {outlet.clientid}")
-            raise HTTPException(
-                status_code=400,
-                detail="Unknown client ID passed"
-            )
-        
-        # Check if outlet already exists
-        existing_outlet = db.query(models.Outlet).filter(
-            (models.Outlet.aggregator == outlet.aggregator) &
-            (models.Outlet.resid == outlet.resid)
-        ).first()
-        if existing_outlet:
-            logger.warning(f"Duplicate outlet found: resid={outlet.resid}, aggregator={outlet.aggregator}")
-            raise HTTPException(
-                status_code=400,
-                detail="Res ID already registered"
-            )
-        
-        # Get brand using brand_id
-        if outlet.brandid is not None:
-            db_brand = db.query(models.Brand).filter(models.Brand.id == outlet.brandid).first()
-        else:
-            db_brand = db.query(models.Brand).filter(models.Brand.client_id == outlet.clientid).first()
-            if not db_brand:
-                logger.error(f"Brand not found for client ID: {outlet.clientid}")
-                raise HTTPException(
-                    status_code=404,
-                    detail="Brand not found"
-            )
-            
-        # Generate brand abbreviation
-        brand_name_words = (db_brand.brandname.strip()).split()
-        if len(brand_name_words) > 1:
-            abbreviation = ''.join([word[0].upper() for word in brand_name_words if word])
-        else:
-            abbreviation = db_brand.brandname
-
-        # Create res_shortcode
-        res_shortcode = f"{abbreviation} - {outlet.subzone}"
-
-        db_outlet = models.Outlet(
-            aggregator=outlet.aggregator,
-            resid=outlet.resid,
-            subzone=outlet.subzone,
-            resshortcode=res_shortcode,
-            city=outlet.city,
-            outletnumber=outlet.outletnumber,
-            is_active=outlet.is_active,
-            client_id=outlet.clientid,
-            brand_id=db_brand.id
-        )
-
-        db.add(db_outlet)
-        try:
-            db.commit()
-            db.refresh(db_outlet)
-            created_outlets.append(db_outlet)
-            logger.info(f"Successfully created outlet: resid={db_outlet.resid}, shortcode={db_outlet.resshortcode}")
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Failed to create outlet: resid={outlet.resid}, error={str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to create outlet due to internal error")
+    try:
+        begin_transaction(db)
+        created_outlets = create_outlet_batch(db, outlets, mode)
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error("Failed to create outlets: %s", str(e))
+        raise HTTPException(status_code=500, detail="Failed to create outlet due to internal error")
 
     if not created_outlets:
         logger.warning("No new outlets were created. All were duplicates or failed.")
         raise HTTPException(status_code=400, detail="No outlets were created. All were duplicates.")
 
-    logger.info(f"Successfully created {len(created_outlets)} outlet(s)")
+    for client_id in {outlet.client_id for outlet in created_outlets}:
+        OUTLET_SEARCH.invalidate(client_id)
+        OWNERSHIP_CACHE.invalidate("outlet", client_id)
+    logger.info("Successfully created %s outlet(s)", len(created_outlets))
     return created_outlets
 
-@router.get("/outlets/", response_model=List[schemas.DisplayOutlet])
+@router.post("/outlets/import", response_model=schemas.OutletImportReport)
+async def import_outlets(
+    file: UploadFile = File(..., description="CSV or XLSX with Aggregator, Res_id, Subzone, City columns"),
+    brand_id: Optional[int] = Form(None, description="Brand for rows without a brand column"),
+    client_id: Optional[int] = Form(None, description="Owning client; internal clients only"),
+    dry_run: bool = Form(False, description="Validate and report without inserting"),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk-creates outlets from an uploaded sheet. Valid rows are inserted in
+    one transaction; every row gets an entry in the returned report.
+    """
+    if not current_session.is_internal:
+        client_id = current_session.client_id
+    logger.info("Outlet import of %s requested by client %s (brand=%s, dry_run=%s)",
+                file.filename, current_session.client_id, brand_id, dry_run)
+
+    if brand_id is None and client_id is not None:
+        # Same fallback as create_outlet: the client's first brand
+        brand_id = db.query(models.Brand.id).filter(models.Brand.client_id == client_id).order_by(models.Brand.id).limit(1).scalar()
+
+    importer = OutletImporter(db, client_id, brand_id, dry_run=dry_run)
+    try:
+        begin_transaction(db)
+        report = importer.run(read_outlet_rows(file))
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error("Outlet import failed: %s", str(e))
+        raise HTTPException(status_code=500, detail="Failed to import outlets due to internal error")
+
+    if report.created:
+        OUTLET_SEARCH.invalidate(client_id)
+        OWNERSHIP_CACHE.invalidate("outlet", client_id)
+    logger.info("Outlet import finished: created=%s, failed=%s", report.created, report.failed)
+    return report
+
+@router.post("/brands/{brand_id}/outlets/sync", response_model=schemas.OutletSyncReport)
+async def sync_brand_outlets(
+    brand_id: int,
+    feed: schemas.OutletFeed,
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """
+    Reconciles a brand's outlets with a full aggregator feed: new outlets are
+    inserted, changed ones updated and missing ones deactivated, all in one
+    transaction. ``dry_run`` reports the changes without writing them.
+    """
+    logger.info("Outlet feed sync for brand %s requested by client %s: %s row(s), dry_run=%s",
+                brand_id, current_session.client_id, len(feed.outlets), feed.dry_run)
+    brand = db.query(models.Brand).filter(models.Brand.id == brand_id).first()
+    if not brand:
+        logger.warning("Brand with ID %s not found", brand_id)
+        raise HTTPException(status_code=404, detail=f"Brand with ID {brand_id} not found")
+    if not current_session.is_internal and brand.client_id != current_session.client_id:
+        raise HTTPException(status_code=403, detail="Forbidden: You don't own this brand")
+
+    sync = OutletFeedSync(db, brand, dry_run=feed.dry_run, deactivate_missing=feed.deactivate_missing,
+                          aggregator=feed.aggregator)
+    try:
+        begin_transaction(db)
+        report = sync.run(feed.outlets)
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error("Outlet feed sync failed for brand %s: %s", brand_id, str(e))
+        raise HTTPException(status_code=500, detail="Failed to sync outlets due to internal error")
+
+    if not feed.dry_run and (report.inserted or report.updated or report.deactivated):
+        OUTLET_SEARCH.invalidate(brand.client_id)
+        OWNERSHIP_CACHE.invalidate("outlet", brand.client_id)
+    return report
+
+@router.get("/outlets/", response_model=Union[List[schemas.DisplayOutlet], schemas.OutletPage])
 async def get_outlets(
+    request: Request,
+    response: Response,
     params: schemas.OutletQueryParams = Depends(),
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to get outlets with params : {params}")
+    logger.info("Received request to get outlets for client ID %s (skip=%s, limit=%s)", params.client_id, params.skip, params.limit)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    is_internal_client = current_session.is_internal
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     # Only verify request for non-internal clients
     if not is_internal_client:
@@ -287,12 +393,14 @@ async def get_outlets(
                             outlet_id=params.outlet_id,
                             db=db)
             except Exception as e:
-                logger.error(f"Request verification failed: {str(e)}")
+                logger.error("Request verification failed: %s", str(e))
                 raise HTTPException(
                     status_code=403,
                     detail="Unauthorized access to update outlet"
                 )
 
+    selected = OUTLET_FIELDS.parse(params.fields)
+    check_not_modified(request, response, current_session, ("outlets",), list_tenant(current_session, params.client_id))
     query = db.query(models.Outlet)
 
     # Filter by brand_id (single brand)
@@ -300,21 +408,122 @@ async def get_outlets(
         outlet = query.filter(models.Outlet.id == params.outlet_id).first()
         if outlet is None:
             raise HTTPException(status_code=404, detail="Outlet not found")
-        return [outlet]
+        return json_response(OUTLET_FIELDS.dump([outlet], selected), response)
 
+    filters = FilterSet()
     if not is_internal_client:
-    # Filter by client_id
+        # Filter by client_id
         if params.client_id is not None:
-            query = query.filter(models.Outlet.client_id == params.client_id)
-
-    if params.status == models.StatusEnum.active:
-        query = query.filter(models.Outlet.is_active == True)
-    elif params.status == models.StatusEnum.inactive:
-        query = query.filter(models.Outlet.is_active == False)
+            filters.add("client_id", models.Outlet.client_id == params.client_id)
+
+    if params.status == schemas.StatusEnum.active:
+        filters.add("is_active", models.Outlet.is_active == True)
+    elif params.status == schemas.StatusEnum.inactive:
+        filters.add("is_active", models.Outlet.is_active == False)
+
+    # Column filters and text search
+    filters.add_in("city", models.Outlet.city, csv_values(params.city))
+    filters.add_in("subzone", models.Outlet.subzone, csv_values(params.subzone))
+    filters.add_in("aggregator", models.Outlet.aggregator, csv_values(params.aggregator))
+    filters.add_in("brand_id", models.Outlet.brand_id, csv_ints(params.brand, "brand"))
+    filters.add("search", search_clause(params.search, OUTLET_SEARCH_COLUMNS))
+    sort = parse_sort(params.sort, OUTLET_SORT_COLUMNS)
+    if selected:
+        query = query.options(*OUTLET_FIELDS.options(selected, sort))
 
     # Apply pagination
-    outlets = query.offset(params.skip).limit(params.limit).all()
-    return outlets
+    skip = page_offset(params.page, params.skip, params.limit)
+    outlets, next_cursor = paginate(filters.apply(query), models.Outlet.id, params.limit, skip, params.cursor, sort)
+    set_next_cursor(response, next_cursor)
+
+    # Rows are validated once here and encoded by pydantic-core, not again by response_model
+    items = OUTLET_FIELDS.dump(outlets, selected)
+    if params.with_meta:
+        return json_response({
+            "items": items,
+            "total": count_rows(filters.apply(db.query(models.Outlet)), models.Outlet.id),
+            "facets": facet_counts(lambda: db.query(models.Outlet), filters, OUTLET_FACETS, models.Outlet.id),
+            "next_cursor": next_cursor
+        }, response)
+    return json_response(items, response)
+
+@router.get("/outlets/search", response_model=schemas.OutletSearchPage)
+async def search_outlets(
+    params: schemas.SearchQueryParams = Depends(),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Ranked, typo tolerant search over shortcode, city, subzone and res ID."""
+    tenant_id = search_tenant(current_session, params)
+    ids, total = OUTLET_SEARCH.search(db, params.q, tenant_id, status_filter(params.status),
+                                      max(params.skip, 0), max(params.limit, 1))
+    logger.info("Outlet search for client %s matched %s outlet(s)", tenant_id, total)
+    return schemas.OutletSearchPage(items=load_ranked(db, models.Outlet, ids), total=total)
+
+@router.get("/outlets/export")
+async def export_outlets(
+    params: schemas.ExportQueryParams = Depends(),
+    outlet_status: schemas.StatusEnum = Query(schemas.StatusEnum.all, alias="status"),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Streams every outlet of the tenant as CSV or NDJSON."""
+    tenant_id = export_tenant(current_session, params)
+    statement = (
+        select(
+            models.Outlet.id, models.Outlet.aggregator, models.Outlet.resid, models.Outlet.subzone,
+            models.Outlet.resshortcode, models.Outlet.city, models.Outlet.outletnumber, models.Outlet.is_active,
+            models.Outlet.brand_id, models.Brand.brandname, models.Outlet.client_id,
+            models.Outlet.created_at, models.Outlet.updated_at
+        )
+        .outerjoin(models.Brand, models.Brand.id == models.Outlet.brand_id)
+        .order_by(models.Outlet.id)
+    )
+    if tenant_id is not None:
+        statement = statement.where(models.Outlet.client_id == tenant_id)
+    if outlet_status != schemas.StatusEnum.all:
+        statement = statement.where(models.Outlet.is_active == (outlet_status == schemas.StatusEnum.active))
+
+    logger.info("Outlet export requested by client %s for tenant %s", current_session.client_id, tenant_id)
+    return export_response(db.get_bind(), statement, params.format, export_filename("outlets", tenant_id))
+
+@router.put("/outlets/batch", response_model=List[schemas.DisplayOutlet])
+async def update_outlets(
+    updates: List[schemas.OutletBatchUpdate],
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """
+    Updates many outlets at once. Ownership of every ID is checked with one
+    query, and the changes go out as bulk UPDATEs by primary key.
+    """
+    logger.info("Received request to update %s outlet(s) by client ID %s", len(updates), current_session.client_id)
+    if not updates:
+        return []
+    if len({update.id for update in updates}) != len(updates):
+        raise HTTPException(status_code=400, detail="Each outlet may appear only once per batch")
+
+    is_internal_client = current_session.is_internal
+    owners = verify_ownership(db, None if is_internal_client else current_session.client_id,
+                              {"outlet": [update.id for update in updates]})["outlet"]
+
+    rows = [{"id": update.id, **update.model_dump(exclude_unset=True, exclude={"id"})} for update in updates]
+    # Rows with the same set of columns share one executemany, and only consecutive ones are grouped
+    rows = sorted((row for row in rows if len(row) > 1), key=lambda row: sorted(row))
+    try:
+        begin_transaction(db)
+        if rows:
+            db.execute(sql_update(models.Outlet), rows)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Failed to update outlets: %s", str(e))
+        raise HTTPException(status_code=500, detail="Internal server error while updating outlets")
+
+    for client_id in set(owners.values()):
+        OUTLET_SEARCH.invalidate(client_id)
+    logger.info("Successfully updated %s outlet(s)", len(rows))
+    return db.query(models.Outlet).filter(models.Outlet.id.in_(list(owners))).order_by(models.Outlet.id).all()
 
 @router.put("/outlets/{outlet_id}", response_model=schemas.DisplayOutlet)
 async def update_outlet(
@@ -323,10 +532,10 @@ async def update_outlet(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to update outlet with ID {outlet_id}")
+    logger.info("Received request to update outlet with ID %s", outlet_id)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    is_internal_client = current_session.is_internal
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     if not is_internal_client:
         is_client_same = (
@@ -334,7 +543,7 @@ async def update_outlet(
             hasattr(outlet_update, "client_id") and 
             current_session.client_id == outlet_update.client_id
         )
-        logger.info(f"Client ID match check: {is_client_same}")
+        logger.info("Client ID match check: %s", is_client_same)
 
         if is_client_same:
             try:
@@ -343,25 +552,25 @@ async def update_outlet(
                     outlet_id=outlet_id,
                     db=db
                 )
-                logger.info(f"Request verification successful for client {current_session.client_id}")
+                logger.info("Request verification successful for client %s", current_session.client_id)
             except Exception as e:
-                logger.error(f"Request verification failed: {str(e)}")
+                logger.error("Request verification failed: %s", str(e))
                 raise HTTPException(
                     status_code=403,
                     detail="Unauthorized access to update outlet"
                 )
 
-    logger.info(f"Fetching outlet with ID {outlet_id}")
+    logger.info("Fetching outlet with ID %s", outlet_id)
     db_outlet = db.query(models.Outlet).filter(models.Outlet.id == outlet_id).first()
 
     if not db_outlet:
-        logger.warning(f"Outlet with ID {outlet_id} not found in database")
+        logger.warning("Outlet with ID %s not found in database", outlet_id)
         raise HTTPException(
             status_code=404,
             detail=f"Outlet with ID {outlet_id} not found"
         )
 
-    logger.info(f"Checking for duplicates: aggregator={outlet_update.aggregator}, resid={outlet_update.resid}")
+    logger.info("Checking for duplicates: aggregator=%s, resid=%s", outlet_update.aggregator, outlet_update.resid)
     existing = db.query(models.Outlet).filter(
         models.Outlet.aggregator == outlet_update.aggregator,
         models.Outlet.resid == outlet_update.resid,
@@ -375,16 +584,16 @@ async def update_outlet(
         )
 
     updated_fields = outlet_update.model_dump(exclude_unset=True)
-    logger.info(f"Updating fields: {updated_fields}")
+    logger.info("Updating fields: %s", updated_fields)
     for field, value in updated_fields.items():
         setattr(db_outlet, field, value)
 
     try:
         db.commit()
         db.refresh(db_outlet)
-        logger.info(f"Successfully updated outlet with ID {outlet_id}")
+        logger.info("Successfully updated outlet with ID %s", outlet_id)
     except Exception as e:
-        logger.error(f"Failed to update outlet ID {outlet_id}: {str(e)}")
+        logger.error("Failed to update outlet ID %s: %s", outlet_id, str(e))
         db.rollback()
         raise HTTPException(
             status_code=500,
@@ -399,8 +608,8 @@ async def delete_outlet(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Delete request received for outlet ID {outlet_id} by client ID {current_session.client_id}")
+    is_internal_client = current_session.is_internal
+    logger.info("Delete request received for outlet ID %s by client ID %s", outlet_id, current_session.client_id)
 
     if not is_internal_client:
         try:
@@ -409,15 +618,15 @@ async def delete_outlet(
                 outlet_id=outlet_id,
                 db=db
             )
-            logger.info(f"Request verified for client ID {current_session.client_id} and outlet ID {outlet_id}")
+            logger.info("Request verified for client ID %s and outlet ID %s", current_session.client_id, outlet_id)
         except Exception as e:
-            logger.warning(f"Request verification failed for outlet ID {outlet_id}: {str(e)}")
+            logger.warning("Request verification failed for outlet ID %s: %s", outlet_id, str(e))
             raise
             
     try:
         db_outlet = db.query(models.Outlet).filter(models.Outlet.id == outlet_id).first()
         if not db_outlet:
-            logger.warning(f"Outlet with ID {outlet_id} not found for deletion")
+            logger.warning("Outlet with ID %s not found for deletion", outlet_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"Outlet with ID {outlet_id} not found"
@@ -425,14 +634,14 @@ async def delete_outlet(
 
         db.delete(db_outlet)
         db.commit()
-        logger.info(f"Successfully deleted outlet with ID {outlet_id}")
+        logger.info("Successfully deleted outlet with ID %s", outlet_id)
         return JSONResponse(
             content={"message": f"Outlet with ID {outlet_id} successfully deleted"},
             status_code=200
         )
     except Exception as e:
         db.rollback()
-        logger.error(f"Error occurred while deleting outlet ID {outlet_id}: {str(e)}")
+        logger.error("Error occurred while deleting outlet ID %s: %s", outlet_id, str(e))
         raise HTTPException(
             status_code=500,
             detail="An error occurred while deleting the outlet"
@@ -446,73 +655,78 @@ async def create_users(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to create {len(users)} user(s) by client ID: {current_session.client_id}")
-    
-    created_users = []
-
-    for user in users:
-        logger.info(f"Processing user: username={user.username}, email={user.useremail}, number={user.usernumber}")
+    logger.info("Received request to create %s user(s) by client ID: %s", len(users), current_session.client_id)
 
-        # Check if client exists
-        existing_client = db.query(models.Client).filter(
-            (models.Client.id == user.clientid)
-        ).first()
-        if not existing_client:
-            logger.warning(f"Unknown client ID: {user.clientid}")
-            raise HTTPException(
-                status_code=400,
-                detail="Unknown client ID passed"
-            )
-
-        # Check if user already exists
-        existing_user = db.query(models.User).filter(
-            (models.User.usernumber == user.usernumber) &
-            (models.User.useremail == user.useremail)
-        ).first()
-        if existing_user:
-            logger.warning(f"Duplicate user found: email={user.useremail}, number={user.usernumber}")
-            raise HTTPException(
-                status_code=400,
-                detail="User is already registered"
-            )
-
-        db_user = models.User(
-            username=user.username,
-            usernumber=user.usernumber,
-            useremail=user.useremail,
-            client_id=user.clientid
+    try:
+        begin_transaction(db)
+        report, created_users = create_user_batch(db, users, ALL_OR_NOTHING)
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error("Error while creating users: %s", str(e))
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to create user due to internal error"
         )
 
-        db.add(db_user)
-        try:
-            db.commit()
-            db.refresh(db_user)
-            created_users.append(db_user)
-            logger.info(f"Successfully created user: id={db_user.id}, email={db_user.useremail}")
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error while creating user {user.useremail}: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to create user due to internal error"
-            )
+    if not report.committed:
+        first_failure = next(row for row in report.rows if row.status in ("error", "duplicate"))
+        detail = "Unknown client ID passed" if first_failure.status == "error" else "User is already registered"
+        raise HTTPException(status_code=400, detail=detail)
 
     if not created_users:
         logger.warning("No users were created. All were duplicates or failed.")
         raise HTTPException(status_code=400, detail="No users were created. All were duplicates.")
 
-    logger.info(f"Successfully created {len(created_users)} user(s)")
+    for client_id in {user.client_id for user in created_users}:
+        USER_SEARCH.invalidate(client_id)
+        OWNERSHIP_CACHE.invalidate("user", client_id)
+    logger.info("Successfully created %s user(s)", len(created_users))
     return created_users
 
-@router.get("/users/", response_model=List[schemas.DisplayUser])
+@router.post("/users/batch", response_model=schemas.UserBatchReport)
+async def create_users_batch(
+    users: List[schemas.UserCreate],
+    mode: str = Query(ALL_OR_NOTHING, description="'all-or-nothing' or 'skip-duplicates'"),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Creates users in one transaction and reports the outcome of every row."""
+    logger.info("Received batch of %s user(s) from client ID %s (mode=%s)", len(users), current_session.client_id, mode)
+
+    try:
+        begin_transaction(db)
+        report, created_users = create_user_batch(db, users, mode)
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error("Error while creating user batch: %s", str(e))
+        raise HTTPException(status_code=500, detail="Failed to create users due to internal error")
+
+    for client_id in {user.client_id for user in created_users}:
+        USER_SEARCH.invalidate(client_id)
+        OWNERSHIP_CACHE.invalidate("user", client_id)
+    logger.info("User batch finished: created=%s, failed=%s", report.created, report.failed)
+    return report
+
+@router.get("/users/", response_model=Union[List[schemas.DisplayUser], schemas.UserPage])
 async def read_users(
+    request: Request,
+    response: Response,
     params: schemas.UserQueryParams = Depends(),
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"User list request by client ID: {current_session.client_id} with params: {params.dict()}")
+    logger.info("User list request by client ID: %s for client ID %s (skip=%s, limit=%s)",
+                current_session.client_id, params.client_id, params.skip, params.limit)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
+    is_internal_client = current_session.is_internal
     if not is_internal_client:
         if params.user_id:
             try:
@@ -521,28 +735,86 @@ async def read_users(
                     user_id=params.user_id,
                     db=db
                 )
-                logger.info(f"Request verified for user ID {params.user_id} and client ID {current_session.client_id}")
+                logger.info("Request verified for user ID %s and client ID %s", params.user_id, current_session.client_id)
             except Exception as e:
-                logger.warning(f"Request verification failed for user ID {params.user_id}: {str(e)}")
+                logger.warning("Request verification failed for user ID %s: %s", params.user_id, str(e))
                 raise
 
+    selected = USER_FIELDS.parse(params.fields)
+    check_not_modified(request, response, current_session, ("users",), list_tenant(current_session, params.client_id))
     try:
         query = db.query(models.User)
 
+        filters = FilterSet()
         if not is_internal_client:
             if params.client_id is not None:
-                logger.info(f"Filtering users for client ID {params.client_id}")
-                query = query.filter(models.User.client_id == params.client_id)
-
-        users = query.offset(params.skip).limit(params.limit).all()
-        logger.info(f"Retrieved {len(users)} user(s) with skip={params.skip}, limit={params.limit}")
-
-        return users
-
+                logger.info("Filtering users for client ID %s", params.client_id)
+                filters.add("client_id", models.User.client_id == params.client_id)
+
+        if params.status == schemas.StatusEnum.active:
+            filters.add("is_active", models.User.is_active == True)
+        elif params.status == schemas.StatusEnum.inactive:
+            filters.add("is_active", models.User.is_active == False)
+        filters.add("search", search_clause(params.search, USER_SEARCH_COLUMNS))
+        sort = parse_sort(params.sort, USER_SORT_COLUMNS)
+        if selected:
+            query = query.options(*USER_FIELDS.options(selected, sort))
+
+        skip = page_offset(params.page, params.skip, params.limit)
+        users, next_cursor = paginate(filters.apply(query), models.User.id, params.limit, skip, params.cursor, sort)
+        set_next_cursor(response, next_cursor)
+        logger.info("Retrieved %s user(s) with skip=%s, limit=%s", len(users), skip, params.limit)
+
+        items = USER_FIELDS.dump(users, selected)
+        if params.with_meta:
+            return json_response({
+                "items": items,
+                "total": count_rows(filters.apply(db.query(models.User)), models.User.id),
+                "facets": facet_counts(lambda: db.query(models.User), filters, USER_FACETS, models.User.id),
+                "next_cursor": next_cursor
+            }, response)
+        return json_response(items, response)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error while retrieving users: {str(e)}")
+        logger.error("Error while retrieving users: %s", str(e))
         raise HTTPException(status_code=500, detail="Failed to retrieve users")
 
+@router.get("/users/search", response_model=schemas.UserSearchPage)
+async def search_users(
+    params: schemas.SearchQueryParams = Depends(),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Ranked, typo tolerant search over user name, number and email."""
+    tenant_id = search_tenant(current_session, params)
+    ids, total = USER_SEARCH.search(db, params.q, tenant_id, status_filter(params.status),
+                                    max(params.skip, 0), max(params.limit, 1))
+    logger.info("User search for client %s matched %s user(s)", tenant_id, total)
+    return schemas.UserSearchPage(items=load_ranked(db, models.User, ids), total=total)
+
+@router.get("/users/export")
+async def export_users(
+    params: schemas.ExportQueryParams = Depends(),
+    user_status: schemas.StatusEnum = Query(schemas.StatusEnum.all, alias="status"),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Streams every user of the tenant as CSV or NDJSON."""
+    tenant_id = export_tenant(current_session, params)
+    statement = select(
+        models.User.id, models.User.username, models.User.usernumber, models.User.useremail,
+        models.User.is_active, models.User.client_id, models.User.created_at, models.User.updated_at
+    ).order_by(models.User.id)
+    if tenant_id is not None:
+        statement = statement.where(models.User.client_id == tenant_id)
+    if user_status != schemas.StatusEnum.all:
+        statement = statement.where(models.User.is_active == (user_status == schemas.StatusEnum.active))
+
+    logger.info("User export requested by client %s for tenant %s", current_session.client_id, tenant_id)
+    return export_response(db.get_bind(), statement, params.format, export_filename("users", tenant_id))
+
 @router.put("/users/{user_id}", response_model=schemas.DisplayUser)
 async def update_user(
     user_id: int,
@@ -550,10 +822,10 @@ async def update_user(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to update user with ID {user_id}")
+    logger.info("Received request to update user with ID %s", user_id)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    is_internal_client = current_session.is_internal
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     if not is_internal_client:
         is_client_same = (
@@ -561,7 +833,7 @@ async def update_user(
             hasattr(user_update, "client_id") and 
             current_session.client_id == user_update.client_id
         )
-        logger.info(f"Client ID match check: {is_client_same}")
+        logger.info("Client ID match check: %s", is_client_same)
 
         if is_client_same:
             try:
@@ -570,25 +842,25 @@ async def update_user(
                     user_id=user_id,
                     db=db
                 )
-                logger.info(f"Request verification successful for client {current_session.client_id}")
+                logger.info("Request verification successful for client %s", current_session.client_id)
             except Exception as e:
-                logger.error(f"Request verification failed: {str(e)}")
+                logger.error("Request verification failed: %s", str(e))
                 raise HTTPException(
                     status_code=403,
                     detail="Unauthorized access to update user"
                 )
 
-    logger.info(f"Fetching user with ID {user_id}")
+    logger.info("Fetching user with ID %s", user_id)
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
 
     if not db_user:
-        logger.warning(f"User with ID {user_id} not found in database")
+        logger.warning("User with ID %s not found in database", user_id)
         raise HTTPException(
             status_code=404,
             detail=f"User with ID {user_id} not found"
         )
 
-    logger.info(f"Checking for duplicates: usernumber={user_update.usernumber}")
+    logger.info("Checking for duplicates: usernumber=%s", user_update.usernumber)
     existing = db.query(models.User).filter(
         models.User.usernumber == user_update.usernumber,
         models.User.id != user_id  # exclude current record
@@ -601,16 +873,16 @@ async def update_user(
         )
 
     updated_fields = user_update.model_dump(exclude_unset=True)
-    logger.info(f"Updating fields: {updated_fields}")
+    logger.info("Updating fields: %s", updated_fields)
     for field, value in updated_fields.items():
         setattr(db_user, field, value)
 
     try:
         db.commit()
         db.refresh(db_user)
-        logger.info(f"Successfully updated user with ID {user_id}")
+        logger.info("Successfully updated user with ID %s", user_id)
     except Exception as e:
-        logger.error(f"Failed to update user ID {user_id}: {str(e)}")
+        logger.error("Failed to update user ID %s: %s", user_id, str(e))
         db.rollback()
         raise HTTPException(
             status_code=500,
@@ -625,7 +897,7 @@ async def delete_user(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
+    is_internal_client = current_session.is_internal
     # Only verify request for non-internal clients
     if not is_internal_client:
         try:
@@ -634,19 +906,19 @@ async def delete_user(
                 user_id=user_id,
                 db=db
             )
-            logger.info(f"Request verification successful for client {current_session.client_id}")
+            logger.info("Request verification successful for client %s", current_session.client_id)
         except Exception as e:
-            logger.error(f"Request verification failed: {str(e)}")
+            logger.error("Request verification failed: %s", str(e))
             raise HTTPException(
                 status_code=403,
                 detail="Unauthorized access to update user"
             )
             
-    logger.info(f"Attempting to delete user with ID {user_id}")
+    logger.info("Attempting to delete user with ID %s", user_id)
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
 
     if not db_user:
-        logger.warning(f"User with ID {user_id} not found for deletion")
+        logger.warning("User with ID %s not found for deletion", user_id)
         raise HTTPException(
             status_code=404,
             detail=f"User with ID {user_id} not found"
@@ -654,7 +926,7 @@ async def delete_user(
 
     db.delete(db_user)
     db.commit()
-    logger.info(f"Successfully deleted user with ID {user_id}")
+    logger.info("Successfully deleted user with ID %s", user_id)
     return JSONResponse(
         content={"message": f"User with ID {user_id} successfully deleted"},
         status_code=200
@@ -668,21 +940,21 @@ async def create_service(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to create {len(services)} service(s) by client ID: {current_session.client_id}")
+    logger.info("Received request to create %s service(s) by client ID: %s", len(services), current_session.client_id)
     
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
+    is_internal_client = current_session.is_internal
     if is_internal_client:
         created_services = []
 
         for service in services:
-            logger.info(f"Processing service: servicename={service.servicename}, servicevariant={service.servicevariant}")
+            logger.info("Processing service: servicename=%s, servicevariant=%s", service.servicename, service.servicevariant)
 
             # Check if client exists
             existing_client = db.query(models.Client).filter(
                 (models.Client.id == service.clientid)
             ).first()
             if not existing_client:
-                logger.warning(f"Unknown client ID: {service.clientid}")
+                logger.warning("Unknown client ID: %s", service.clientid)
                 raise HTTPException(
                     status_code=400,
                     detail="Unknown client ID passed"
@@ -694,7 +966,7 @@ async def create_service(
                 (models.Service.servicevariant == service.servicevariant)
             ).first()
             if existing_service:
-                logger.warning(f"Duplicate service found: servicename={service.servicename}, servicevariant={service.servicevariant}")
+                logger.warning("Duplicate service found: servicename=%s, servicevariant=%s", service.servicename, service.servicevariant)
                 raise HTTPException(
                     status_code=400,
                     detail="Service is already registered"
@@ -710,10 +982,10 @@ async def create_service(
                 db.commit()
                 db.refresh(db_service)
                 created_services.append(db_service)
-                logger.info(f"Successfully created service: id={db_service.id}, servicename={db_service.servicename}")
+                logger.info("Successfully created service: id=%s, servicename=%s", db_service.id, db_service.servicename)
             except Exception as e:
                 db.rollback()
-                logger.error(f"Error while creating service {service.servicename}: {str(e)}")
+                logger.error("Error while creating service %s: %s", service.servicename, str(e))
                 raise HTTPException(
                     status_code=500,
                     detail="Failed to create service due to internal error"
@@ -723,7 +995,7 @@ async def create_service(
             logger.warning("No services were created. All were duplicates or failed.")
             raise HTTPException(status_code=400, detail="No services were created. All were duplicates.")
 
-        logger.info(f"Successfully created {len(created_services)} service(s)")
+        logger.info("Successfully created %s service(s)", len(created_services))
         return created_services
     
     else:
@@ -735,23 +1007,32 @@ async def create_service(
 
 @router.get("/services/", response_model=List[schemas.DisplayService])
 async def read_services(
+    response: Response,
     params: schemas.ServiceQueryParams = Depends(),
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Service list request by client ID: {current_session.client_id} with params: {params}")
+    logger.info("Service list request by client ID: %s (service_id=%s, skip=%s, limit=%s)",
+                current_session.client_id, params.service_id, params.skip, params.limit)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
+    is_internal_client = current_session.is_internal
     if is_internal_client:
         try:
-            query = db.query(models.Service)
-            services = query.offset(params.skip).limit(params.limit).all()
-            logger.info(f"Retrieved {len(services)} service(s) with skip={params.skip}, limit={params.limit}")
+            selected = SERVICE_FIELDS.parse(params.fields)
+            services, next_cursor = paginate_list(
+                CATALOGUE.services(db), models.Service.id, params.limit, params.skip, params.cursor
+            )
+            set_next_cursor(response, next_cursor)
+            logger.info("Retrieved %s service(s) with skip=%s, limit=%s", len(services), params.skip, params.limit)
+            if selected:
+                return json_response(SERVICE_FIELDS.dump(services, selected), response)
 
             return services
 
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error while retrieving services: {str(e)}")
+            logger.error("Error while retrieving services: %s", str(e))
             raise HTTPException(status_code=500, detail="Failed to retrieve services")
     
     else:
@@ -762,6 +1043,23 @@ async def read_services(
 
 
 
+@router.get("/services/export")
+async def export_services(
+    params: schemas.ExportQueryParams = Depends(),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    """Streams the service catalogue as CSV or NDJSON (internal clients only)."""
+    if not current_session.is_internal:
+        raise HTTPException(
+            status_code=404,
+            detail="Unauthorized to use this API"
+        )
+    statement = select(
+        models.Service.id, models.Service.servicename, models.Service.servicevariant, models.Service.created_at
+    ).order_by(models.Service.id)
+    return export_response(db.get_bind(), statement, params.format, export_filename("services", None))
+
 @router.put("/services/{service_id}", response_model=schemas.DisplayService)
 async def update_service(
     service_id: int,
@@ -769,23 +1067,23 @@ async def update_service(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Received request to update service with ID {service_id}")
+    logger.info("Received request to update service with ID %s", service_id)
 
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
-    logger.info(f"Client ID {current_session.client_id} is_internal_client={is_internal_client}")
+    is_internal_client = current_session.is_internal
+    logger.info("Client ID %s is_internal_client=%s", current_session.client_id, is_internal_client)
 
     if is_internal_client:
-        logger.info(f"Fetching service with ID {service_id}")
+        logger.info("Fetching service with ID %s", service_id)
         db_service = db.query(models.Service).filter(models.Service.id == service_id).first()
 
         if not db_service:
-            logger.warning(f"Service with ID {service_id} not found in database")
+            logger.warning("Service with ID %s not found in database", service_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"Service with ID {service_id} not found"
             )
 
-        logger.info(f"Checking for duplicates: servicename={service_update.servicename}")
+        logger.info("Checking for duplicates: servicename=%s", service_update.servicename)
         existing = db.query(models.Service).filter(
             models.Service.servicename == service_update.servicename,
             models.Service.servicevariant == service_update.servicevariant,
@@ -799,16 +1097,16 @@ async def update_service(
             )
 
         updated_fields = service_update.model_dump(exclude_unset=True)
-        logger.info(f"Updating fields: {updated_fields}")
+        logger.info("Updating fields: %s", updated_fields)
         for field, value in updated_fields.items():
             setattr(db_service, field, value)
 
         try:
             db.commit()
             db.refresh(db_service)
-            logger.info(f"Successfully updated service with ID {service_id}")
+            logger.info("Successfully updated service with ID %s", service_id)
         except Exception as e:
-            logger.error(f"Failed to update service ID {service_id}: {str(e)}")
+            logger.error("Failed to update service ID %s: %s", service_id, str(e))
             db.rollback()
             raise HTTPException(
                 status_code=500,
@@ -830,14 +1128,14 @@ async def delete_service(
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
-    is_internal_client = current_session.client_id in INTERNAL_CLIENT_IDS
+    is_internal_client = current_session.is_internal
     # Only verify request for non-internal clients
     if is_internal_client:
-        logger.info(f"Attempting to delete service with ID {service_id}")
+        logger.info("Attempting to delete service with ID %s", service_id)
         db_service = db.query(models.Service).filter(models.Service.id == service_id).first()
 
         if not db_service:
-            logger.warning(f"Service with ID {service_id} not found for deletion")
+            logger.warning("Service with ID %s not found for deletion", service_id)
             raise HTTPException(
                 status_code=404,
                 detail=f"Service with ID {service_id} not found"
@@ -845,7 +1143,7 @@ async def delete_service(
 
         db.delete(db_service)
         db.commit()
-        logger.info(f"Successfully deleted service with ID {service_id}")
+        logger.info("Successfully deleted service with ID %s", service_id)
         return JSONResponse(
             content={"message": f"Service with ID {service_id} successfully deleted"},
             status_code=200
@@ -20,7 +20,7 @@ from pydantic import BaseModel
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from typing import Any, Dict, Optional, Tuple
-from logger import create_logger
+from logger import create_logger, current_request_context
 from ..database import models
 from ..database.database import get_db
 from ..schemas import schemas
@@ -322,24 +322,95 @@ def create_session_token_in_db(db: Session, client_id: int, email: str) -> str:
 
     return session_token
 
+# Resolved auth contexts are reused for this many seconds per session token.
+# Logout and client updates evict them in this process; other workers see
+# those changes once the entry expires.
+AUTH_CONTEXT_TTL = int(os.getenv("AUTH_CONTEXT_TTL", "30"))
+
+class AuthContext:
+    """
+    Who is calling: the session and its client, resolved once per request by
+    get_current_session and shared by every handler and dependency.
+    """
+    def __init__(self, session_id: int, client_id: int, email: str, expires_at: datetime,
+                 client_email: str, client_name: str, accesstype: str, client_is_active: bool,
+                 google_linked: bool):
+        self.session_id = session_id
+        self.client_id = client_id
+        self.email = email
+        self.expires_at = expires_at
+        self.client_email = client_email
+        self.client_name = client_name
+        self.accesstype = accesstype
+        self.client_is_active = client_is_active
+        self.google_linked = google_linked
+        self.is_internal = client_id in INTERNAL_CLIENT_IDS
+        self.is_admin = accesstype == "admin"
+
+class AuthContextCache:
+    def __init__(self):
+        self._contexts: Dict[str, Tuple[AuthContext, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_token: str) -> Optional[AuthContext]:
+        entry = self._contexts.get(session_token)
+        if entry is not None:
+            context, cached_at = entry
+            if time.monotonic() - cached_at <= AUTH_CONTEXT_TTL and context.expires_at > datetime.utcnow():
+                self.hits += 1
+                return context
+            self.evict(session_token)
+        self.misses += 1
+        return None
+
+    def put(self, session_token: str, context: AuthContext) -> None:
+        with self._lock:
+            self._contexts[session_token] = (context, time.monotonic())
+
+    def evict(self, session_token: str) -> None:
+        with self._lock:
+            self._contexts.pop(session_token, None)
+
+    def evict_client(self, client_id: int) -> None:
+        with self._lock:
+            for token in [token for token, (context, _) in self._contexts.items() if context.client_id == client_id]:
+                del self._contexts[token]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "entries": len(self._contexts),
+        }
+
+AUTH_CONTEXTS = AuthContextCache()
+
+def session_token_from(request: Request) -> Optional[str]:
+    """Bearer token from the Authorization header, else the session_token cookie."""
+    auth_header = request.headers.get("authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        logger.debug("Session token retrieved from authorization header")
+        return auth_header.split(" ")[1]
+    session_token = request.cookies.get("session_token")
+    if session_token:
+        logger.debug("Session token retrieved from cookies")
+    return session_token
+
 # Helper function to get current session (for use in other routes)
-def get_current_session(request: Request, db: Session = Depends(get_db)):
+def get_current_session(request: Request, db: Session = Depends(get_db)) -> AuthContext:
     """
     Dependency to validate session token and get current user
     Usage: current_session = Depends(get_current_session)
+
+    Session and client are read with one joined query, or come from
+    AUTH_CONTEXTS for a recently seen token.
     """
     logger.info("Checking current session")
-    
-    auth_header = request.headers.get("authorization")
-    session_token = None
-    
-    if auth_header and auth_header.startswith("Bearer "):
-        session_token = auth_header.split(" ")[1]
-        logger.debug("Session token retrieved from authorization header")
-    else:
-        session_token = request.cookies.get("session_token")
-        if session_token:
-            logger.debug("Session token retrieved from cookies")
+    session_token = session_token_from(request)
     
     if not session_token:
         logger.warning("No session token provided in request")
@@ -348,21 +419,36 @@ def get_current_session(request: Request, db: Session = Depends(get_db)):
             detail="No session token provided"
         )
     
-    db_session = db.query(models.UserSession).filter(
-        models.UserSession.session_token == session_token,
-        models.UserSession.is_active == True,
-        models.UserSession.expires_at > datetime.now(timezone.utc)
-    ).first()
-    
-    if not db_session:
-        logger.warning(f"Invalid or expired session token: {session_token}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired session token"
+    context = AUTH_CONTEXTS.get(session_token)
+    if context is None:
+        row = db.query(
+            models.UserSession.id, models.UserSession.client_id, models.UserSession.email,
+            models.UserSession.expires_at, models.Client.email.label("client_email"), models.Client.username,
+            models.Client.accesstype, models.Client.is_active, models.Client.google_linked
+        ).join(models.Client, models.Client.id == models.UserSession.client_id).filter(
+            models.UserSession.session_token == session_token,
+            models.UserSession.is_active == True,
+            models.UserSession.expires_at > datetime.now(timezone.utc)
+        ).first()
+
+        if not row:
+            logger.warning(f"Invalid or expired session token: {session_token}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired session token"
+            )
+        context = AuthContext(
+            session_id=row.id, client_id=row.client_id, email=row.email, expires_at=row.expires_at,
+            client_email=row.client_email, client_name=row.username, accesstype=row.accesstype,
+            client_is_active=row.is_active, google_linked=row.google_linked
         )
+        AUTH_CONTEXTS.put(session_token, context)
     
-    logger.info(f"Valid session for user: {db_session.email}")
-    return db_session
+    logger.info(f"Valid session for user: {context.email}")
+    request_context = current_request_context()
+    if request_context is not None:
+        request_context.client_id = context.client_id
+    return context
 
 def check_existing_session(db: Session, client_id: int) -> Tuple[Optional[dict], bool]:
     """
@@ -968,17 +1054,8 @@ async def logout(request: Request, db: Session = Depends(get_db)):
         logger.info("Logout request received")
 
         # Get session token from authorization header or request body
-        auth_header = request.headers.get("authorization")
-        session_token = None
         print(request.headers.get("authorization"))
-        
-        if auth_header and auth_header.startswith("Bearer "):
-            session_token = auth_header.split(" ")[1]
-            logger.debug("Session token retrieved from authorization header")
-        else:
-            session_token = request.cookies.get("session_token")
-            if session_token:
-                logger.debug("Session token retrieved from cookies")
+        session_token = session_token_from(request)
         
         if not session_token:
             logger.warning("No session token provided in request")
@@ -994,6 +1071,7 @@ async def logout(request: Request, db: Session = Depends(get_db)):
             models.UserSession.is_active == True
         ).first()
         
+        AUTH_CONTEXTS.evict(session_token)
         if db_session:
             db_session.is_active = False
             db.commit()
@@ -1024,36 +1102,23 @@ async def logout(request: Request, db: Session = Depends(get_db)):
 # Example protected route
 @router.post("/protected/profile")
 async def get_profile(
-    current_session = Depends(get_current_session),
-    db: Session = Depends(get_db)
+    current_session: AuthContext = Depends(get_current_session)
 ):
     """
     Example protected route that requires valid session
     """
-    logger.info(f"Fetching profile for client_id: {current_session.client_id}")
-    
-    client = db.query(models.Client).filter(
-        models.Client.id == current_session.client_id
-    ).first()
-    
-    if client:
-        logger.info(f"Profile successfully retrieved for user: {current_session.email}")
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={
-                "message": "Profile retrieved successfully",
-                "profile": {
-                    "email": current_session.email,
-                    "client_id": current_session.client_id,
-                }
+    # get_current_session only resolves sessions whose client exists
+    logger.info(f"Profile successfully retrieved for user: {current_session.email}")
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "message": "Profile retrieved successfully",
+            "profile": {
+                "email": current_session.email,
+                "client_id": current_session.client_id,
             }
-        )
-    else:
-        logger.warning(f"Client not found for client_id: {current_session.client_id}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired session token"
-        )
+        }
+    )
 
 
 #_____________________________ GOOGLE LOGIN FLOW _____________________________
@@ -1342,7 +1407,7 @@ async def callback(code: str, fastapi_request: Request, db: Session = Depends(ge
 async def link_google_account(
     request: Request,
     db: Session = Depends(get_db),
-    current_session = Depends(get_current_session)
+    current_session: AuthContext = Depends(get_current_session)
 ):
     """
     Link the current user's account with Google (set google_linked = True).
@@ -1353,37 +1418,32 @@ async def link_google_account(
         user_email = current_session.email
         logger.info(f"Attempting to link Google for: {user_email}")
 
-        client = db.query(models.Client).filter(models.Client.email == user_email).first()
-
-        if not client:
-            logger.warning(f"Client not found for email: {user_email}")
-            raise HTTPException(status_code=404, detail="Client not found")
-
-        if client.google_linked:
+        user = {
+            "client_id": current_session.client_id,
+            "email": current_session.client_email
+        }
+        if current_session.google_linked:
             logger.info(f"Google already linked for: {user_email}")
             return JSONResponse(
                 status_code=status.HTTP_200_OK,
                 content={
                     "message": "Google account is already linked",
-                    "user": {
-                        "client_id": client.id,
-                        "email": client.email
-                    }
+                    "user": user
                 }
             )
 
-        client.google_linked = True
+        db.query(models.Client).filter(models.Client.id == current_session.client_id).update(
+            {models.Client.google_linked: True}, synchronize_session=False
+        )
         db.commit()
+        AUTH_CONTEXTS.evict_client(current_session.client_id)
         logger.info(f"Google successfully linked for: {user_email}")
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "message": "Google account successfully linked",
-                "user": {
-                    "client_id": client.id,
-                    "email": client.email
-                }
+                "user": user
             }
         )
 
@@ -1593,29 +1653,15 @@ async def register_brand(
 
 @router.get("/user/is-active")
 async def get_user_is_active(
-    current_session = Depends(get_current_session),
-    db: Session = Depends(get_db)
+    current_session: AuthContext = Depends(get_current_session)
 ):
     """
     Returns the is_active status of the current user.
     """
-    logger.info(f"Checking is_active for client_id: {current_session.client_id}")
-
-    client = db.query(models.Client).filter(
-        models.Client.id == current_session.client_id
-    ).first()
-
-    if client:
-        logger.info(f"is_active for user {client.email}: {client.is_active}")
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content={
-                "is_active": client.is_active
-            }
-        )
-    else:
-        logger.warning(f"Client not found for client_id: {current_session.client_id}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired session token"
-        )
\ No newline at end of file
+    logger.info(f"is_active for user {current_session.client_email}: {current_session.client_is_active}")
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "is_active": current_session.client_is_active
+        }
+    )
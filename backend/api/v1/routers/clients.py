@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import List, Optional
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from datetime import datetime
-from .auth import get_current_session
+from .auth import AUTH_CONTEXTS, get_current_session
 from ..database.database import get_db
 from ..schemas import schemas
 from ..database import models
+from ..utils.pagination import paginate, set_next_cursor
+from ..utils.rollups import ROLLUPS, empty_counts
+from ..utils.search_index import CLIENT_SEARCH, load_ranked
 
 router = APIRouter() 
 
@@ -14,14 +16,27 @@ router = APIRouter()
 # READ - Get all clients with pagination and filtering
 @router.get("/", response_model=List[schemas.DisplayClient])
 async def get_clients(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; takes precedence over skip"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     accesstype: Optional[str] = Query(None, description="Filter by access type"),
-    search: Optional[str] = Query(None, description="Search by username or email"),
+    search: Optional[str] = Query(None, description="Ranked, typo tolerant search by username or email"),
     current_session = Depends(get_current_session),
     db: Session = Depends(get_db)
 ):
+    if search and search.strip():
+        # Ranked search through the in-memory index; results are ordered by relevance, not ID
+        filters = {}
+        if is_active is not None:
+            filters["is_active"] = is_active
+        if accesstype:
+            filters["accesstype"] = accesstype
+        ids, total = CLIENT_SEARCH.search(db, search, filters=filters, skip=skip, limit=limit)
+        response.headers["X-Total-Count"] = str(total)
+        return load_ranked(db, models.Client, ids)
+
     query = db.query(models.Client)
     
     # Apply filters
@@ -31,15 +46,8 @@ async def get_clients(
     if accesstype:
         query = query.filter(models.Client.accesstype == accesstype)
     
-    if search:
-        query = query.filter(
-            or_(
-                models.Client.username.ilike(f"%{search}%"),
-                models.Client.email.ilike(f"%{search}%")
-            )
-        )
-    
-    clients = query.offset(skip).limit(limit).all()
+    clients, next_cursor = paginate(query, models.Client.id, limit, skip, cursor)
+    set_next_cursor(response, next_cursor)
     return clients
 
 # READ - Get client by ID
@@ -217,6 +225,7 @@ async def toggle_client_status(
     db_client.updated_at = datetime.now()
     
     db.commit()
+    AUTH_CONTEXTS.evict_client(client_id)
     db.refresh(db_client)
     return db_client
 
@@ -265,6 +274,7 @@ async def soft_delete_client(
     db_client.updated_at = datetime.now()
     
     db.commit()
+    AUTH_CONTEXTS.evict_client(client_id)
     return {"message": f"Client {client_id} has been deactivated"}
 
 # DELETE - Hard delete client (permanent deletion)
@@ -283,6 +293,7 @@ async def delete_client(
     # Note: This will cascade delete all related records due to your model relationships
     db.delete(db_client)
     db.commit()
+    AUTH_CONTEXTS.evict_client(client_id)
     return {"message": f"Client {client_id} has been permanently deleted"}
 
 # UTILITY - Get client statistics
@@ -290,17 +301,20 @@ async def delete_client(
 async def get_client_stats(
     db: Session = Depends(get_db)
 ):
-    total_clients = db.query(models.Client).count()
-    active_clients = db.query(models.Client).filter(models.Client.is_active == True).count()
-    inactive_clients = total_clients - active_clients
-    
-    # Get clients by access type
-    access_types = db.query(models.Client.accesstype, db.func.count(models.Client.id))\
-        .group_by(models.Client.accesstype).all()
-    
-    return {
-        "total_clients": total_clients,
-        "active_clients": active_clients,
-        "inactive_clients": inactive_clients,
-        "clients_by_access_type": dict(access_types)
-    }
+    # One grouped query, cached until the clients table changes
+    return ROLLUPS.get(db, "clients_overview")
+
+# UTILITY - Get outlet, user and mapping counts per client
+@router.get("/stats/counts", response_model=List[dict])
+async def get_client_counts(
+    client_id: Optional[int] = Query(None, description="Counts for one client only"),
+    current_session = Depends(get_current_session),
+    db: Session = Depends(get_db)
+):
+    # Clients only see their own counts
+    if not current_session.is_internal:
+        client_id = current_session.client_id
+    counts = ROLLUPS.get(db, "client_counts")
+    if client_id is not None:
+        return [{"client_id": client_id, **counts.get(client_id, empty_counts())}]
+    return [{"client_id": key, **value} for key, value in sorted(counts.items())]
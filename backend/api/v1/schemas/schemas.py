@@ -1,5 +1,5 @@
 from enum import Enum
-from pydantic import BaseModel, ConfigDict, EmailStr, HttpUrl, SecretStr, Field, constr, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, HttpUrl, SecretStr, Field, TypeAdapter, constr, field_validator, model_validator
 from typing import Any, Dict, Optional, List
 from datetime import date, datetime
 
@@ -98,6 +98,12 @@ class ClientInDB(DisplayClient):
     hashed_password: str
 
 # ______________ BRANDS ____________________
+def no_blob_reference(gstdoc: Optional[Dict]) -> Optional[Dict]:
+    """Client GST documents may not use the key utils/blob_store.py marks stored references with."""
+    if gstdoc is not None and "$blob" in gstdoc:
+        raise ValueError("'$blob' is a reserved key in GST documents")
+    return gstdoc
+
 class BrandBase(BaseModel):
     brandname: str = Field(
         ..., 
@@ -149,6 +155,11 @@ class BrandBase(BaseModel):
         ]
     )
 
+    @field_validator("gstdoc")
+    @classmethod
+    def check_gstdoc(cls, value):
+        return no_blob_reference(value)
+
 
 class BrandCreate(BrandBase):
     pass
@@ -169,8 +180,10 @@ class BrandInDB(DisplayBrand):
 class BrandQueryParams(BaseModel):
     brand_id: Optional[int] = None
     client_id: Optional[int] = None
+    fields: Optional[str] = Field(default=None, description="Comma separated fields to return, e.g. 'id,brandname'")
     skip: int = 0
     limit: int = 100
+    cursor: Optional[str] = None
 
 class UpdateBrand(DisplayBase):
     brandname: Optional[str]
@@ -184,6 +197,11 @@ class UpdateBrand(DisplayBase):
     updated_at: Optional[str]
     client_id: Optional[str]
 
+    @field_validator("gstdoc")
+    @classmethod
+    def check_gstdoc(cls, value):
+        return no_blob_reference(value)
+
 # ______________ OUTLETS ____________________
 class OutletBase(BaseModel):
     aggregator: str = Field(
@@ -257,8 +275,82 @@ class OutletQueryParams(BaseModel):
     outlet_id: Optional[int] = None
     client_id: int = None
     status: StatusEnum = StatusEnum.all
+    city: Optional[str] = Field(default=None, description="Comma separated cities")
+    subzone: Optional[str] = Field(default=None, description="Comma separated subzones")
+    aggregator: Optional[str] = Field(default=None, description="Comma separated aggregators")
+    brand: Optional[str] = Field(default=None, description="Comma separated brand IDs")
+    search: Optional[str] = Field(default=None, description="Matches shortcode, res ID, city or subzone")
+    sort: Optional[str] = Field(default=None, description="e.g. 'city,-resid'; '-' for descending")
+    with_meta: bool = Field(default=False, description="Wrap the page with total and facet counts")
+    fields: Optional[str] = Field(default=None, description="Comma separated fields to return, e.g. 'id,resshortcode'")
+    page: Optional[int] = Field(default=None, description="1-based page number; overrides skip")
     skip: int = 0
     limit: int = 100
+    cursor: Optional[str] = None
+
+class OutletPage(BaseModel):
+    items: List[DisplayOutlet]
+    total: int
+    facets: Dict[str, Dict[str, int]] = {}
+    next_cursor: Optional[str] = None
+
+class OutletImportRow(BaseModel):
+    row: int
+    aggregator: Optional[str] = None
+    resid: Optional[str] = None
+    status: str = Field(..., description="created, valid (dry run), duplicate or error")
+    detail: Optional[str] = None
+
+class OutletImportReport(BaseModel):
+    created: int
+    failed: int
+    dry_run: bool
+    rows: List[OutletImportRow]
+
+class OutletFeedItem(BaseModel):
+    aggregator: str = Field(..., min_length=2, max_length=50)
+    resid: str = Field(..., pattern=r'^\d+$', min_length=3, max_length=20)
+    subzone: str = Field(..., min_length=2, max_length=50)
+    city: str = Field(..., max_length=50)
+    outletnumber: Optional[str] = Field(default=None, max_length=20)
+    is_active: bool = True
+
+class OutletFeed(BaseModel):
+    outlets: List[OutletFeedItem]
+    aggregator: Optional[str] = Field(default=None, description="Only sync (and deactivate) this aggregator's outlets")
+    deactivate_missing: bool = Field(default=True, description="Deactivate brand outlets absent from the feed")
+    dry_run: bool = False
+
+class OutletSyncChange(BaseModel):
+    aggregator: str
+    resid: str
+    action: str = Field(..., description="insert, update, deactivate or conflict")
+    fields: List[str]
+
+class OutletSyncReport(BaseModel):
+    inserted: int
+    updated: int
+    deactivated: int
+    unchanged: int
+    repeated: int
+    conflicts: List[OutletSyncChange]
+    changes: List[OutletSyncChange]
+    dry_run: bool
+
+class OutletBatchUpdate(BaseModel):
+    id: int
+    subzone: Optional[str] = Field(default=None, min_length=2, max_length=50)
+    city: Optional[str] = Field(default=None, max_length=50)
+    outletnumber: Optional[str] = Field(default=None, max_length=20)
+    is_active: Optional[bool] = None
+
+    @field_validator("subzone", "city", "outletnumber", "is_active")
+    @classmethod
+    def not_null(cls, value):
+        # Omitted fields are left unchanged; the columns themselves are NOT NULL
+        if value is None:
+            raise ValueError("may not be null; omit the field to leave it unchanged")
+        return value
 
 class UpdateOutlet(DisplayBase):
     aggregator: Optional[str]
@@ -300,8 +392,15 @@ class UserCreate(UserBase):
 class UserQueryParams(BaseModel):
     user_id: Optional[int] = None
     client_id: Optional[int] = None
+    status: StatusEnum = StatusEnum.all
+    search: Optional[str] = Field(default=None, description="Matches name, number or email")
+    sort: Optional[str] = Field(default=None, description="e.g. 'username,-created_at'; '-' for descending")
+    with_meta: bool = Field(default=False, description="Wrap the page with total and facet counts")
+    fields: Optional[str] = Field(default=None, description="Comma separated fields to return, e.g. 'id,username'")
+    page: Optional[int] = Field(default=None, description="1-based page number; overrides skip")
     skip: int = 0
     limit: int = 100
+    cursor: Optional[str] = None
 
 class DisplayUser(DisplayBase):
     id: int
@@ -315,12 +414,53 @@ class DisplayUser(DisplayBase):
     def __str__(self):
         return f"User {self.username} ({self.useremail})"
 
+class UserPage(BaseModel):
+    items: List[DisplayUser]
+    total: int
+    facets: Dict[str, Dict[str, int]] = {}
+    next_cursor: Optional[str] = None
+
+class UserBatchRow(BaseModel):
+    index: int
+    usernumber: Optional[str] = None
+    useremail: Optional[str] = None
+    status: str = Field(..., description="created, duplicate, error or rolled_back")
+    detail: Optional[str] = None
+    user_id: Optional[int] = None
+
+class UserBatchReport(BaseModel):
+    created: int
+    failed: int
+    committed: bool
+    rows: List[UserBatchRow]
+
 class UpdateUser(DisplayBase):
     username: Optional[str]
     usernumber: Optional[str]
     useremail: Optional[str]
     client_id: Optional[int]
 
+# ______________ SEARCH ____________________
+class SearchQueryParams(BaseModel):
+    q: str = Field(..., description="Search text; prefix and typo tolerant")
+    client_id: Optional[int] = Field(default=None, description="Tenant to search; internal clients only")
+    status: StatusEnum = StatusEnum.all
+    skip: int = 0
+    limit: int = 20
+
+class OutletSearchPage(BaseModel):
+    items: List[DisplayOutlet]
+    total: int
+
+class UserSearchPage(BaseModel):
+    items: List[DisplayUser]
+    total: int
+
+# ______________ EXPORT ____________________
+class ExportQueryParams(BaseModel):
+    client_id: Optional[int] = Field(default=None, description="Tenant to export; internal clients only")
+    format: str = Field(default="csv", description="'csv' or 'ndjson'")
+
 # ______________ SERVICES ____________________
 class ServiceBase(BaseModel):
     servicename: str = Field(
@@ -347,8 +487,10 @@ class ServiceCreate(ServiceBase):
 
 class ServiceQueryParams(BaseModel):
     service_id: Optional[int] = None
+    fields: Optional[str] = Field(default=None, description="Comma separated fields to return, e.g. 'id,servicename'")
     skip: int = 0
     limit: int = 100
+    cursor: Optional[str] = None
 
 class UpdateService(BaseModel):
     id: int
@@ -397,8 +539,12 @@ class QueryOutletService(BaseModel):
     outlet_id: Optional[int] = None
     service_id: Optional[int] = None
     grouped: bool = True
+    search: Optional[str] = Field(default=None, description="Text search across the mapped entities")
+    with_meta: bool = Field(default=False, description="Wrap the page with the total count")
+    fields: Optional[str] = Field(default=None, description="Comma separated fields to return, e.g. 'mapping_id,resshortcode'")
     skip: int = 0
     limit: int = 100
+    cursor: Optional[str] = None
 
 class UpdateOutletServiceMapping(OutletServiceCreate):
     id: int
@@ -435,8 +581,12 @@ class QueryUserService(BaseModel):
     user_id: Optional[int] = None
     service_id: Optional[int] = None
     grouped: bool = True
+    search: Optional[str] = Field(default=None, description="Text search across the mapped entities")
+    with_meta: bool = Field(default=False, description="Wrap the page with the total count")
+    fields: Optional[str] = Field(default=None, description="Comma separated fields to return, e.g. 'mapping_id,username'")
     skip: int = 0
     limit: int = 100
+    cursor: Optional[str] = None
 
 class UpdateUserServiceMapping(UserServiceCreate):
     id: int
@@ -481,8 +631,121 @@ class QueryUserOutlet(BaseModel):
     grouped: bool = False
     user_id: Optional[int] = None
     outlet_id: Optional[int] = None
+    search: Optional[str] = Field(default=None, description="Text search across the mapped entities")
+    with_meta: bool = Field(default=False, description="Wrap the page with the total count")
+    fields: Optional[str] = Field(default=None, description="Comma separated fields to return, e.g. 'mapping_id,name'")
     skip: int = 0
     limit: int = 100
+    cursor: Optional[str] = None
 
 class UpdateUserOutletMapping(UserOutletCreate):
     id: int
+
+
+# ______________ BULK MAPPINGS ____________________
+class OutletRef(BaseModel):
+    """An outlet given by ID or by its (aggregator, resid) natural key."""
+    id: Optional[int] = None
+    aggregator: Optional[str] = None
+    resid: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_key(self):
+        if self.id is None and not (self.aggregator and self.resid):
+            raise ValueError("Give an outlet id or both aggregator and resid")
+        return self
+
+class UserRef(BaseModel):
+    """A user given by ID or by usernumber."""
+    id: Optional[int] = None
+    usernumber: Optional[str] = None
+
+    @field_validator("usernumber", mode="before")
+    @classmethod
+    def number_as_text(cls, value):
+        return None if value is None else str(value)
+
+    @model_validator(mode="after")
+    def check_key(self):
+        if self.id is None and not self.usernumber:
+            raise ValueError("Give a user id or usernumber")
+        return self
+
+class ServiceRef(BaseModel):
+    """A service given by ID or by (servicename, servicevariant)."""
+    id: Optional[int] = None
+    servicename: Optional[str] = None
+    servicevariant: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_key(self):
+        if self.id is None and not (self.servicename and self.servicevariant):
+            raise ValueError("Give a service id or both servicename and servicevariant")
+        return self
+
+class OutletServicePair(BaseModel):
+    outlet: OutletRef
+    service: ServiceRef
+
+class UserServicePair(BaseModel):
+    user: UserRef
+    service: ServiceRef
+
+class UserOutletPair(BaseModel):
+    user: UserRef
+    outlet: OutletRef
+
+class BulkOutletServiceMappings(BaseModel):
+    """Maps every outlet to every service, plus any explicit pairs."""
+    client_id: int
+    outlets: List[OutletRef] = []
+    services: List[ServiceRef] = []
+    pairs: List[OutletServicePair] = []
+
+class BulkUserServiceMappings(BaseModel):
+    """Maps every user to every service, plus any explicit pairs."""
+    client_id: int
+    users: List[UserRef] = []
+    services: List[ServiceRef] = []
+    pairs: List[UserServicePair] = []
+
+class BulkUserOutletMappings(BaseModel):
+    """Maps every user to every outlet, plus any explicit pairs."""
+    client_id: int
+    users: List[UserRef] = []
+    outlets: List[OutletRef] = []
+    pairs: List[UserOutletPair] = []
+
+class BulkMappingResult(BaseModel):
+    requested: int
+    created: int
+    existing: int
+
+class MappingSet(BaseModel):
+    """The complete desired set of mapped IDs; anything not listed is unmapped."""
+    ids: List[int]
+    dry_run: bool = False
+
+class MappingDelta(BaseModel):
+    added: List[int]
+    removed: List[int]
+    unchanged: int
+    dry_run: bool
+
+class MappingDeleteBatch(BaseModel):
+    outlet_service_ids: List[int] = []
+    user_service_ids: List[int] = []
+    user_outlet_ids: List[int] = []
+
+class MappingDeleteResult(BaseModel):
+    outlet_service: int
+    user_service: int
+    user_outlet: int
+
+
+# ============== LIST SERIALISERS ==============
+# Built once at import; validate_python(rows, from_attributes=True) turns ORM
+# rows into models in a single pass for utils.serialization.json_response
+OUTLET_LIST = TypeAdapter(List[DisplayOutlet])
+USER_LIST = TypeAdapter(List[DisplayUser])
+OUTLET_SERVICE_LIST = TypeAdapter(List[DisplayOutletService])
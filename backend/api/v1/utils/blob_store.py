@@ -0,0 +1,133 @@
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+import orjson
+from sqlalchemy import String, cast, event, func
+from sqlalchemy.orm import Session, undefer
+
+from ..database import models
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+# Content-addressed files live under this directory, one per distinct document
+GSTDOC_BLOB_DIR = os.getenv("GSTDOC_BLOB_DIR", str(Path(__file__).resolve().parents[3] / "storage" / "gstdocs"))
+# GST documents that encode to more bytes than this are kept off the brand row
+GSTDOC_INLINE_MAX = int(os.getenv("GSTDOC_INLINE_MAX", "8192"))
+
+BLOB_KEY = "$blob"
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    """
+    Immutable byte blobs on local disk addressed by their SHA-256 digest,
+    stored as ``<root>/<first two hex digits>/<digest>``. Equal content is
+    written once; files are written to a temporary name and renamed, so a
+    reader never sees a partial blob.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        if not isinstance(digest, str) or not _DIGEST.match(digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            return digest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """The blob's bytes; None when it is missing or ``digest`` is not a valid digest."""
+        try:
+            return self.path(digest).read_bytes()
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+BLOBS = BlobStore(GSTDOC_BLOB_DIR)
+
+
+def blob_digest(gstdoc: Any) -> Optional[str]:
+    """The digest a stored ``gstdoc`` value refers to, or None when the document is inline."""
+    if isinstance(gstdoc, dict) and set(gstdoc) == {BLOB_KEY, "bytes"}:
+        return gstdoc[BLOB_KEY]
+    return None
+
+
+def offload_gstdoc(gstdoc: Any) -> Any:
+    """
+    The value to store in ``Brand.gstdoc``: the document itself when it is
+    small, else a ``{"$blob": digest, "bytes": size}`` reference to a copy
+    in the blob store.
+    """
+    if gstdoc is None or blob_digest(gstdoc) is not None:
+        return gstdoc
+    data = orjson.dumps(gstdoc, option=orjson.OPT_SORT_KEYS)
+    if len(data) <= GSTDOC_INLINE_MAX:
+        return gstdoc
+    return {BLOB_KEY: BLOBS.put(data), "bytes": len(data)}
+
+
+def read_gstdoc(gstdoc: Any) -> Optional[bytes]:
+    """JSON bytes of a stored ``gstdoc`` value, read from the blob store for references; None if the blob is missing or invalid."""
+    digest = blob_digest(gstdoc)
+    if digest is None:
+        return orjson.dumps(gstdoc)
+    return BLOBS.get(digest)
+
+
+def offload_gstdocs(db: Session) -> int:
+    """
+    Moves existing inline GST documents over ``GSTDOC_INLINE_MAX`` into the
+    blob store. Safe to run on every startup; returns the number of brands
+    rewritten.
+    """
+    candidates = (
+        db.query(models.Brand)
+        .options(undefer(models.Brand.gstdoc))
+        .filter(func.length(cast(models.Brand.gstdoc, String)) > GSTDOC_INLINE_MAX)
+        .all()
+    )
+    moved = 0
+    for brand in candidates:
+        stored = offload_gstdoc(brand.gstdoc)
+        if stored is brand.gstdoc:
+            continue
+        brand.gstdoc = stored
+        moved += 1
+    if moved:
+        db.commit()
+    return moved
+
+
+#__________________ Offload documents as brands are written __________________
+@event.listens_for(Session, "before_flush")
+def _offload_brand_gstdocs(session, flush_context, instances):
+    for row in (*session.new, *session.dirty):
+        if not isinstance(row, models.Brand):
+            continue
+        # Deferred and not assigned: nothing to offload, and reading it would load it
+        if "gstdoc" not in row.__dict__:
+            continue
+        stored = offload_gstdoc(row.gstdoc)
+        if stored is not row.gstdoc:
+            logger.debug("Storing GST document of brand %s as blob %s", row.brandname, stored[BLOB_KEY])
+            row.gstdoc = stored
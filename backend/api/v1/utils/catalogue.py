@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..database import models
+from ..schemas import schemas
+from .outlet_bulk import brand_abbreviation
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+# Snapshots are rebuilt after this many seconds, so writes made by other
+# worker processes are eventually seen.
+CATALOGUE_CACHE_TTL = int(os.getenv("CATALOGUE_CACHE_TTL", "60"))
+
+
+class CatalogueSnapshot:
+    """One immutable load of the service catalogue and brand directory."""
+
+    def __init__(self, version: int, services: List[schemas.DisplayService], brands: List[dict]):
+        self.version = version
+        self.services = services
+        self.services_by_id = {service.id: service for service in services}
+        # Brand directory entries as served by /admin/brands/names-and-ids
+        self.brand_names = [{"brand_name": brand["abbreviation"], "id": brand["id"]} for brand in brands]
+        self.brands_by_id = {brand["id"]: brand for brand in brands}
+        self.loaded_at = time.monotonic()
+
+
+class CatalogueCache:
+    """
+    Per-process copy of the small, read-mostly reference tables: every
+    service and, per brand, its name, owner and precomputed abbreviation.
+
+    Reads are served from the current snapshot without touching the
+    database; the first read after :meth:`invalidate` (or after
+    ``CATALOGUE_CACHE_TTL``) rebuilds it with one query per table. Every
+    invalidation bumps ``version``, and a rebuild is only published if the
+    version it started from is still current. Committed ORM writes to
+    services and brands invalidate it through the session hooks below.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def _load(self, db: Session) -> CatalogueSnapshot:
+        with self._lock:
+            version = self._version
+        services = [
+            schemas.DisplayService.model_validate(service)
+            for service in db.query(models.Service).order_by(models.Service.id)
+        ]
+        brands = [
+            {"id": row.id, "brandname": row.brandname, "client_id": row.client_id,
+             "abbreviation": brand_abbreviation(row.brandname)}
+            for row in db.query(models.Brand.id, models.Brand.brandname, models.Brand.client_id).order_by(models.Brand.id)
+        ]
+        snapshot = CatalogueSnapshot(version, services, brands)
+        with self._lock:
+            self.loads += 1
+            # An invalidation that raced with the load wins; the next read reloads
+            if self._version == version:
+                self._snapshot = snapshot
+        logger.debug("Loaded catalogue version %s: %s service(s), %s brand(s)", snapshot.version, len(services), len(brands))
+        return snapshot
+
+    def snapshot(self, db: Session) -> CatalogueSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > CATALOGUE_CACHE_TTL:
+            return self._load(db)
+        self.hits += 1
+        return snapshot
+
+    def services(self, db: Session) -> List[schemas.DisplayService]:
+        return self.snapshot(db).services
+
+    def service(self, db: Session, service_id: int) -> Optional[schemas.DisplayService]:
+        """One service by ID; an ID missing from the snapshot is looked up on its own, as another worker may have just created it."""
+        service = self.snapshot(db).services_by_id.get(service_id)
+        if service is None:
+            row = db.query(models.Service).filter(models.Service.id == service_id).first()
+            service = schemas.DisplayService.model_validate(row) if row else None
+        return service
+
+    def brand_names(self, db: Session) -> List[dict]:
+        return self.snapshot(db).brand_names
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+            self._version += 1
+
+    def stats(self) -> Dict[str, object]:
+        snapshot = self._snapshot
+        lookups = self.hits + self.loads
+        return {
+            "hits": self.hits,
+            "loads": self.loads,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "version": snapshot.version if snapshot else None,
+            "services": len(snapshot.services) if snapshot else 0,
+            "brands": len(snapshot.brands_by_id) if snapshot else 0,
+        }
+
+
+CATALOGUE = CatalogueCache()
+CATALOGUE_MODELS = (models.Service, models.Brand)
+
+
+#__________________ Drop the snapshot when services or brands change __________________
+@event.listens_for(Session, "after_flush")
+def _collect_catalogue_changes(session, flush_context):
+    if any(isinstance(row, CATALOGUE_MODELS) for rows in (session.new, session.dirty, session.deleted) for row in rows):
+        session.info["catalogue_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_catalogue_changes(session):
+    if session.info.pop("catalogue_changed", False):
+        CATALOGUE.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalogue_changes(session):
+    session.info.pop("catalogue_changed", None)
@@ -0,0 +1,242 @@
+import gzip
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Complete bodies smaller than this are sent as they are
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Upper bound on the bytes held by the precompressed response cache (0 disables it)
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", str(32 * 1024 * 1024)))
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+class _GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, more: bool) -> bytes:
+        # A sync flush per chunk lets the client decode each chunk as it arrives
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH if more else zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes, more: bool) -> bytes:
+        return self._compressor.process(data) + (self._compressor.flush() if more else self._compressor.finish())
+
+
+class _ZstdStream:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes, more: bool) -> bytes:
+        mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK if more else zstandard.COMPRESSOBJ_FLUSH_FINISH
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+# Content-Encoding -> (one-shot compressor, streaming compressor), in server preference order
+CODECS = {}
+if zstandard is not None:
+    CODECS["zstd"] = (lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), _ZstdStream)
+if brotli is not None:
+    CODECS["br"] = (lambda data: brotli.compress(data, quality=BROTLI_QUALITY), _BrotliStream)
+CODECS["gzip"] = (lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0), _GzipStream)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Picks the available encoding the client rates highest (ties go to server preference); None for identity."""
+    if not accept_encoding:
+        return None
+    ratings: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        ratings[name.strip().lower()] = quality
+    wildcard = ratings.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for name in CODECS:
+        quality = ratings.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def body_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """
+    The encoding :class:`CompressionMiddleware` applies to a complete
+    compressible body of ``size`` bytes; None when it is sent as is. Lets a
+    handler give each encoding its own strong ETag.
+    """
+    if size < COMPRESSION_MIN_SIZE:
+        return None
+    return negotiate(accept_encoding)
+
+
+class PrecompressedCache:
+    """
+    Compressed bodies of complete responses that carry an ETag, keyed by
+    ``(etag, encoding)`` and evicted least recently used past
+    ``COMPRESSION_CACHE_BYTES``. Each entry keeps a digest of the
+    uncompressed body, so a body that differs under the same ETag is
+    compressed again rather than served stale.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[bytes, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str, encoding: str, digest: bytes) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get((etag, encoding))
+            if entry is None or entry[0] != digest:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((etag, encoding))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, etag: str, encoding: str, digest: bytes, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((etag, encoding), None)
+            if previous is not None:
+                self._size -= len(previous[1])
+            self._entries[(etag, encoding)] = (digest, data)
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+
+PRECOMPRESSED = PrecompressedCache(COMPRESSION_CACHE_BYTES)
+
+
+def _compressible(status_code: int, headers: Headers) -> bool:
+    if status_code in (204, 304) or "content-encoding" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", ""):
+        return False
+    return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+
+def compress_body(body: bytes, encoding: str, etag: Optional[str]) -> bytes:
+    """One-shot compression of a complete body, through the precompressed cache when it has an ETag."""
+    compress = CODECS[encoding][0]
+    if not etag or PRECOMPRESSED.max_bytes <= 0:
+        return compress(body)
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+    data = PRECOMPRESSED.get(etag, encoding, digest)
+    if data is None:
+        data = compress(body)
+        PRECOMPRESSED.put(etag, encoding, digest, data)
+    return data
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing JSON, NDJSON and text responses with
+    the best encoding both sides support (zstd and Brotli when their
+    packages are installed, gzip always).
+
+    A response sent in one piece is compressed whole if it reaches
+    ``COMPRESSION_MIN_SIZE``; a streamed response (exports) is compressed
+    chunk by chunk with a flush after each, so nothing is buffered and
+    the client can decode rows as they arrive.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        start = None
+        stream = None
+
+        async def send_compressed(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if start is None:
+                if stream is not None:
+                    more = message.get("more_body", False)
+                    message = {**message, "body": stream.compress(message.get("body", b""), more)}
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            body, more = message.get("body", b""), message.get("more_body", False)
+            initial, start = start, None
+            if not _compressible(initial["status"], headers):
+                await send(initial)
+                await send(message)
+                return
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            if encoding is None or (not more and len(body) < COMPRESSION_MIN_SIZE):
+                await send(initial)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            if not more:
+                data = compress_body(body, encoding, headers.get("etag"))
+                headers["Content-Length"] = str(len(data))
+                await send(initial)
+                await send({**message, "body": data})
+                return
+            del headers["Content-Length"]
+            stream = CODECS[encoding][1]()
+            await send(initial)
+            await send({**message, "body": stream.compress(body, more)})
+
+        await self.app(scope, receive, send_compressed)
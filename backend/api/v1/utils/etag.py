@@ -0,0 +1,175 @@
+import hashlib
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Sequence
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..database import models
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+# Versions are per process. Every ETag also changes once per this many
+# seconds, so a write handled by another worker is seen within that window
+# (0 disables the rollover for single-process deployments).
+ETAG_VERSION_TTL = int(os.getenv("ETAG_VERSION_TTL", "30"))
+CACHE_CONTROL = "private, no-cache"
+
+# Tracked tables: model -> (table, attribute naming the owning client or None)
+VERSIONED_MODELS = {
+    models.Client: ("clients", "id"),
+    models.Brand: ("brands", "client_id"),
+    models.Outlet: ("outlets", "client_id"),
+    models.User: ("users", "client_id"),
+    models.Service: ("services", None),
+    models.OutletService: ("outlet_services", "client_id"),
+    models.UserService: ("user_services", "client_id"),
+    models.UserOutlet: ("user_outlets", "client_id"),
+}
+VERSIONED_TABLES = {table: tenant for table, tenant in VERSIONED_MODELS.values()}
+
+
+class TableVersions:
+    """
+    Change counters per table and per (table, client).
+
+    A committed write to a known client's rows bumps that client's counter;
+    a write whose rows' owners are unknown (bulk SQL by ID, untenanted
+    tables) bumps the table's generation, which is part of every client's
+    version. Table-wide views use a counter bumped by any write.
+    """
+
+    def __init__(self):
+        self._tenants: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._tables: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        # Distinguishes this process's counters from those of earlier runs
+        self.boot = secrets.token_hex(4)
+        self.bumps = 0
+
+    def bump(self, table: str, client_ids: Optional[Iterable[int]] = None) -> None:
+        with self._lock:
+            self._tables[table] += 1
+            self.bumps += 1
+            if client_ids is None:
+                self._generations[table] += 1
+                return
+            tenants = self._tenants[table]
+            for client_id in set(client_ids):
+                tenants[client_id] = tenants.get(client_id, 0) + 1
+
+    def version(self, table: str, client_id: Optional[int] = None) -> str:
+        if client_id is None:
+            return str(self._tables[table])
+        return f"{self._generations[table]}.{self._tenants[table].get(client_id, 0)}"
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "bumps": self.bumps,
+            "tables": dict(self._tables),
+            "tenants": {table: len(tenants) for table, tenants in self._tenants.items()},
+        }
+
+
+TABLE_VERSIONS = TableVersions()
+
+
+def list_etag(request: Request, caller_id: int, tables: Sequence[str], client_id: Optional[int]) -> str:
+    """Weak ETag for one list representation: the tables' versions, the caller and the full URL."""
+    parts = [TABLE_VERSIONS.boot, str(caller_id), str(request.url.path), str(request.url.query)]
+    parts += [f"{table}={TABLE_VERSIONS.version(table, client_id)}" for table in tables]
+    if ETAG_VERSION_TTL > 0:
+        parts.append(str(int(time.time() // ETAG_VERSION_TTL)))
+    digest = hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison: W/ prefixes are ignored
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag.removeprefix("W/") for value in candidates)
+
+
+def check_not_modified(request: Request, response: Response, current_session,
+                       tables: Sequence[str], client_id: Optional[int] = None) -> None:
+    """
+    Conditional GET for a list endpoint. Sets ``ETag`` on ``response``, or
+    raises 304 when the request's ``If-None-Match`` already names it, before
+    the list is queried or serialised. ``client_id`` scopes the versions to
+    one tenant; None uses table-wide versions.
+
+    The version is read before the list, so a write committed in between
+    only makes the ETag older than the body, which costs one extra refetch.
+    """
+    etag = list_etag(request, current_session.client_id, tables, client_id)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        logger.debug("Not modified: %s %s", request.url.path, etag)
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED,
+                            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def list_tenant(current_session, client_id: Optional[int]) -> Optional[int]:
+    """The client a list is scoped to: the ``client_id`` filter non-internal callers pass, else None."""
+    if current_session.is_internal:
+        return None
+    return client_id
+
+
+#__________________ Bump versions for committed writes __________________
+def _changes(session) -> list:
+    return session.info.setdefault("table_changes", [])
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_row_changes(session, flush_context):
+    changes = _changes(session)
+    for rows in (session.new, session.dirty, session.deleted):
+        for row in rows:
+            versioned = VERSIONED_MODELS.get(type(row))
+            if versioned is None:
+                continue
+            table, tenant = versioned
+            if tenant is None:
+                changes.append((table, None))
+                continue
+            owners = {getattr(row, tenant)}
+            # A row moved to another client changes both clients' lists
+            owners.update(inspect(row).attrs[tenant].history.deleted or ())
+            changes.append((table, owners))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_changes(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement.table, "name", None)
+    if table not in VERSIONED_TABLES:
+        return
+    tenant = VERSIONED_TABLES[table]
+    parameters = orm_execute_state.parameters
+    rows = parameters if isinstance(parameters, list) else [parameters] if parameters else []
+    owners = None
+    # Inserts name their owners; updates and deletes by ID or filter do not
+    if orm_execute_state.is_insert and tenant and rows and all(tenant in row for row in rows):
+        owners = {row[tenant] for row in rows}
+    _changes(orm_execute_state.session).append((table, owners))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_table_changes(session):
+    for table, owners in session.info.pop("table_changes", []):
+        TABLE_VERSIONS.bump(table, owners)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_table_changes(session):
+    session.info.pop("table_changes", None)
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Iterator, Sequence
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.engine import Engine
+
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+# Rows fetched from the server-side cursor (and written to the client) per chunk
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "value"):  # Enum
+        return value.value
+    return value
+
+
+def _csv_chunks(headers: Sequence[str], partitions) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for rows in partitions:
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _ndjson_chunks(headers: Sequence[str], partitions) -> Iterator[str]:
+    for rows in partitions:
+        yield "".join(
+            json.dumps({key: _plain(value) for key, value in zip(headers, row)}, default=str) + "\n"
+            for row in rows
+        )
+
+
+def stream_rows(engine: Engine, statement: Select, export_format: str) -> Iterator[str]:
+    """
+    Runs ``statement`` once on a dedicated connection and yields encoded
+    chunks as rows arrive.
+
+    The rows come through a server-side cursor (``yield_per``), so memory
+    stays flat however large the table is, and because the export is a
+    single SELECT it reads one consistent snapshot of the data.
+    """
+    headers = list(statement.selected_columns.keys())
+    exported = 0
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=EXPORT_CHUNK_ROWS).execute(statement)
+
+        def counted_partitions():
+            nonlocal exported
+            for rows in result.partitions():
+                exported += len(rows)
+                yield rows
+
+        encoder = _csv_chunks if export_format == "csv" else _ndjson_chunks
+        yield from encoder(headers, counted_partitions())
+    logger.info("Exported %s row(s) as %s", exported, export_format)
+
+
+def export_response(engine: Engine, statement: Select, export_format: str, filename: str) -> StreamingResponse:
+    """Wraps :func:`stream_rows` in a downloadable streaming response; 400 for an unknown format."""
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format '{export_format}'. Allowed: {', '.join(EXPORT_MEDIA_TYPES)}"
+        )
+    return StreamingResponse(
+        stream_rows(engine, statement, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
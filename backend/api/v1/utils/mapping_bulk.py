@@ -0,0 +1,184 @@
+import os
+from itertools import product
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+
+from ..database import models
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+# Upper bound on mappings per request (cross products grow quickly)
+MAX_BULK_MAPPINGS = int(os.getenv("MAX_BULK_MAPPINGS", "50000"))
+# Keys per IN list / rows per INSERT statement
+BULK_CHUNK_SIZE = 1000
+
+
+def _chunks(items: Sequence, size: int = BULK_CHUNK_SIZE) -> Iterable[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class RefResolver:
+    """
+    Resolves entity references given by ID or natural key to IDs.
+
+    All references in a request are looked up with one IN query for IDs and
+    one for natural keys (per chunk), then matched in memory. Tenant-scoped
+    entities must belong to the mapping's client.
+    """
+
+    def __init__(self, label: str, model, key_fields: Sequence[str], tenant_scoped: bool = True):
+        self.label = label
+        self.model = model
+        self.key_fields = list(key_fields)
+        self.tenant_scoped = tenant_scoped
+
+    def _key(self, ref) -> Tuple:
+        return tuple(getattr(ref, name) for name in self.key_fields)
+
+    def _describe(self, ref) -> str:
+        if ref.id is not None:
+            return f"{self.label} id {ref.id}"
+        return f"{self.label} " + "/".join(str(value) for value in self._key(ref))
+
+    def resolve(self, db: Session, refs: Sequence, client_id: int) -> List[int]:
+        ids = list({ref.id for ref in refs if ref.id is not None})
+        keys = list({self._key(ref) for ref in refs if ref.id is None})
+        columns = [getattr(self.model, name) for name in self.key_fields]
+        tenant = [self.model.client_id] if self.tenant_scoped else []
+
+        by_id: Dict[int, Optional[int]] = {}
+        for chunk in _chunks(ids):
+            for row in db.query(self.model.id, *tenant).filter(self.model.id.in_(chunk)):
+                by_id[row.id] = row.client_id if self.tenant_scoped else None
+
+        by_key: Dict[Tuple, Tuple[int, Optional[int]]] = {}
+        key_column = columns[0] if len(columns) == 1 else tuple_(*columns)
+        for chunk in _chunks(keys):
+            values = [key[0] for key in chunk] if len(columns) == 1 else list(chunk)
+            for row in db.query(self.model.id, *columns, *tenant).filter(key_column.in_(values)):
+                key = tuple(getattr(row, name) for name in self.key_fields)
+                by_key[key] = (row.id, row.client_id if self.tenant_scoped else None)
+
+        resolved, missing = [], []
+        for ref in refs:
+            if ref.id is not None:
+                entity_id, owner = ref.id, by_id.get(ref.id, -1)
+            else:
+                entity_id, owner = by_key.get(self._key(ref), (None, -1))
+            found = owner != -1 and (not self.tenant_scoped or owner == client_id)
+            if not found:
+                missing.append(self._describe(ref))
+            resolved.append(entity_id)
+
+        if missing:
+            shown = ", ".join(sorted(set(missing))[:20])
+            logger.warning("Unresolved %s reference(s) for client %s: %s", self.label, client_id, shown)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown {self.label}(s) for this client: {shown}"
+            )
+        return resolved
+
+
+OUTLET_REFS = RefResolver("outlet", models.Outlet, ["aggregator", "resid"])
+USER_REFS = RefResolver("user", models.User, ["usernumber"])
+SERVICE_REFS = RefResolver("service", models.Service, ["servicename", "servicevariant"], tenant_scoped=False)
+
+
+def resolve_pairs(db: Session, client_id: int, left: RefResolver, right: RefResolver,
+                  left_refs: Sequence, right_refs: Sequence, pairs: Sequence[Tuple]) -> Set[Tuple[int, int]]:
+    """
+    Expands ``left_refs x right_refs`` plus explicit ``pairs`` and resolves
+    every reference, returning the distinct ``(left_id, right_id)`` pairs.
+    """
+    requested = len(left_refs) * len(right_refs) + len(pairs)
+    if requested > MAX_BULK_MAPPINGS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many mappings in one request ({requested}); the limit is {MAX_BULK_MAPPINGS}"
+        )
+    all_left = list(left_refs) + [pair[0] for pair in pairs]
+    all_right = list(right_refs) + [pair[1] for pair in pairs]
+    left_ids = left.resolve(db, all_left, client_id)
+    right_ids = right.resolve(db, all_right, client_id)
+
+    resolved = set(product(left_ids[:len(left_refs)], right_ids[:len(right_refs)]))
+    resolved.update(zip(left_ids[len(left_refs):], right_ids[len(right_refs):]))
+    return resolved
+
+
+def _insert_ignoring_duplicates(db: Session, mapping_model, rows: List[dict]) -> int:
+    """Inserts ``rows`` in multi-row chunks, skipping duplicates; returns the number of rows actually inserted."""
+    # A Core insert on the table, since ORM bulk inserts do not report a rowcount
+    statement = insert(mapping_model.__table__).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite")
+    inserted = 0
+    for chunk in _chunks(rows):
+        inserted += db.execute(statement, list(chunk)).rowcount
+    return inserted
+
+
+def insert_mappings(db: Session, mapping_model, left_field: str, right_field: str,
+                    pairs: Set[Tuple[int, int]], client_id: int) -> Tuple[int, int]:
+    """
+    Inserts the pairs that are not mapped yet and returns ``(created, existing)``.
+
+    Existing pairs are found with chunked row-value IN queries; the INSERTs
+    are multi-row and duplicate-ignoring, so a concurrent insert of the same
+    pair is skipped rather than failing the batch, and counted as existing.
+    The caller commits.
+    """
+    left_column, right_column = getattr(mapping_model, left_field), getattr(mapping_model, right_field)
+    ordered = sorted(pairs)
+    existing = set()
+    for chunk in _chunks(ordered):
+        existing.update(
+            (left_id, right_id) for left_id, right_id in
+            db.query(left_column, right_column).filter(tuple_(left_column, right_column).in_(list(chunk)))
+        )
+
+    new_rows = [{left_field: left_id, right_field: right_id, "client_id": client_id}
+                for left_id, right_id in ordered if (left_id, right_id) not in existing]
+    created = _insert_ignoring_duplicates(db, mapping_model, new_rows)
+    return created, len(ordered) - created
+
+
+def owner_of(db: Session, resolver: RefResolver, entity_id: int, client_id: Optional[int]) -> int:
+    """Returns the owning client of one entity; 404 if it is missing or (with ``client_id``) not theirs."""
+    owner = db.query(resolver.model.client_id).filter(resolver.model.id == entity_id).scalar()
+    if owner is None or (client_id is not None and owner != client_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"{resolver.label.capitalize()} with ID {entity_id} not found")
+    return owner
+
+
+def reconcile_mappings(db: Session, mapping_model, anchor_field: str, anchor_id: int,
+                       other_field: str, other: RefResolver, desired_ids: Iterable[int],
+                       client_id: int, dry_run: bool = False) -> Tuple[List[int], List[int], int]:
+    """
+    Makes the set of ``other_field`` IDs mapped to one anchor exactly
+    ``desired_ids``. The current set is read with one query; additions are
+    validated in one IN query and inserted with a multi-row INSERT, removals
+    go in one DELETE. Returns ``(added, removed, unchanged)``; the caller commits.
+    """
+    anchor_column, other_column = getattr(mapping_model, anchor_field), getattr(mapping_model, other_field)
+    desired = set(desired_ids)
+    current = {other_id for (other_id,) in db.query(other_column).filter(anchor_column == anchor_id)}
+    to_add, to_remove = sorted(desired - current), sorted(current - desired)
+
+    if to_add:
+        other.resolve(db, [SimpleNamespace(id=other_id) for other_id in to_add], client_id)
+    if not dry_run:
+        if to_remove:
+            for chunk in _chunks(to_remove):
+                db.query(mapping_model).filter(
+                    anchor_column == anchor_id, other_column.in_(list(chunk))
+                ).delete(synchronize_session=False)
+        _insert_ignoring_duplicates(db, mapping_model, [
+            {anchor_field: anchor_id, other_field: other_id, "client_id": client_id} for other_id in to_add
+        ])
+    return to_add, to_remove, len(current & desired)
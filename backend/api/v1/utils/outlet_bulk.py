@@ -0,0 +1,317 @@
+import codecs
+import csv
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from fastapi import HTTPException, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+
+from ..database import models
+from ..schemas import schemas
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+# Rows validated against the database (and inserted) per round trip
+IMPORT_BATCH_ROWS = int(os.getenv("OUTLET_IMPORT_BATCH_ROWS", "1000"))
+
+# Batch create modes: reject the whole batch on any duplicate, or
+# insert the new rows and leave already registered ones out.
+ALL_OR_NOTHING = "all-or-nothing"
+SKIP_DUPLICATES = "skip-duplicates"
+BATCH_MODES = (ALL_OR_NOTHING, SKIP_DUPLICATES)
+
+# Spreadsheet headers accepted for each outlet field, compared after
+# lower-casing and dropping everything but letters and digits. The first
+# spelling of each is the one used by the onboarding sheets.
+HEADER_ALIASES = {
+    "aggregator": {"aggregator", "platform"},
+    "resid": {"resid", "restaurantid"},
+    "subzone": {"subzone", "zone"},
+    "city": {"city"},
+    "outletnumber": {"outletnumber", "outletno"},
+    "is_active": {"activeinactive", "isactive", "active", "status"},
+    "brandid": {"brandid", "brand"},
+}
+_HEADER_LOOKUP = {alias: field for field, aliases in HEADER_ALIASES.items() for alias in aliases}
+
+
+def check_batch_mode(mode: str) -> None:
+    if mode not in BATCH_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown mode '{mode}'. Allowed: {', '.join(BATCH_MODES)}"
+        )
+
+
+def brand_abbreviation(brandname: str) -> str:
+    """Initials of a multi-word brand name ("Burger King" -> "BK"); single words are kept whole."""
+    words = brandname.strip().split()
+    if len(words) > 1:
+        return "".join(word[0].upper() for word in words if word)
+    return brandname
+
+
+def outlet_shortcode(abbreviation: str, subzone: str) -> str:
+    return f"{abbreviation} - {subzone}"
+
+
+def existing_outlet_keys(db: Session, keys: Iterable[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """Returns which ``(aggregator, resid)`` pairs are already registered, in one query."""
+    keys = list(set(keys))
+    if not keys:
+        return set()
+    rows = db.query(models.Outlet.aggregator, models.Outlet.resid).filter(
+        tuple_(models.Outlet.aggregator, models.Outlet.resid).in_(keys)
+    ).all()
+    return {(aggregator, resid) for aggregator, resid in rows}
+
+
+def create_outlet_batch(db: Session, outlets: List[schemas.OutletCreate], mode: str = ALL_OR_NOTHING) -> List[models.Outlet]:
+    """
+    Creates outlets with a fixed number of queries regardless of batch size:
+    clients, brands (by ID, and each client's default brand) and existing
+    ``(aggregator, resid)`` keys are prefetched with IN queries, then the
+    new rows go in with one multi-row INSERT. The caller commits.
+    """
+    check_batch_mode(mode)
+
+    client_ids = {outlet.clientid for outlet in outlets}
+    known_clients = {client_id for (client_id,) in db.query(models.Client.id).filter(models.Client.id.in_(client_ids))}
+    if client_ids - known_clients:
+        logger.warning("Unknown client ID(s): %s", sorted(client_ids - known_clients))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown client ID passed")
+
+    brand_ids = {outlet.brandid for outlet in outlets if outlet.brandid is not None}
+    defaulted_clients = {outlet.clientid for outlet in outlets if outlet.brandid is None}
+    brands = {}
+    default_brand = {}
+    if brand_ids or defaulted_clients:
+        rows = db.query(models.Brand.id, models.Brand.client_id, models.Brand.brandname).filter(
+            models.Brand.id.in_(brand_ids) | models.Brand.client_id.in_(defaulted_clients)
+        ).order_by(models.Brand.id).all()
+        for brand_id, client_id, brandname in rows:
+            brands[brand_id] = brand_abbreviation(brandname)
+            default_brand.setdefault(client_id, brand_id)
+
+    existing = existing_outlet_keys(db, [(outlet.aggregator, outlet.resid) for outlet in outlets])
+    rows, seen, skipped = [], set(), 0
+    for outlet in outlets:
+        brand_id = outlet.brandid if outlet.brandid is not None else default_brand.get(outlet.clientid)
+        if brand_id not in brands:
+            logger.error("Brand not found for outlet resid=%s, client ID %s", outlet.resid, outlet.clientid)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Brand not found")
+
+        key = (outlet.aggregator, outlet.resid)
+        if key in existing or key in seen:
+            if mode == ALL_OR_NOTHING:
+                logger.warning("Duplicate outlet found: resid=%s, aggregator=%s", outlet.resid, outlet.aggregator)
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Res ID already registered")
+            skipped += 1
+            continue
+        seen.add(key)
+        rows.append({
+            "aggregator": outlet.aggregator,
+            "resid": outlet.resid,
+            "subzone": outlet.subzone,
+            "resshortcode": outlet_shortcode(brands[brand_id], outlet.subzone),
+            "city": outlet.city,
+            "outletnumber": outlet.outletnumber or "",
+            "is_active": outlet.is_active,
+            "client_id": outlet.clientid,
+            "brand_id": brand_id,
+        })
+
+    if skipped:
+        logger.info("Skipped %s duplicate outlet(s)", skipped)
+    if not rows:
+        return []
+    db.execute(insert(models.Outlet), rows)
+    # MySQL has no INSERT ... RETURNING; read the new rows back by their natural key
+    return db.query(models.Outlet).filter(
+        tuple_(models.Outlet.aggregator, models.Outlet.resid).in_(list(seen))
+    ).order_by(models.Outlet.id).all()
+
+
+def _normalize_header(header) -> Optional[str]:
+    return _HEADER_LOOKUP.get(re.sub(r"[^a-z0-9]", "", str(header or "").lower()))
+
+
+def _parse_active(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in {"active", "true", "yes", "1", "y"}
+
+
+def _cell(value) -> str:
+    # Spreadsheets hand numeric IDs back as floats ("12345.0")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return "" if value is None else str(value).strip()
+
+
+def _records(header: List, rows: Iterable[Iterable]) -> Iterator[Tuple[int, Dict[str, object]]]:
+    fields = [_normalize_header(name) for name in header]
+    missing = {"aggregator", "resid", "subzone", "city"} - set(fields)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing column(s): {', '.join(sorted(missing))}"
+        )
+    # Line 1 is the header row
+    for line, values in enumerate(rows, start=2):
+        record = {field: value for field, value in zip(fields, values) if field}
+        if any(_cell(value) for value in record.values()):
+            yield line, record
+
+
+def read_outlet_rows(upload: UploadFile) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """
+    Yields ``(line, record)`` for each non-blank data row of an uploaded CSV
+    or XLSX file, reading it incrementally. Columns are matched through
+    :data:`HEADER_ALIASES`.
+    """
+    filename = (upload.filename or "").lower()
+    if filename.endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="XLSX import is not available on this server; upload a CSV instead"
+            )
+        sheet = load_workbook(upload.file, read_only=True, data_only=True).active
+        rows = sheet.iter_rows(values_only=True)
+    elif filename.endswith(".csv") or upload.content_type in {"text/csv", "application/vnd.ms-excel"}:
+        rows = csv.reader(codecs.iterdecode(upload.file, "utf-8-sig"))
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload a .csv or .xlsx file"
+        )
+
+    header = next(rows, None)
+    if header is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The uploaded file is empty")
+    return _records(list(header), rows)
+
+
+class OutletImporter:
+    """
+    Validates and inserts outlet rows in batches.
+
+    Each batch costs one query for unseen brands, one for already registered
+    ``(aggregator, resid)`` pairs and one multi-row INSERT. The caller owns
+    the transaction, so a whole file is committed (or rolled back) at once.
+    """
+
+    def __init__(self, db: Session, client_id: Optional[int], default_brand_id: Optional[int], dry_run: bool = False):
+        self.db = db
+        self.client_id = client_id
+        self.default_brand_id = default_brand_id
+        self.dry_run = dry_run
+        self.brands: Dict[int, Optional[Tuple[int, str]]] = {}
+        self.seen: Set[Tuple[str, str]] = set()
+        self.report: List[schemas.OutletImportRow] = []
+        self.created = 0
+
+    def _load_brands(self, brand_ids: Set[int]) -> None:
+        unseen = brand_ids - self.brands.keys()
+        if not unseen:
+            return
+        rows = self.db.query(models.Brand.id, models.Brand.client_id, models.Brand.brandname).filter(
+            models.Brand.id.in_(unseen)
+        ).all()
+        for brand_id in unseen:
+            self.brands[brand_id] = None
+        for brand_id, client_id, brandname in rows:
+            self.brands[brand_id] = (client_id, brand_abbreviation(brandname))
+
+    def _reject(self, line: int, record: Dict[str, object], detail: str, row_status: str = "error") -> None:
+        self.report.append(schemas.OutletImportRow(
+            row=line, aggregator=_cell(record.get("aggregator")) or None, resid=_cell(record.get("resid")) or None,
+            status=row_status, detail=detail
+        ))
+
+    def _brand_id(self, record: Dict[str, object]) -> Optional[int]:
+        value = _cell(record.get("brandid"))
+        if not value:
+            return self.default_brand_id
+        return int(value) if value.isdigit() else -1
+
+    def _process(self, batch: List[Tuple[int, Dict[str, object]]]) -> None:
+        self._load_brands({brand_id for _, record in batch if (brand_id := self._brand_id(record))})
+
+        candidates = []
+        for line, record in batch:
+            brand_id = self._brand_id(record)
+            brand = self.brands.get(brand_id) if brand_id else None
+            if brand is None:
+                self._reject(line, record, "Brand not found" if brand_id else "No brand given for row")
+                continue
+            if self.client_id is not None and brand[0] != self.client_id:
+                self._reject(line, record, "Brand does not belong to this client")
+                continue
+            try:
+                outlet = schemas.OutletBase(
+                    aggregator=_cell(record.get("aggregator")),
+                    resid=_cell(record.get("resid")),
+                    subzone=_cell(record.get("subzone")),
+                    city=_cell(record.get("city")),
+                    outletnumber=_cell(record.get("outletnumber")),
+                    is_active=_parse_active(record.get("is_active", "active")),
+                )
+            except ValidationError as e:
+                error = e.errors()[0]
+                self._reject(line, record, f"{'.'.join(map(str, error['loc']))}: {error['msg']}")
+                continue
+            key = (outlet.aggregator, outlet.resid)
+            if key in self.seen:
+                self._reject(line, record, "Repeated earlier in the file", "duplicate")
+                continue
+            self.seen.add(key)
+            candidates.append((line, outlet, brand_id, brand))
+
+        existing = existing_outlet_keys(self.db, [(o.aggregator, o.resid) for _, o, _, _ in candidates])
+        rows = []
+        for line, outlet, brand_id, (client_id, abbreviation) in candidates:
+            if (outlet.aggregator, outlet.resid) in existing:
+                self._reject(line, outlet.model_dump(), "Res ID already registered", "duplicate")
+                continue
+            rows.append({
+                "aggregator": outlet.aggregator,
+                "resid": outlet.resid,
+                "subzone": outlet.subzone,
+                "resshortcode": outlet_shortcode(abbreviation, outlet.subzone),
+                "city": outlet.city,
+                "outletnumber": outlet.outletnumber or "",
+                "is_active": outlet.is_active,
+                "client_id": client_id,
+                "brand_id": brand_id,
+            })
+            self.report.append(schemas.OutletImportRow(
+                row=line, aggregator=outlet.aggregator, resid=outlet.resid,
+                status="valid" if self.dry_run else "created"
+            ))
+        if rows and not self.dry_run:
+            self.db.execute(insert(models.Outlet), rows)
+        self.created += len(rows)
+
+    def run(self, records: Iterable[Tuple[int, Dict[str, object]]]) -> schemas.OutletImportReport:
+        batch = []
+        for line, record in records:
+            batch.append((line, record))
+            if len(batch) >= IMPORT_BATCH_ROWS:
+                self._process(batch)
+                batch = []
+        if batch:
+            self._process(batch)
+
+        return schemas.OutletImportReport(
+            created=0 if self.dry_run else self.created,
+            failed=sum(1 for row in self.report if row.status not in ("created", "valid")),
+            dry_run=self.dry_run,
+            rows=sorted(self.report, key=lambda row: row.row),
+        )
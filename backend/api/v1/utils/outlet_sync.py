@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from ..database import models
+from ..schemas import schemas
+from .outlet_bulk import brand_abbreviation, existing_outlet_keys, outlet_shortcode
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+# Columns a feed is allowed to change on an existing outlet; outletnumber only when the feed supplies it
+SYNCED_FIELDS = ("subzone", "city", "is_active", "resshortcode", "outletnumber")
+
+
+class OutletFeedSync:
+    """
+    Brings a brand's outlets in line with a full aggregator feed.
+
+    The brand's current outlets are read in one query and diffed in memory
+    against the feed on ``(aggregator, resid)``. Only the difference is
+    written: one multi-row INSERT for new outlets, one executemany UPDATE
+    for changed ones and one UPDATE ... IN for outlets that dropped out of
+    the feed, which are deactivated rather than deleted. Deactivation is
+    limited to the aggregators present in the feed (or ``aggregator``), so
+    a Swiggy feed never touches Zomato outlets. The caller owns the
+    transaction.
+    """
+
+    def __init__(self, db: Session, brand: models.Brand, dry_run: bool = False,
+                 deactivate_missing: bool = True, aggregator: Optional[str] = None):
+        self.db = db
+        self.brand = brand
+        self.dry_run = dry_run
+        self.deactivate_missing = deactivate_missing
+        self.aggregator = aggregator
+        self.abbreviation = brand_abbreviation(brand.brandname)
+
+    def _current(self) -> Dict[Tuple[str, str], dict]:
+        columns = [models.Outlet.id, models.Outlet.aggregator, models.Outlet.resid, *(
+            getattr(models.Outlet, name) for name in SYNCED_FIELDS
+        )]
+        query = self.db.query(*columns).filter(models.Outlet.brand_id == self.brand.id)
+        if self.aggregator:
+            query = query.filter(models.Outlet.aggregator == self.aggregator)
+        return {(row.aggregator, row.resid): row._asdict() for row in query}
+
+    def _desired(self, item: schemas.OutletFeedItem) -> dict:
+        desired = {
+            "subzone": item.subzone,
+            "city": item.city,
+            "is_active": item.is_active,
+            "resshortcode": outlet_shortcode(self.abbreviation, item.subzone),
+        }
+        if item.outletnumber is not None:
+            desired["outletnumber"] = item.outletnumber
+        return desired
+
+    def run(self, feed: Sequence[schemas.OutletFeedItem]) -> schemas.OutletSyncReport:
+        current = self._current()
+        changes: List[schemas.OutletSyncChange] = []
+        inserts, updates, seen = [], [], set()
+        repeated, unchanged = 0, 0
+
+        for item in feed:
+            key = (item.aggregator, item.resid)
+            if key in seen or (self.aggregator and item.aggregator != self.aggregator):
+                repeated += key in seen
+                continue
+            seen.add(key)
+            desired = self._desired(item)
+            existing = current.get(key)
+            if existing is None:
+                inserts.append((item, desired))
+                continue
+            changed = [name for name in SYNCED_FIELDS if name in desired and existing[name] != desired[name]]
+            if not changed:
+                unchanged += 1
+                continue
+            updates.append({"id": existing["id"], **desired})
+            changes.append(schemas.OutletSyncChange(
+                aggregator=item.aggregator, resid=item.resid, action="update", fields=changed
+            ))
+
+        # A new key may already belong to another brand or client; those are reported, not moved
+        taken = existing_outlet_keys(self.db, [(item.aggregator, item.resid) for item, _ in inserts])
+        new_rows, conflicts = [], []
+        for item, desired in inserts:
+            if (item.aggregator, item.resid) in taken:
+                conflicts.append(schemas.OutletSyncChange(
+                    aggregator=item.aggregator, resid=item.resid, action="conflict", fields=[]
+                ))
+                continue
+            new_rows.append({
+                "aggregator": item.aggregator,
+                "resid": item.resid,
+                "client_id": self.brand.client_id,
+                "brand_id": self.brand.id,
+                "outletnumber": "",
+                **desired,
+            })
+            changes.append(schemas.OutletSyncChange(
+                aggregator=item.aggregator, resid=item.resid, action="insert", fields=list(SYNCED_FIELDS)
+            ))
+
+        deactivate = []
+        if self.deactivate_missing:
+            scope = {self.aggregator} if self.aggregator else {aggregator for aggregator, _ in seen}
+            for key, existing in sorted(current.items()):
+                if key not in seen and key[0] in scope and existing["is_active"]:
+                    deactivate.append(existing["id"])
+                    changes.append(schemas.OutletSyncChange(
+                        aggregator=key[0], resid=key[1], action="deactivate", fields=["is_active"]
+                    ))
+
+        if not self.dry_run:
+            self._apply(new_rows, updates, deactivate)
+
+        logger.info("Outlet feed sync for brand %s: %s insert(s), %s update(s), %s deactivation(s), "
+                    "%s unchanged, %s conflict(s) (dry_run=%s)", self.brand.id, len(new_rows), len(updates),
+                    len(deactivate), unchanged, len(conflicts), self.dry_run)
+        return schemas.OutletSyncReport(
+            inserted=len(new_rows),
+            updated=len(updates),
+            deactivated=len(deactivate),
+            unchanged=unchanged,
+            repeated=repeated,
+            conflicts=conflicts,
+            changes=changes,
+            dry_run=self.dry_run,
+        )
+
+    def _apply(self, new_rows: List[dict], updates: List[dict], deactivate: List[int]) -> None:
+        if new_rows:
+            self.db.execute(insert(models.Outlet), new_rows)
+        if updates:
+            # ORM bulk UPDATE by primary key: a single executemany
+            self.db.execute(update(models.Outlet), updates)
+        if deactivate:
+            self.db.query(models.Outlet).filter(models.Outlet.id.in_(deactivate)).update(
+                {models.Outlet.is_active: False}, synchronize_session=False
+            )
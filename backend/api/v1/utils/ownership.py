@@ -0,0 +1,228 @@
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Mapping, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..database import models
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+# Tenant-owned entity kinds: model and the noun used in error messages
+OWNED_ENTITIES = {
+    "outlet": (models.Outlet, "outlet"),
+    "brand": (models.Brand, "brand"),
+    "user": (models.User, "user"),
+    "outlet_service_mapping": (models.OutletService, "mapping"),
+    "user_service_mapping": (models.UserService, "mapping"),
+    "user_outlet_mapping": (models.UserOutlet, "mapping"),
+}
+# IDs per IN list
+OWNERSHIP_CHUNK_SIZE = 1000
+# A tenant's cached IDs are reloaded after this many seconds, so deletes and
+# ownership changes made by other worker processes are eventually seen.
+OWNERSHIP_CACHE_TTL = int(os.getenv("OWNERSHIP_CACHE_TTL", "300"))
+
+
+def entity_owners(db: Session, kind: str, ids: Iterable[int]) -> Dict[int, int]:
+    """Returns ``{id: client_id}`` for the IDs of one kind that exist, selecting only those two columns."""
+    model = OWNED_ENTITIES[kind][0]
+    ids = sorted(set(ids))
+    owners = {}
+    for start in range(0, len(ids), OWNERSHIP_CHUNK_SIZE):
+        chunk = ids[start:start + OWNERSHIP_CHUNK_SIZE]
+        owners.update(db.query(model.id, model.client_id).filter(model.id.in_(chunk)).all())
+    return owners
+
+
+class OwnershipCache:
+    """
+    Per-process map of entity ID to owning client, per kind.
+
+    The first check for a tenant loads every ID that tenant owns of that kind
+    with one indexed query (``WHERE client_id = ?``); later checks for it are
+    dictionary lookups. IDs outside the loaded tenant (new, foreign or
+    missing rows) fall back to :func:`entity_owners` and are cached too.
+    Every entry expires after ``OWNERSHIP_CACHE_TTL``. Committed ORM
+    inserts, deletes and ``client_id`` changes are applied by the session
+    hooks below; handlers doing bulk SQL writes call :meth:`invalidate`.
+    Query results are only published if no change to their kind was
+    applied while the query ran.
+    """
+
+    def __init__(self):
+        self._owners: Dict[str, Dict[int, int]] = {kind: {} for kind in OWNED_ENTITIES}
+        self._tenants: Dict[str, Dict[int, float]] = {kind: {} for kind in OWNED_ENTITIES}
+        # When entries outside a tenant load were fetched or last changed
+        self._stamps: Dict[str, Dict[int, float]] = {kind: {} for kind in OWNED_ENTITIES}
+        self._versions: Dict[str, int] = dict.fromkeys(OWNED_ENTITIES, 0)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.tenant_loads = 0
+
+    def _load_tenant(self, db: Session, kind: str, client_id: int) -> None:
+        model = OWNED_ENTITIES[kind][0]
+        with self._lock:
+            version = self._versions[kind]
+        ids = [entity_id for (entity_id,) in db.query(model.id).filter(model.client_id == client_id)]
+        with self._lock:
+            if self._versions[kind] != version:
+                logger.debug("Discarded %s ID(s) of client %s loaded during a concurrent change", kind, client_id)
+                return
+            owners = self._owners[kind]
+            for entity_id in [entity_id for entity_id, owner in owners.items() if owner == client_id]:
+                del owners[entity_id]
+            owners.update(dict.fromkeys(ids, client_id))
+            self._tenants[kind][client_id] = time.monotonic()
+            self.tenant_loads += 1
+        logger.debug("Loaded %s %s ID(s) for client %s into the ownership cache", len(ids), kind, client_id)
+
+    def _fresh(self, kind: str, entity_id: int, owner: int, now: float) -> bool:
+        stamp = max(self._stamps[kind].get(entity_id, 0.0), self._tenants[kind].get(owner, 0.0))
+        return now - stamp <= OWNERSHIP_CACHE_TTL
+
+    def owners(self, db: Session, kind: str, ids: Iterable[int], client_id: Optional[int] = None) -> Dict[int, int]:
+        """Returns ``{id: client_id}`` for the IDs that exist, loading ``client_id``'s IDs first if needed."""
+        now = time.monotonic()
+        if client_id is not None:
+            loaded_at = self._tenants[kind].get(client_id)
+            if loaded_at is None or now - loaded_at > OWNERSHIP_CACHE_TTL:
+                self._load_tenant(db, kind, client_id)
+
+        cached = self._owners[kind]
+        found, unknown = {}, []
+        with self._lock:
+            version = self._versions[kind]
+            for entity_id in ids:
+                owner = cached.get(entity_id)
+                if owner is None or not self._fresh(kind, entity_id, owner, now):
+                    unknown.append(entity_id)
+                else:
+                    found[entity_id] = owner
+        fetched = entity_owners(db, kind, unknown) if unknown else {}
+        with self._lock:
+            if self._versions[kind] == version:
+                cached.update(fetched)
+                self._stamps[kind].update(dict.fromkeys(fetched, now))
+            self.hits += len(found)
+            self.misses += len(unknown)
+        found.update(fetched)
+        return found
+
+    def forget(self, kind: str, ids: Iterable[int]) -> None:
+        with self._lock:
+            self._versions[kind] += 1
+            for entity_id in ids:
+                self._owners[kind].pop(entity_id, None)
+                self._stamps[kind].pop(entity_id, None)
+
+    def remember(self, kind: str, entity_id: int, client_id: int) -> None:
+        with self._lock:
+            self._versions[kind] += 1
+            self._owners[kind][entity_id] = client_id
+            self._stamps[kind][entity_id] = time.monotonic()
+
+    def invalidate(self, kind: Optional[str] = None, client_id: Optional[int] = None) -> None:
+        """Drops one tenant's entries (or everyone's) for one kind (or all), to be reloaded on next use."""
+        with self._lock:
+            for name in ([kind] if kind else list(OWNED_ENTITIES)):
+                self._versions[name] += 1
+                if client_id is None:
+                    self._owners[name].clear()
+                    self._tenants[name].clear()
+                    self._stamps[name].clear()
+                    continue
+                owners = self._owners[name]
+                for entity_id in [entity_id for entity_id, owner in owners.items() if owner == client_id]:
+                    del owners[entity_id]
+                    self._stamps[name].pop(entity_id, None)
+                self._tenants[name].pop(client_id, None)
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "tenant_loads": self.tenant_loads,
+            "entries": {kind: len(owners) for kind, owners in self._owners.items()},
+        }
+
+
+OWNERSHIP_CACHE = OwnershipCache()
+# Model -> kind, for handlers that know the table they wrote to
+OWNED_KINDS = {model: kind for kind, (model, _) in OWNED_ENTITIES.items()}
+
+
+def _ids(ids: List[int]) -> str:
+    shown = ", ".join(str(entity_id) for entity_id in ids[:20])
+    return shown + (", ..." if len(ids) > 20 else "")
+
+
+def verify_ownership(db: Session, client_id: Optional[int],
+                     entities: Mapping[str, Iterable[int]]) -> Dict[str, Dict[int, int]]:
+    """
+    Checks that every entity exists and, unless ``client_id`` is None (internal
+    clients), belongs to ``client_id``.
+
+    ``entities`` maps a kind from :data:`OWNED_ENTITIES` to IDs, so a request
+    touching outlets, users and mappings is authorised with one query per
+    table however many IDs it carries. Raises 404 naming missing IDs, then
+    403 naming IDs owned by another client; otherwise returns the owners
+    per kind (``{kind: {id: client_id}}``).
+    """
+    checked = {}
+    for kind, ids in entities.items():
+        ids = sorted(set(ids))
+        if not ids:
+            continue
+        label = OWNED_ENTITIES[kind][1]
+        owners = checked[kind] = OWNERSHIP_CACHE.owners(db, kind, ids, client_id)
+
+        missing = [entity_id for entity_id in ids if entity_id not in owners]
+        if missing:
+            logger.warning("%s ID(s) not found: %s", kind, _ids(missing))
+            detail = f"{label.capitalize()} not found" if len(ids) == 1 else f"{label.capitalize()}(s) not found: {_ids(missing)}"
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+        if client_id is None:
+            continue
+        foreign = [entity_id for entity_id in ids if owners[entity_id] != client_id]
+        if foreign:
+            logger.warning("Client %s does not own %s ID(s): %s", client_id, kind, _ids(foreign))
+            detail = (f"Forbidden: You don't own this {label}" if len(ids) == 1
+                      else f"Forbidden: You don't own {label}(s): {_ids(foreign)}")
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+    return checked
+
+
+#__________________ Keep the cache in sync with committed ORM writes __________________
+@event.listens_for(Session, "after_flush")
+def _collect_ownership_changes(session, flush_context):
+    changes = session.info.setdefault("ownership_changes", [])
+    for row in session.new.union(session.dirty):
+        kind = OWNED_KINDS.get(type(row))
+        if kind is not None:
+            changes.append((kind, row.id, row.client_id))
+    for row in session.deleted:
+        kind = OWNED_KINDS.get(type(row))
+        if kind is not None:
+            changes.append((kind, row.id, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_ownership_changes(session):
+    for kind, entity_id, client_id in session.info.pop("ownership_changes", []):
+        if client_id is None:
+            OWNERSHIP_CACHE.forget(kind, [entity_id])
+        else:
+            OWNERSHIP_CACHE.remember(kind, entity_id, client_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_ownership_changes(session):
+    session.info.pop("ownership_changes", None)
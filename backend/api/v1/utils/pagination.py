@@ -0,0 +1,146 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, false, or_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# A sort key is (column, descending). The primary key is always appended as
+# the final tie-breaker so every position in the ordering is unique.
+SortKey = Tuple[Any, bool]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def _signature(sort_keys: Sequence[SortKey]) -> List[str]:
+    return [f"{'-' if desc else ''}{column.key}" for column, desc in sort_keys]
+
+
+def encode_cursor(sort_keys: Sequence[SortKey], row: Any) -> str:
+    """Builds an opaque cursor pointing just after ``row`` in the given ordering."""
+    payload = {
+        "s": _signature(sort_keys),
+        "v": [_encode_value(getattr(row, column.key)) for column, _ in sort_keys],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort_keys: Sequence[SortKey], cursor: str) -> List[Any]:
+    """Returns the sort values stored in ``cursor``; 400 if it is malformed or from another ordering."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(value) for value in payload["v"]]
+        valid = payload["s"] == _signature(sort_keys) and len(values) == len(sort_keys)
+    except (ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+    return values
+
+
+def _nullable(column: Any) -> bool:
+    return getattr(getattr(column, "expression", column), "nullable", True)
+
+
+def _equal(column: Any, value: Any):
+    return column.is_(None) if value is None else column == value
+
+
+def _step(column: Any, desc: bool, value: Any):
+    """
+    Rows strictly after ``value`` in one key. NULL sorts below every value
+    (as in SQLite and MySQL), so it comes first ascending and last descending.
+    """
+    if value is None:
+        return false() if desc else column.isnot(None)
+    step = column < value if desc else column > value
+    if desc and _nullable(column):
+        return or_(step, column.is_(None))
+    return step
+
+
+def _after(sort_keys: Sequence[SortKey], values: Sequence[Any]):
+    """Row-value comparison ``(k1, k2, ..., id) > (v1, v2, ..., vid)`` honouring per-key direction and NULLs."""
+    clauses = []
+    for position, (column, desc) in enumerate(sort_keys):
+        equal_prefix = [_equal(prev, value) for (prev, _), value in zip(sort_keys[:position], values[:position])]
+        clauses.append(and_(*equal_prefix, _step(column, desc, values[position])))
+    return or_(*clauses)
+
+
+def paginate(
+    query: Query,
+    id_column: Any,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    sort: Optional[Sequence[SortKey]] = None,
+) -> Tuple[list, Optional[str]]:
+    """
+    Applies ordering and pagination to ``query``.
+
+    With ``cursor`` the page is located by a keyset predicate on
+    ``(sort..., id)``, so deep pages cost the same as the first one; without
+    it the classic ``skip``/``limit`` offset is used. Either way the returned
+    ``next_cursor`` (None on the last page) continues after the final row.
+    """
+    sort_keys = [*(sort or []), (id_column, False)]
+    if cursor:
+        query = query.filter(_after(sort_keys, decode_cursor(sort_keys, cursor)))
+
+    query = query.order_by(*[column.desc() if desc else column.asc() for column, desc in sort_keys])
+    if skip and not cursor:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_keys, rows[-1])
+    return rows, next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Exposes the continuation cursor without changing the list response body."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def paginate_list(rows: Sequence[Any], id_column: Any, limit: int, skip: int = 0,
+                  cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    """
+    :func:`paginate` over rows already in memory and sorted by ``id_column``,
+    issuing and accepting the same cursors as the SQL version.
+    """
+    sort_keys = [(id_column, False)]
+    start = skip
+    if cursor:
+        after = decode_cursor(sort_keys, cursor)[0]
+        start = next((position for position, row in enumerate(rows) if getattr(row, id_column.key) > after), len(rows))
+    page = list(rows[start:start + limit + 1])
+
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(sort_keys, page[-1])
+    return page, next_cursor
@@ -0,0 +1,105 @@
+import os
+import re
+import time
+import uuid
+import random
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from logger import RequestLogContext, create_access_logger, request_context_var
+
+access_logger = create_access_logger()
+
+REQUEST_ID_HEADER = "x-request-id"
+# Fraction of successful (< 400, not slow) requests that get an access log line.
+# Errors and slow requests are always logged.
+SUCCESS_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+SLOW_REQUEST_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+
+def _incoming_request_id(headers) -> str:
+    """Reuses a well-formed X-Request-ID from the caller, otherwise mints one."""
+    for key, value in headers:
+        if key == REQUEST_ID_HEADER.encode("latin-1"):
+            candidate = value.decode("latin-1")
+            if _VALID_REQUEST_ID.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex
+
+
+def _should_log(status_code: int, latency_ms: float) -> bool:
+    if status_code >= 400 or latency_ms >= SLOW_REQUEST_MS:
+        return True
+    return SUCCESS_SAMPLE_RATE >= 1.0 or random.random() < SUCCESS_SAMPLE_RATE
+
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI middleware that assigns a request ID, propagates it on the
+    response, and writes one structured JSON access log line per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context = RequestLogContext(_incoming_request_id(scope.get("headers", ())))
+        token = request_context_var.set(context)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode("latin-1"), context.request_id.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            latency_ms = (time.perf_counter() - started) * 1000
+            request_context_var.reset(token)
+            if _should_log(status_code, latency_ms):
+                route = scope.get("route")
+                access_logger.info(
+                    "access",
+                    extra={"fields": {
+                        "request_id": context.request_id,
+                        "method": scope.get("method"),
+                        "route": getattr(route, "path", None) or scope.get("path"),
+                        "path": scope.get("path"),
+                        "status": status_code,
+                        "latency_ms": round(latency_ms, 2),
+                        "db_time_ms": round(context.db_time_ms, 2),
+                        "db_queries": context.db_queries,
+                        "client_id": context.client_id,
+                    }},
+                )
+
+
+def install_db_timing(engine: Engine) -> None:
+    """Accumulates cursor execution time into the current request's log context."""
+
+    # The start time lives on the statement's execution context, so a statement
+    # that raises leaves nothing behind on the pooled connection
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "query_started", None)
+        request_context = request_context_var.get()
+        if started is not None and request_context is not None:
+            request_context.db_time_ms += (time.perf_counter() - started) * 1000
+            request_context.db_queries += 1
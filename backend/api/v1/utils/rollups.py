@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Sequence, Tuple
+from sqlalchemy import case, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from ..database import models
+from .etag import TABLE_VERSIONS
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+# Rollups are recomputed after this many seconds even without a local write,
+# so writes handled by other worker processes are seen within that window.
+ROLLUP_CACHE_TTL = int(os.getenv("ROLLUP_CACHE_TTL", "30"))
+
+# Tables counted per client by the "client_counts" rollup
+CLIENT_COUNTED_MODELS = (
+    models.Brand, models.Outlet, models.User,
+    models.OutletService, models.UserService, models.UserOutlet,
+)
+
+
+class RollupCache:
+    """
+    Named aggregates, each computed by one query and cached per process.
+
+    A rollup declares the tables it reads. A cached result is served while
+    those tables' change counters (``TABLE_VERSIONS``, bumped by committed
+    writes) are unchanged and it is younger than ``ROLLUP_CACHE_TTL``;
+    otherwise the next read recomputes it. The counters are read before the
+    query, so a write committed during it only causes one extra recompute.
+    """
+
+    def __init__(self):
+        self._rollups: Dict[str, Tuple[Tuple[str, ...], Callable[[Session], Any]]] = {}
+        self._entries: Dict[str, Tuple[Tuple[str, ...], float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def register(self, name: str, tables: Sequence[str]):
+        """Decorator adding ``compute(db)`` as the rollup ``name`` over ``tables``."""
+        def decorator(compute: Callable[[Session], Any]):
+            self._rollups[name] = (tuple(tables), compute)
+            return compute
+        return decorator
+
+    def get(self, db: Session, name: str) -> Any:
+        tables, compute = self._rollups[name]
+        versions = tuple(TABLE_VERSIONS.version(table) for table in tables)
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == versions and time.monotonic() - entry[1] <= ROLLUP_CACHE_TTL:
+            self.hits += 1
+            return entry[2]
+        value = compute(db)
+        with self._lock:
+            self.loads += 1
+            self._entries[name] = (versions, time.monotonic(), value)
+        logger.debug("Computed rollup %s at versions %s", name, versions)
+        return value
+
+    def invalidate(self, name: str = None) -> None:
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.loads
+        return {
+            "hits": self.hits,
+            "loads": self.loads,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "cached": sorted(self._entries),
+        }
+
+
+ROLLUPS = RollupCache()
+
+
+@ROLLUPS.register("clients_overview", ("clients",))
+def clients_overview(db: Session) -> Dict[str, Any]:
+    """Client totals by status and access type, from one grouped query."""
+    rows = (
+        db.query(
+            models.Client.accesstype,
+            func.count(models.Client.id),
+            func.sum(case((models.Client.is_active == True, 1), else_=0)),
+        )
+        .group_by(models.Client.accesstype)
+        .all()
+    )
+    total_clients = sum(count for _, count, _ in rows)
+    active_clients = sum(int(active or 0) for _, _, active in rows)
+    return {
+        "total_clients": total_clients,
+        "active_clients": active_clients,
+        "inactive_clients": total_clients - active_clients,
+        "clients_by_access_type": {accesstype: count for accesstype, count, _ in rows},
+    }
+
+
+@ROLLUPS.register("client_counts", tuple(model.__tablename__ for model in CLIENT_COUNTED_MODELS))
+def client_counts(db: Session) -> Dict[int, Dict[str, int]]:
+    """Row counts per client for each of ``CLIENT_COUNTED_MODELS``, from one UNION ALL of grouped counts."""
+    counts = union_all(*(
+        select(model.client_id, literal(model.__tablename__).label("table_name"), func.count().label("row_count"))
+        .group_by(model.client_id)
+        for model in CLIENT_COUNTED_MODELS
+    ))
+    result: Dict[int, Dict[str, int]] = {}
+    for client_id, table, row_count in db.execute(counts):
+        result.setdefault(client_id, empty_counts())[table] = row_count
+    return result
+
+
+def empty_counts() -> Dict[str, int]:
+    return {model.__tablename__: 0 for model in CLIENT_COUNTED_MODELS}
@@ -0,0 +1,309 @@
+import math
+import os
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from ..database import models
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+# Minimum share of the query's trigrams a document must contain to match.
+# 0.5 tolerates roughly one typo per word ("pume" still finds "pune").
+MIN_SIMILARITY = float(os.getenv("SEARCH_MIN_SIMILARITY", "0.5"))
+# Tenant indexes are rebuilt after this many seconds so writes made by other
+# worker processes are eventually picked up.
+INDEX_TTL_SECONDS = int(os.getenv("SEARCH_INDEX_TTL", "600"))
+
+
+def normalize(text: Any) -> str:
+    """Lower-cases, strips accents and collapses punctuation to spaces."""
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode()
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in text.lower()).split())
+
+
+def trigrams(text: str, prefix: bool = False) -> Set[str]:
+    """
+    Word trigrams padded like pg_trgm (two leading spaces, one trailing).
+    With ``prefix`` the last word is left open-ended so "burg" matches "burger".
+    """
+    grams = set()
+    words = text.split()
+    for position, word in enumerate(words):
+        open_ended = prefix and position == len(words) - 1
+        padded = f"  {word}" + ("" if open_ended else " ")
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _Document:
+    __slots__ = ("grams", "fields", "words", "attrs")
+
+    def __init__(self, grams: FrozenSet[str], fields: Tuple[str, ...], attrs: Dict[str, Any]):
+        self.grams = grams
+        self.fields = fields
+        self.words = tuple(word for field in fields for word in field.split())
+        self.attrs = attrs
+
+
+class NgramIndex:
+    """In-memory trigram inverted index over a set of text fields."""
+
+    def __init__(self):
+        self.documents: Dict[int, _Document] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self.built_at = time.monotonic()
+
+    def upsert(self, doc_id: int, values: Sequence[Any], attrs: Optional[Dict[str, Any]] = None) -> None:
+        self.remove(doc_id)
+        fields = tuple(normalize(value) for value in values)
+        grams = frozenset(gram for field in fields for gram in trigrams(field))
+        self.documents[doc_id] = _Document(grams, fields, attrs or {})
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, doc_id: int) -> None:
+        document = self.documents.pop(doc_id, None)
+        if document is None:
+            return
+        for gram in document.grams:
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self.postings[gram]
+
+    def _containing_all(self, query_grams: Set[str]) -> Set[int]:
+        postings = sorted((self.postings.get(gram, set()) for gram in query_grams), key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            if not matches:
+                break
+            matches &= posting
+        return matches
+
+    def _candidates(self, query_grams: Set[str], required: int) -> Set[int]:
+        # A document sharing `required` of the n query grams must appear in at
+        # least one of the n - required + 1 rarest postings (pigeonhole), so
+        # only those lists are scanned.
+        postings = sorted((self.postings.get(gram, ()) for gram in query_grams), key=len)
+        candidates: Set[int] = set()
+        for posting in postings[:len(query_grams) - required + 1]:
+            candidates.update(posting)
+        return candidates
+
+    def search(self, term: str, filters: Optional[Dict[str, Any]] = None) -> List[Tuple[float, int]]:
+        """
+        Returns ``(score, doc_id)`` pairs, best first, for documents matching ``term``.
+
+        Documents containing every query trigram (prefix and substring hits)
+        are returned when there are any; only otherwise does the search fall
+        back to fuzzy matching on a share of the trigrams.
+        """
+        query = normalize(term)
+        query_grams = trigrams(query, prefix=True)
+        if not query_grams:
+            return []
+        candidates = self._containing_all(query_grams)
+        required = len(query_grams)
+        if not candidates:
+            required = max(1, math.ceil(len(query_grams) * MIN_SIMILARITY))
+            candidates = self._candidates(query_grams, required)
+
+        results = []
+        for doc_id in candidates:
+            document = self.documents[doc_id]
+            if filters and any(document.attrs.get(key) != value for key, value in filters.items()):
+                continue
+            shared = required if required == len(query_grams) else len(query_grams & document.grams)
+            if shared < required:
+                continue
+            score = shared / len(query_grams)
+            # Rank prefix and substring hits above purely fuzzy ones
+            if any(field.startswith(query) for field in document.fields):
+                score += 1.0
+            elif any(word.startswith(query) for word in document.words):
+                score += 0.5
+            elif any(query in field for field in document.fields):
+                score += 0.25
+            results.append((-score, doc_id))
+        results.sort()
+        return [(-negated, doc_id) for negated, doc_id in results]
+
+
+class SearchIndex:
+    """
+    Per-tenant n-gram indexes for one model.
+
+    A tenant's index is bulk-loaded from the database on its first search
+    and then kept current by the session hooks below, which apply committed
+    ORM inserts, updates and deletes. Only one request loads a given tenant
+    at a time; changes committed while it loads are replayed onto the new
+    index before it is published.
+    """
+
+    def __init__(self, model, fields: Sequence[str], tenant_field: Optional[str] = None,
+                 attr_fields: Sequence[str] = ()):
+        self.model = model
+        self.fields = list(fields)
+        self.tenant_field = tenant_field
+        self.attr_fields = list(attr_fields)
+        self._tenants: Dict[Optional[int], NgramIndex] = {}
+        # Per-tenant load locks, and the changes committed while a tenant is loading
+        self._loads: Dict[Optional[int], threading.Lock] = {}
+        self._pending: Dict[Optional[int], List[tuple]] = {}
+        # Bumped by invalidate() so a load that began before it is not published
+        self._epoch = 0
+        self._lock = threading.RLock()
+
+    def _tenant_of(self, row) -> Optional[int]:
+        return getattr(row, self.tenant_field) if self.tenant_field else None
+
+    def _load(self, db: Session, tenant_id: Optional[int]) -> NgramIndex:
+        started = time.perf_counter()
+        columns = [getattr(self.model, name) for name in ["id", *self.fields, *self.attr_fields]]
+        query = db.query(*columns)
+        if self.tenant_field:
+            query = query.filter(getattr(self.model, self.tenant_field) == tenant_id)
+
+        index = NgramIndex()
+        for row in query.execution_options(yield_per=5000):
+            values = [getattr(row, name) for name in self.fields]
+            attrs = {name: getattr(row, name) for name in self.attr_fields}
+            index.upsert(row.id, values, attrs)
+        logger.info("Built %s search index for tenant %s: %s rows in %.1f ms",
+                    self.model.__tablename__, tenant_id, len(index.documents),
+                    (time.perf_counter() - started) * 1000)
+        return index
+
+    def _fresh(self, tenant_id: Optional[int]) -> Optional[NgramIndex]:
+        index = self._tenants.get(tenant_id)
+        if index is None or time.monotonic() - index.built_at > INDEX_TTL_SECONDS:
+            return None
+        return index
+
+    def _tenant_index(self, db: Session, tenant_id: Optional[int]) -> NgramIndex:
+        index = self._fresh(tenant_id)
+        if index is not None:
+            return index
+        with self._lock:
+            load_lock = self._loads.setdefault(tenant_id, threading.Lock())
+        with load_lock:
+            # Another request may have built it while this one waited
+            index = self._fresh(tenant_id)
+            if index is not None:
+                return index
+            with self._lock:
+                epoch = self._epoch
+                self._pending[tenant_id] = []
+            try:
+                index = self._load(db, tenant_id)
+            except BaseException:
+                with self._lock:
+                    self._pending.pop(tenant_id, None)
+                raise
+            with self._lock:
+                for doc_id, values, attrs in self._pending.pop(tenant_id):
+                    self._change(index, doc_id, values, attrs)
+                if self._epoch == epoch:
+                    self._tenants[tenant_id] = index
+        return index
+
+    def search(self, db: Session, term: str, tenant_id: Optional[int] = None,
+               filters: Optional[Dict[str, Any]] = None, skip: int = 0, limit: int = 20) -> Tuple[List[int], int]:
+        """Returns the ranked IDs for one page and the total number of matches."""
+        index = self._tenant_index(db, tenant_id)
+        with self._lock:
+            ranked = index.search(term, filters)
+        return [doc_id for _, doc_id in ranked[skip:skip + limit]], len(ranked)
+
+    def snapshot(self, row, deleted: bool = False) -> List[tuple]:
+        """
+        Captures a flushed row's indexed values; row attributes are expired
+        once the commit completes. A row moved to another tenant is also
+        removed from the index of the tenant it left.
+        """
+        tenant_id = self._tenant_of(row)
+        values = None if deleted else [getattr(row, name) for name in self.fields]
+        attrs = None if deleted else {name: getattr(row, name) for name in self.attr_fields}
+        changes = [(self, tenant_id, row.id, values, attrs)]
+        if self.tenant_field:
+            history = inspect(row).attrs[self.tenant_field].history
+            changes.extend((self, previous, row.id, None, None)
+                           for previous in history.deleted if previous != tenant_id)
+        return changes
+
+    @staticmethod
+    def _change(index: NgramIndex, doc_id: int, values: Optional[list], attrs: Optional[dict]) -> None:
+        if values is None:
+            index.remove(doc_id)
+        else:
+            index.upsert(doc_id, values, attrs)
+
+    def apply(self, tenant_id: Optional[int], doc_id: int, values: Optional[list], attrs: Optional[dict]) -> None:
+        """Mirrors one committed row change into its tenant index, if that index is loaded or loading."""
+        with self._lock:
+            pending = self._pending.get(tenant_id)
+            if pending is not None:
+                pending.append((doc_id, values, attrs))
+            index = self._tenants.get(tenant_id)
+            if index is not None:
+                self._change(index, doc_id, values, attrs)
+
+    def invalidate(self, tenant_id: Optional[int] = None) -> None:
+        """Drops a tenant index (or all of them) so it is rebuilt on next use, e.g. after bulk SQL writes."""
+        with self._lock:
+            self._epoch += 1
+            if tenant_id is None:
+                self._tenants.clear()
+            else:
+                self._tenants.pop(tenant_id, None)
+
+
+CLIENT_SEARCH = SearchIndex(models.Client, ["username", "email"], attr_fields=["is_active", "accesstype"])
+OUTLET_SEARCH = SearchIndex(models.Outlet, ["resshortcode", "city", "subzone", "resid"],
+                            tenant_field="client_id", attr_fields=["is_active"])
+USER_SEARCH = SearchIndex(models.User, ["username", "usernumber", "useremail"],
+                          tenant_field="client_id", attr_fields=["is_active"])
+
+_INDEXES_BY_MODEL = {index.model: index for index in (CLIENT_SEARCH, OUTLET_SEARCH, USER_SEARCH)}
+
+
+def load_ranked(db: Session, model, ids: Iterable[int]) -> list:
+    """Loads rows for ``ids`` in one query, preserving the ranked order."""
+    ids = list(ids)
+    if not ids:
+        return []
+    rows = {row.id: row for row in db.query(model).filter(model.id.in_(ids)).all()}
+    return [rows[doc_id] for doc_id in ids if doc_id in rows]
+
+
+#__________________ Keep indexes in sync with committed ORM writes __________________
+@event.listens_for(Session, "after_flush")
+def _collect_search_changes(session, flush_context):
+    changes = session.info.setdefault("search_changes", [])
+    for row in session.new.union(session.dirty):
+        if type(row) in _INDEXES_BY_MODEL:
+            changes.extend(_INDEXES_BY_MODEL[type(row)].snapshot(row))
+    for row in session.deleted:
+        if type(row) in _INDEXES_BY_MODEL:
+            changes.extend(_INDEXES_BY_MODEL[type(row)].snapshot(row, deleted=True))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_search_changes(session):
+    for index, tenant_id, doc_id, values, attrs in session.info.pop("search_changes", []):
+        try:
+            index.apply(tenant_id, doc_id, values, attrs)
+        except Exception as e:
+            logger.warning("Search index update failed for %s: %s", index.model.__tablename__, str(e))
+            index.invalidate(tenant_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_search_changes(session):
+    session.info.pop("search_changes", None)
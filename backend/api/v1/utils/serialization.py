@@ -0,0 +1,20 @@
+from typing import Any, Optional
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# Serialises any mix of plain values and validated models, inferring types per value
+ANY_JSON = TypeAdapter(Any)
+
+
+def json_response(content: Any, response: Optional[Response] = None, adapter: TypeAdapter = ANY_JSON) -> Response:
+    """
+    Encodes ``content`` to JSON bytes in pydantic-core and returns it as a
+    ready response, skipping FastAPI's response_model validation and
+    jsonable_encoder pass. ``content`` must already be validated (models
+    built from ORM rows with one of the list adapters in schemas.py);
+    headers set on the injected ``response`` (ETag, cursors) are carried over.
+    """
+    headers = {}
+    if response is not None:
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return Response(content=adapter.dump_json(content), media_type="application/json", headers=headers)
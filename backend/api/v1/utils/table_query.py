@@ -0,0 +1,201 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Query, joinedload, load_only
+
+from .pagination import SortKey
+
+# Partial models kept per SparseFields, least recently used evicted first
+SPARSE_FIELDS_CACHE_SIZE = int(os.getenv("SPARSE_FIELDS_CACHE_SIZE", "128"))
+
+
+def csv_values(value: Optional[str]) -> List[str]:
+    """Splits a comma separated filter value (``"Mumbai,Pune"``) into its non-empty parts."""
+    if not value:
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def csv_ints(value: Optional[str], name: str) -> List[int]:
+    """Like :func:`csv_values` but for ID filters; a non-numeric part is a 400."""
+    try:
+        return [int(part) for part in csv_values(value)]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"'{name}' must be a comma separated list of IDs"
+        )
+
+
+def parse_sort(sort: Optional[str], allowed: Dict[str, Any]) -> List[SortKey]:
+    """
+    Parses ``"city,-resid"`` into sort keys; a leading ``-`` means descending.
+    Only columns listed in ``allowed`` may be sorted on.
+    """
+    sort_keys = []
+    for name in csv_values(sort):
+        desc = name.startswith("-")
+        column = allowed.get(name.lstrip("-+"))
+        if column is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot sort by '{name.lstrip('-+')}'. Allowed: {', '.join(sorted(allowed))}"
+            )
+        sort_keys.append((column, desc))
+    return sort_keys
+
+
+def search_clause(term: Optional[str], columns: Sequence[Any]):
+    """
+    Case-insensitive substring match of ``term`` against any of ``columns``;
+    None when no term. ``%`` and ``_`` in the term match literally.
+    """
+    if not term or not term.strip():
+        return None
+    escaped = term.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    return or_(*[column.ilike(pattern, escape="\\") for column in columns])
+
+
+class FilterSet:
+    """
+    Named filter clauses for a list query.
+
+    Keeping the clauses by name lets facet counts be computed with every
+    filter applied except the facet's own, so a selected city does not hide
+    the counts of the other cities.
+    """
+
+    def __init__(self):
+        self.clauses: Dict[str, Any] = {}
+
+    def add(self, name: str, clause) -> None:
+        if clause is not None:
+            self.clauses[name] = clause
+
+    def add_in(self, name: str, column, values: Sequence[Any]) -> None:
+        if values:
+            self.clauses[name] = column.in_(values)
+
+    def apply(self, query: Query, exclude: Optional[str] = None) -> Query:
+        for name, clause in self.clauses.items():
+            if name != exclude:
+                query = query.filter(clause)
+        return query
+
+
+def count_rows(query: Query, id_column) -> int:
+    """Counts matching rows without wrapping the ORM query in a subquery."""
+    return query.with_entities(func.count(id_column)).order_by(None).scalar() or 0
+
+
+def facet_counts(
+    base_query: Callable[[], Query],
+    filters: FilterSet,
+    facets: Dict[str, Any],
+    id_column,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Returns ``{facet: {value: count}}`` for each facet column, counted over
+    the filtered set with that facet's own filter left out.
+    """
+    result = {}
+    for name, column in facets.items():
+        rows = (
+            filters.apply(base_query(), exclude=name)
+            .with_entities(column, func.count(id_column))
+            .group_by(column)
+            .order_by(None)
+            .all()
+        )
+        result[name] = {str(value): count for value, count in rows}
+    return result
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parses a ``?fields=id,brandname`` sparse fieldset, keeping the given
+    order; None when absent (full rows). Unknown names are a 400.
+    """
+    names = tuple(dict.fromkeys(csv_values(fields)))
+    if not names:
+        return None
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s) {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return names
+
+
+def pick_fields(rows: Sequence[Any], selected: Sequence[str]) -> List[dict]:
+    """Keeps only ``selected`` keys of dict rows (or attributes of objects)."""
+    return [
+        {name: row[name] if isinstance(row, dict) else getattr(row, name) for name in selected}
+        for row in rows
+    ]
+
+
+class SparseFields:
+    """
+    Sparse fieldsets for one list schema backed by one model.
+
+    The requested scalar fields become a ``load_only`` projection (plus the
+    primary key and sort columns pagination needs) and requested
+    relationships a ``joinedload``, so the page query selects only what is
+    returned. Rows are serialised with a partial model of just those
+    fields. Requested fields are put in schema order, so every permutation
+    of a field set shares one partial model, and at most
+    ``SPARSE_FIELDS_CACHE_SIZE`` of those are kept.
+    """
+
+    def __init__(self, schema: Type[BaseModel], model, relationships: Optional[Dict[str, Any]] = None,
+                 full: Optional[TypeAdapter] = None):
+        self.schema = schema
+        self.model = model
+        self.relationships = relationships or {}
+        # Serialiser for requests without ?fields=
+        self.full = full or TypeAdapter(List[schema])
+        self._adapters: "OrderedDict[Tuple[str, ...], TypeAdapter]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def parse(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        selected = parse_fields(fields, list(self.schema.model_fields))
+        if selected is None:
+            return None
+        return tuple(name for name in self.schema.model_fields if name in selected)
+
+    def options(self, selected: Sequence[str], sort: Sequence[SortKey] = ()) -> list:
+        columns = [getattr(self.model, name) for name in selected if name not in self.relationships]
+        columns += [column for column, _ in sort]
+        options = [load_only(self.model.id, *columns)]
+        options += [joinedload(self.relationships[name]) for name in selected if name in self.relationships]
+        return options
+
+    def adapter(self, selected: Tuple[str, ...]) -> TypeAdapter:
+        with self._lock:
+            adapter = self._adapters.get(selected)
+            if adapter is not None:
+                self._adapters.move_to_end(selected)
+                return adapter
+        partial = create_model(
+            f"{self.schema.__name__}Fields",
+            __config__=ConfigDict(from_attributes=True),
+            **{name: (self.schema.model_fields[name].annotation, ...) for name in selected},
+        )
+        adapter = TypeAdapter(List[partial])
+        with self._lock:
+            self._adapters[selected] = adapter
+            while len(self._adapters) > SPARSE_FIELDS_CACHE_SIZE:
+                self._adapters.popitem(last=False)
+        return adapter
+
+    def dump(self, rows: Sequence[Any], selected: Optional[Tuple[str, ...]]) -> list:
+        """Validates ``rows`` into partial models holding only ``selected`` (full models when None)."""
+        adapter = self.adapter(selected) if selected else self.full
+        return adapter.validate_python(rows, from_attributes=True)
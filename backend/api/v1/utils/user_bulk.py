@@ -0,0 +1,78 @@
+from typing import List, Tuple
+from sqlalchemy import insert, or_
+from sqlalchemy.orm import Session
+
+from ..database import models
+from ..schemas import schemas
+from .outlet_bulk import ALL_OR_NOTHING, check_batch_mode
+from logger import create_logger
+
+logger = create_logger(__name__)
+
+
+def create_user_batch(
+    db: Session,
+    users: List[schemas.UserCreate],
+    mode: str = ALL_OR_NOTHING,
+) -> Tuple[schemas.UserBatchReport, List[models.User]]:
+    """
+    Creates users with a fixed number of queries: one for the referenced
+    clients, one for already registered numbers/emails, one multi-row INSERT
+    and one read-back. Every input row gets an outcome in the report; in
+    all-or-nothing mode a single failure means nothing is inserted. The
+    caller commits.
+    """
+    check_batch_mode(mode)
+
+    client_ids = {user.clientid for user in users}
+    known_clients = {client_id for (client_id,) in db.query(models.Client.id).filter(models.Client.id.in_(client_ids))}
+
+    numbers = {str(user.usernumber) for user in users}
+    emails = {user.useremail.lower() for user in users}
+    existing_numbers, existing_emails = set(), set()
+    for usernumber, useremail in db.query(models.User.usernumber, models.User.useremail).filter(
+        or_(models.User.usernumber.in_(numbers), models.User.useremail.in_(emails))
+    ):
+        existing_numbers.add(usernumber)
+        existing_emails.add(useremail.lower())
+
+    outcomes, rows = [], []
+    seen_numbers, seen_emails = set(), set()
+    for index, user in enumerate(users):
+        number, email = str(user.usernumber), user.useremail.lower()
+        outcome = schemas.UserBatchRow(index=index, usernumber=number, useremail=user.useremail, status="created")
+        if user.clientid not in known_clients:
+            outcome.status, outcome.detail = "error", "Unknown client ID passed"
+        elif number in existing_numbers or email in existing_emails:
+            outcome.status, outcome.detail = "duplicate", "User is already registered"
+        elif number in seen_numbers or email in seen_emails:
+            outcome.status, outcome.detail = "duplicate", "Repeated earlier in the batch"
+        else:
+            seen_numbers.add(number)
+            seen_emails.add(email)
+            rows.append({"username": user.username, "usernumber": number,
+                         "useremail": user.useremail, "client_id": user.clientid})
+        outcomes.append(outcome)
+
+    failed = sum(1 for outcome in outcomes if outcome.status != "created")
+    if failed and mode == ALL_OR_NOTHING:
+        for outcome in outcomes:
+            if outcome.status == "created":
+                outcome.status, outcome.detail = "rolled_back", "Batch rejected"
+        logger.warning("User batch rejected: %s of %s row(s) failed", failed, len(users))
+        return schemas.UserBatchReport(created=0, failed=failed, committed=False, rows=outcomes), []
+
+    created_users = []
+    if rows:
+        db.execute(insert(models.User), rows)
+        # MySQL has no INSERT ... RETURNING; read the new rows back by their unique number
+        created_users = db.query(models.User).filter(
+            models.User.usernumber.in_(seen_numbers)
+        ).order_by(models.User.id).all()
+        ids = {user.usernumber: user.id for user in created_users}
+        for outcome in outcomes:
+            if outcome.status == "created":
+                outcome.user_id = ids.get(outcome.usernumber)
+
+    report = schemas.UserBatchReport(created=len(created_users), failed=failed, committed=True, rows=outcomes)
+    return report, created_users
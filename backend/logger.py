@@ -1,76 +1,288 @@
 import os
+import sys
+import json
+import queue
+import atexit
+import random
 import logging
-import inspect
-from logging.handlers import TimedRotatingFileHandler
-from typing import Optional
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import Any, Dict, Optional
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Per-module log files can be switched off in favour of a single shared file
+# (``logs/app/app.log``); the structured access log is always written.
+MODULE_LOG_FILES = os.getenv("LOG_MODULE_FILES", "true").lower() not in ("0", "false", "no")
+
+# Argument types that are safe to format later on the writer thread. Anything
+# else (ORM rows, dicts, lists) is rendered eagerly so the log line reflects
+# the object as it was when the call was made.
+_DEFERRABLE_ARG_TYPES = (str, int, float, bool, type(None))
+
+
+def _parse_sample_rates(raw: Optional[str]) -> Dict[int, float]:
+    """
+    Parses ``LOG_SAMPLE_RATES`` (e.g. ``"DEBUG=0,INFO=0.25"``) into a
+    ``{levelno: rate}`` mapping. WARNING and above are never sampled.
+    """
+    rates = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        level_name, _, value = item.partition("=")
+        levelno = logging.getLevelName(level_name.strip().upper())
+        if not isinstance(levelno, int) or levelno >= logging.WARNING:
+            continue
+        try:
+            rates[levelno] = min(max(float(value), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class RequestLogContext:
+    """Mutable per-request state shared by the access log, DB timing hooks and module logs."""
+
+    __slots__ = ("request_id", "client_id", "db_time_ms", "db_queries")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.client_id: Optional[int] = None
+        self.db_time_ms = 0.0
+        self.db_queries = 0
+
+
+request_context_var: ContextVar[Optional[RequestLogContext]] = ContextVar("request_context", default=None)
+
+
+def current_request_context() -> Optional[RequestLogContext]:
+    """Returns the log context of the request being served, if any."""
+    return request_context_var.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each record with the current request ID so module logs can be correlated."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context_var.get()
+        record.request_id = context.request_id if context is not None else "-"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Renders a record as one JSON object per line, merging the ``fields`` extra."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+        }
+        payload.update(getattr(record, "fields", None) or {"message": record.getMessage()})
+        return json.dumps(payload, default=str, separators=(",", ":"))
+
+
+class LevelSamplingFilter(logging.Filter):
+    """Keeps a configurable fraction of records per level; WARNING+ always pass."""
+
+    def __init__(self, rates: Dict[int, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the writer thread.
+
+    The stock ``prepare`` renders the full formatted line on the calling
+    thread; here we only merge the arguments when they are not plain values.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args:
+            values = args.values() if isinstance(args, dict) else args
+            if not all(isinstance(value, _DEFERRABLE_ARG_TYPES) for value in values):
+                record.msg = record.getMessage()
+                record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait(record)
+        _ensure_listener()
+
+
+class _LoggerRouter(logging.Handler):
+    """Dispatches records on the writer thread to the handlers registered for their logger."""
+
+    def __init__(self):
+        super().__init__()
+        self._targets: Dict[str, list] = {}
+        self._targets_lock = threading.Lock()
+
+    def register(self, name: str, handler: logging.Handler) -> None:
+        with self._targets_lock:
+            self._targets.setdefault(name, []).append(handler)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._targets
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in self._targets.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
+
+    def close(self) -> None:
+        with self._targets_lock:
+            for handlers in self._targets.values():
+                for handler in handlers:
+                    handler.close()
+        super().close()
+
+
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_router = _LoggerRouter()
+_queue_handler = DeferredQueueHandler(_log_queue)
+_queue_handler.addFilter(LevelSamplingFilter(_parse_sample_rates(os.getenv("LOG_SAMPLE_RATES"))))
+_queue_handler.addFilter(RequestIdFilter())
+# The access log samples successful requests itself and must keep every error
+# line, which it writes at INFO, so its records skip the level sampler
+_access_queue_handler = DeferredQueueHandler(_log_queue)
+_access_queue_handler.addFilter(RequestIdFilter())
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+_atexit_registered = False
+
+
+def _ensure_listener() -> None:
+    """Starts the single background writer thread on first use."""
+    global _listener, _atexit_registered
+    if _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = QueueListener(_log_queue, _router)
+            _listener.start()
+            if not _atexit_registered:
+                atexit.register(stop_logging)
+                _atexit_registered = True
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the background writer."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _rotating_file_handler(file_name: str, formatter: logging.Formatter) -> TimedRotatingFileHandler:
+    """Builds the daily-rotating handler for ``logs/<file_name>/<file_name>.log``."""
+    # Create subdirectory for this script's logs
+    filedir = os.path.join(ROOT_DIR, 'logs', file_name)
+    os.makedirs(filedir, exist_ok=True)
+
+    handler = TimedRotatingFileHandler(
+        os.path.join(filedir, f'{file_name}.log'),
+        when='midnight',
+        interval=1,
+        encoding='utf-8',
+        backupCount=5  # Keep logs for 5 days
+    )
+    handler.suffix = "%Y-%m-%d.log"
+    handler.setFormatter(formatter)
+    return handler
+
+
+_TEXT_FORMATTER = logging.Formatter(
+    "%(asctime)s - %(levelname)s - %(request_id)s - %(module)s - %(funcName)s - %(lineno)d - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+_shared_app_handler: Optional[logging.Handler] = None
+
+
+def _module_handler(file_name: str) -> logging.Handler:
+    """Per-module file handler, or the shared app handler when module files are disabled."""
+    global _shared_app_handler
+    if MODULE_LOG_FILES:
+        return _rotating_file_handler(file_name, _TEXT_FORMATTER)
+    if _shared_app_handler is None:
+        _shared_app_handler = _rotating_file_handler("app", _TEXT_FORMATTER)
+    return _shared_app_handler
+
+
+def create_access_logger(name: str = "access") -> logging.Logger:
+    """
+    Creates the structured access logger: one JSON object per line in
+    ``logs/<name>/<name>.log``, written by the shared background writer.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not _router.is_registered(name):
+        _router.register(name, _rotating_file_handler(name, JsonFormatter()))
+        logger.addHandler(_access_queue_handler)
+        _ensure_listener()
+    return logger
+
 
 def create_logger(file_name: Optional[str] = None) -> logging.Logger:
     """
     Creates and configures a logger with file rotation and detailed formatting.
-    
+
+    Records are handed to a shared queue and written by one background
+    thread, so callers never block on disk I/O or log rotation.
+
     Args:
         file_name (Optional[str]): Optional name for the log file. If not provided,
                                   the name will be derived from the calling script.
-    
+
     Returns:
         logging.Logger: Configured logger instance.
-    
+
     Raises:
         OSError: If there are issues creating directories.
         Exception: For other unexpected errors during logger setup.
     """
     try:
-        # Determine the log file name
+        # Determine the log file name from the caller's code object; unlike
+        # inspect.stack() this does not read source lines for every frame
         if file_name is None:
-            frame = inspect.stack()[1]
-            file_path = frame.filename
+            file_path = sys._getframe(1).f_code.co_filename
             file_name = os.path.splitext(os.path.basename(file_path))[0]
 
-        root = ROOT_DIR
-
-        # Create directory structure
-        logdir = os.path.join(root, 'logs')
-        os.makedirs(logdir, exist_ok=True)
-
-        # Create subdirectory for this script's logs
-        filedir = os.path.join(logdir, file_name)
-        os.makedirs(filedir, exist_ok=True)
-
-        # Configure log file path and formatting
-        log_file_path = os.path.join(filedir, f'{file_name}.log')
-        
-        formatter = logging.Formatter(
-            "%(asctime)s - %(levelname)s - %(module)s - %(funcName)s - %(lineno)d - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-
-        # Configure rotating file handler
-        handler = TimedRotatingFileHandler(
-            log_file_path,
-            when='midnight',
-            interval=1,
-            encoding='utf-8',
-            backupCount=5  # Keep logs for 5 days
-        )
-        handler.suffix = "%Y-%m-%d.log"
-        handler.setFormatter(formatter)
-
         # Create and configure logger
         logger = logging.getLogger(file_name)
         logger.setLevel(logging.INFO)
-        
+
         # Avoid duplicate handlers
-        if not logger.handlers:
-            logger.addHandler(handler)
-        
+        if _router.is_registered(file_name):
+            return logger
+
+        # Configure rotating file handler (runs on the writer thread)
+        _router.register(file_name, _module_handler(file_name))
+
         # Add console handler for development
         if os.getenv('ENVIRONMENT', 'production').lower() == 'development':
             console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
+            console_handler.setFormatter(_TEXT_FORMATTER)
+            _router.register(file_name, console_handler)
+
+        logger.addHandler(_queue_handler)
+        _ensure_listener()
 
         return logger
 
@@ -79,4 +291,4 @@ def create_logger(file_name: Optional[str] = None) -> logging.Logger:
         raise
     except Exception as e:
         print(f"Unexpected error creating logger: {e}")
-        raise
\ No newline at end of file
+        raise
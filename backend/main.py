@@ -2,13 +2,21 @@ from dotenv import load_dotenv
 import uvicorn
 from contextlib import asynccontextmanager
 from api.v1.routers import auth
-from logger import create_logger
-from fastapi import APIRouter, Depends, FastAPI
+from logger import create_logger, stop_logging
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from datetime import datetime, timezone, timedelta
 from api.v1.routers import auth, access, admin, automation, dashboard, clients, help
 from api.v1.database import models
-from api.v1.database.database import engine, test_connection, get_database_info, create_tables
+from api.v1.database.database import SessionLocal, engine, test_connection, get_database_info, create_tables, apply_index_migrations
+from api.v1.utils.request_logging import AccessLogMiddleware
+from api.v1.utils.blob_store import offload_gstdocs
+from api.v1.utils.compression import PRECOMPRESSED, CompressionMiddleware
+from api.v1.utils.catalogue import CATALOGUE
+from api.v1.utils.etag import TABLE_VERSIONS
+from api.v1.utils.ownership import OWNERSHIP_CACHE
+from api.v1.utils.rollups import ROLLUPS
 
 logger = create_logger()
 
@@ -39,6 +47,15 @@ async def lifespan(app: FastAPI):
             logger.error(f"Failed to create database tables: {e}")
             raise
 
+        # 4. Add indexes declared on models after their tables were created
+        created_indexes = apply_index_migrations()
+        logger.info(f"Index migrations applied: {created_indexes or 'none needed'}")
+
+        # 5. Move large GST documents already stored on brand rows into the blob store
+        with SessionLocal() as db:
+            moved_gstdocs = offload_gstdocs(db)
+        logger.info(f"GST documents moved to the blob store: {moved_gstdocs}")
+
         logger.info("Application startup completed successfully")
             
     except Exception as e:
@@ -57,11 +74,14 @@ async def lifespan(app: FastAPI):
     logger.info("Application shutdown completed")
     
     logger.info("Application shutdown completed")
+    stop_logging()
 
 # Initialize FastAPI application with lifespan
 logger.info("Initializing FastAPI application...")
 app = FastAPI(
     title="Client Data Portal",
+    # orjson for every JSON body the handlers do not encode themselves
+    default_response_class=ORJSONResponse,
     description="API for getting data for Data Portal",
     version="1.0.0",
     # terms_of_service="",
@@ -83,6 +103,10 @@ app = FastAPI(
 IST = timezone(timedelta(hours=5, minutes=30))
 logger.debug(f"Timezone set to IST: {IST}")
 
+# Compress large JSON and export responses (innermost, so CORS and access log see the final headers)
+app.add_middleware(CompressionMiddleware)
+logger.info("Compression middleware configured")
+
 # Configure CORS
 logger.info("Configuring CORS middleware...")
 app.add_middleware(
@@ -91,9 +115,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 logger.info("CORS middleware configured")
 
+# Structured access log with request IDs (outermost, so it times CORS as well)
+app.add_middleware(AccessLogMiddleware)
+logger.info("Access log middleware configured")
+
 # Health check endpoint
 @app.get("/", include_in_schema=False)
 async def root():
@@ -136,6 +165,22 @@ async def database_info():
         "database_info": get_database_info()
     }
 
+# In-process cache statistics
+@app.get("/cache-stats", include_in_schema=False)
+async def cache_stats(current_session = Depends(auth.get_current_session)):
+    """Hit rates of the per-process caches (internal clients only)"""
+    if not current_session.is_internal:
+        raise HTTPException(status_code=404, detail="Unauthorized to use this API")
+    return {
+        "timestamp": datetime.now(IST).isoformat(),
+        "ownership": OWNERSHIP_CACHE.stats(),
+        "auth_contexts": auth.AUTH_CONTEXTS.stats(),
+        "catalogue": CATALOGUE.stats(),
+        "table_versions": TABLE_VERSIONS.stats(),
+        "precompressed": PRECOMPRESSED.stats(),
+        "rollups": ROLLUPS.stats()
+    }
+
 # Main router for API version 1
 logger.info("Setting up API version 1 router...")
 api_v1_router = APIRouter(prefix="/api/v1")
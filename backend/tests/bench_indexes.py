@@ -0,0 +1,122 @@
+"""
+Benchmark for the tenant-scoped composite indexes.
+
+Seeds a large dataset, times the hot list/ownership queries with the model
+indexes in place, then drops them and times the same queries again.
+
+Usage:
+    python tests/bench_indexes.py [--clients 200] [--outlets 200000] [--repeat 50]
+
+Set BENCH_DATABASE_URL to run against a scratch MySQL schema instead of the
+default in-memory SQLite database. All model tables are dropped afterwards.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import random
+import time
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, insert, select, text
+
+from api.v1.database import models
+from api.v1.database.database import Base
+
+PLANNED_INDEXES = {
+    "ix_user_sessions_client_active", "ix_outlets_client_active", "ix_outlet_services_client_outlet",
+    "ix_user_services_client_user", "ix_user_outlets_client_user",
+}
+INDEXES = [index for table in Base.metadata.sorted_tables for index in table.indexes
+           if index.name in PLANNED_INDEXES]
+
+
+def seed(engine, n_clients: int, n_outlets: int) -> None:
+    now = datetime.now()
+    outlets_per_client = max(n_outlets // n_clients, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Client), [
+            {"id": c, "username": f"client{c}", "email": f"c{c}@example.com", "hashed_password": "x",
+             "is_active": True, "accesstype": "client", "created_at": now}
+            for c in range(1, n_clients + 1)
+        ])
+        conn.execute(insert(models.Brand), [
+            {"id": c, "brandname": f"Brand {c}", "gstin": f"{c:015d}", "legal_name_of_business": f"Brand {c}",
+             "date_of_registration": date(2024, 1, 1), "gstdoc": {}, "client_id": c}
+            for c in range(1, n_clients + 1)
+        ])
+        rows, users = [], []
+        for c in range(1, n_clients + 1):
+            for i in range(outlets_per_client):
+                rows.append({"aggregator": random.choice(["Swiggy", "Zomato"]), "resid": f"{c}{i:07d}",
+                             "subzone": "Zone", "resshortcode": f"B{c} - Zone", "city": "Mumbai",
+                             "outletnumber": str(i), "is_active": i % 5 != 0, "client_id": c, "brand_id": c,
+                             "created_at": now})
+            users.extend({"username": f"user{c}_{u}", "usernumber": f"{c}{u:06d}",
+                          "useremail": f"u{c}_{u}@example.com", "client_id": c, "created_at": now}
+                         for u in range(max(outlets_per_client // 10, 1)))
+        for start in range(0, len(rows), 10_000):
+            conn.execute(insert(models.Outlet), rows[start:start + 10_000])
+        for start in range(0, len(users), 10_000):
+            conn.execute(insert(models.User), users[start:start + 10_000])
+        conn.execute(insert(models.UserSession), [
+            {"client_id": c, "session_token": f"token-{c}", "email": f"c{c}@example.com",
+             "created_at": now, "expires_at": now, "is_active": c % 2 == 0}
+            for c in range(1, n_clients + 1)
+        ])
+
+
+def hot_queries(client_id: int):
+    return {
+        "outlets by client+active": select(models.Outlet.id).where(
+            models.Outlet.client_id == client_id, models.Outlet.is_active == True).limit(100),
+        "users by client": select(models.User.id).where(models.User.client_id == client_id).limit(100),
+        "brands by client": select(models.Brand.id).where(models.Brand.client_id == client_id),
+        "active session by client": select(models.UserSession.id).where(
+            models.UserSession.client_id == client_id, models.UserSession.is_active == True).limit(1),
+    }
+
+
+def time_queries(engine, n_clients: int, repeat: int) -> dict:
+    timings = {}
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            for name, statement in hot_queries(random.randint(1, n_clients)).items():
+                started = time.perf_counter()
+                conn.execute(statement).fetchall()
+                timings[name] = timings.get(name, 0.0) + (time.perf_counter() - started)
+    return {name: total / repeat * 1000 for name, total in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--outlets", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(os.getenv("BENCH_DATABASE_URL", "sqlite://"))
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        print(f"Seeding {args.clients} clients / {args.outlets} outlets ...")
+        seed(engine, args.clients, args.outlets)
+
+        indexed = time_queries(engine, args.clients, args.repeat)
+        with engine.begin() as conn:
+            for index in INDEXES:
+                conn.execute(text(f"DROP INDEX {index.name}" if engine.dialect.name == "sqlite"
+                                  else f"DROP INDEX {index.name} ON {index.table.name}"))
+        unindexed = time_queries(engine, args.clients, args.repeat)
+
+        print(f"{'query':<28}{'indexed ms':>12}{'no index ms':>14}{'speedup':>10}")
+        for name in indexed:
+            print(f"{name:<28}{indexed[name]:>12.3f}{unindexed[name]:>14.3f}"
+                  f"{unindexed[name] / max(indexed[name], 1e-9):>9.1f}x")
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
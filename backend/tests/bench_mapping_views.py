@@ -0,0 +1,113 @@
+"""
+Benchmark for the /access mapping list views.
+
+Seeds one tenant with many mappings and requests each view (grouped and
+flat) at growing page sizes, reporting latency and the number of SQL
+statements per request. The statement count stays at one whatever the
+page size; what latency growth remains is serialization of the rows.
+
+Usage:
+    python tests/bench_mapping_views.py [--outlets 5000] [--users 500] [--repeat 20]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import time
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from api.v1.database import models
+from api.v1.database.database import Base, get_db
+from api.v1.routers.auth import AuthContext, get_current_session
+
+VIEWS = ["outlet-service-mappings", "user-service-mappings", "user-outlet-mappings"]
+PAGE_SIZES = [10, 100, 1000]
+
+
+def seed(engine, n_outlets: int, n_users: int) -> None:
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(models.Client), [{"id": 10, "username": "client10", "email": "c10@example.com",
+                                              "hashed_password": "x", "accesstype": "client", "created_at": now}])
+        conn.execute(insert(models.Brand), [{"id": 1, "brandname": "Burger King", "gstin": "22ABCDE1234F1Z5",
+                                             "legal_name_of_business": "BK", "date_of_registration": date(2024, 1, 1),
+                                             "gstdoc": {}, "client_id": 10}])
+        conn.execute(insert(models.Service), [{"id": s, "servicename": f"service{s}", "servicevariant": "std",
+                                               "created_at": now} for s in range(1, 4)])
+        conn.execute(insert(models.Outlet), [
+            {"id": o, "aggregator": "Swiggy", "resid": str(100000 + o), "subzone": "Zone", "resshortcode": "BK - Zone",
+             "city": "Mumbai", "outletnumber": str(o), "is_active": True, "client_id": 10, "brand_id": 1, "created_at": now}
+            for o in range(1, n_outlets + 1)
+        ])
+        conn.execute(insert(models.User), [
+            {"id": u, "username": f"user{u}", "usernumber": str(900000 + u), "useremail": f"u{u}@example.com",
+             "client_id": 10, "created_at": now}
+            for u in range(1, n_users + 1)
+        ])
+        conn.execute(insert(models.OutletService), [
+            {"outlet_id": o, "service_id": 1 + o % 3, "client_id": 10, "created_at": now} for o in range(1, n_outlets + 1)
+        ])
+        conn.execute(insert(models.UserService), [
+            {"user_id": u, "service_id": s, "client_id": 10, "created_at": now}
+            for u in range(1, n_users + 1) for s in range(1, 4)
+        ])
+        conn.execute(insert(models.UserOutlet), [
+            {"user_id": 1 + (o + k) % n_users, "outlet_id": o, "client_id": 10, "created_at": now}
+            for o in range(1, n_outlets + 1) for k in range(3)
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--outlets", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    def override_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_db
+    caller = AuthContext(session_id=1, client_id=10, email="c10@example.com", expires_at=None, client_email="c10@example.com",
+                         client_name="client10", accesstype="client", client_is_active=True, google_linked=False)
+    app.dependency_overrides[get_current_session] = lambda: caller
+    client = TestClient(app)
+    try:
+        print(f"Seeding {args.outlets} outlets / {args.users} users ...")
+        seed(engine, args.outlets, args.users)
+
+        print(f"{'view':<26}{'grouped':>8}{'page':>7}{'queries':>9}{'ms':>10}")
+        for view in VIEWS:
+            for grouped in ("true", "false"):
+                for limit in PAGE_SIZES:
+                    params = {"client_id": 10, "grouped": grouped, "limit": limit}
+                    client.get(f"/api/v1/access/{view}/", params=params)  # warm-up
+                    statements.clear()
+                    started = time.perf_counter()
+                    for _ in range(args.repeat):
+                        client.get(f"/api/v1/access/{view}/", params=params)
+                    elapsed = (time.perf_counter() - started) / args.repeat * 1000
+                    print(f"{view:<26}{grouped:>8}{limit:>7}{len(statements) // args.repeat:>9}{elapsed:>10.1f}")
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark for list response serialisation.
+
+Builds 10k in-memory outlet rows and 10k outlet <> service mapping rows
+(with their outlet, service and client) and times three ways of turning
+them into a JSON body:
+
+  legacy     per-row model_validate, then jsonable_encoder + json.dumps
+             (the old outlet-service mapping view)
+  response   response_model handling: validate, dump to Python, encode
+  adapter    one TypeAdapter.validate_python pass, then dump_json in
+             pydantic-core (utils.serialization.json_response)
+
+Usage:
+    python tests/bench_serialization.py [--rows 10000] [--repeat 5]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import time
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from api.v1.database import models
+from api.v1.schemas import schemas
+from api.v1.utils.serialization import json_response
+
+
+def build_rows(n: int):
+    now = datetime.now()
+    client = models.Client(id=10, username="client10", email="c10@example.com", hashed_password="x",
+                           accesstype="client", is_active=True, google_linked=False, created_at=now)
+    services = [models.Service(id=s, servicename=f"service{s}", servicevariant="std", created_at=now) for s in range(1, 4)]
+    outlets = [
+        models.Outlet(id=o, aggregator="Swiggy", resid=str(100000 + o), subzone=f"Zone {o % 300}",
+                      resshortcode=f"BK - Zone {o % 300}", city="Mumbai", outletnumber=str(o), is_active=True,
+                      client_id=10, brand_id=1, created_at=now)
+        for o in range(1, n + 1)
+    ]
+    mappings = [
+        models.OutletService(id=o.id, outlet=o, service=services[o.id % 3], client=client, client_id=10, created_at=now)
+        for o in outlets
+    ]
+    return outlets, mappings
+
+
+def timed(repeat: int, render) -> tuple:
+    best, size = None, 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(render())
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    outlets, mappings = build_rows(args.rows)
+    cases = {
+        "outlets": (schemas.DisplayOutlet, schemas.OUTLET_LIST, outlets),
+        "outlet-service mappings": (schemas.DisplayOutletService, schemas.OUTLET_SERVICE_LIST, mappings),
+    }
+    print(f"{'list':<26}{'path':<10}{'best ms':>10}{'bytes':>12}")
+    for name, (model, adapter, rows) in cases.items():
+        paths = {
+            "legacy": lambda: JSONResponse(jsonable_encoder([model.model_validate(row) for row in rows])).body,
+            "response": lambda: ORJSONResponse(
+                adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+            ).body,
+            "adapter": lambda: json_response(adapter.validate_python(rows, from_attributes=True)).body,
+        }
+        for path, render in paths.items():
+            best, size = timed(args.repeat, render)
+            print(f"{name:<26}{path:<10}{best:>10.1f}{size:>12}")
+
+
+if __name__ == "__main__":
+    main()
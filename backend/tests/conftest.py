@@ -0,0 +1,75 @@
+# Shared API Test Fixtures
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from api.v1.database.database import Base, get_db
+from api.v1.routers.auth import AuthContext, get_current_session
+from api.v1.utils.ownership import OWNERSHIP_CACHE
+
+
+class ApiEnv:
+    """
+    The app wired to one in-memory SQLite database: ``client`` calls it,
+    ``Session`` opens sessions on the same database and ``statements``
+    collects the SQL run after seeding.
+    """
+
+    def __init__(self, engine, Session):
+        self.engine = engine
+        self.Session = Session
+        self.client = TestClient(app)
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: self.statements.append(args[2]))
+
+    def login(self, client_id: int) -> None:
+        """Makes every request run as a session of ``client_id`` (internal IDs are internal callers)."""
+        caller = AuthContext(session_id=1, client_id=client_id, email=f"c{client_id}@example.com", expires_at=None,
+                             client_email=f"c{client_id}@example.com", client_name=f"client{client_id}",
+                             accesstype="client", client_is_active=True, google_linked=False)
+        app.dependency_overrides[get_current_session] = lambda: caller
+
+
+@pytest.fixture
+def api_env():
+    """
+    Factory for :class:`ApiEnv`. Each positional argument is a list of rows
+    added and flushed in order (so later lists may reference earlier IDs);
+    ``client_id`` picks the caller.
+    """
+    envs = []
+
+    def make(*batches, client_id: int = 10) -> ApiEnv:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, expire_on_commit=False)
+        with Session() as session:
+            for rows in batches:
+                session.add_all(rows)
+                session.flush()
+            session.commit()
+        OWNERSHIP_CACHE.invalidate()
+
+        def override_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_db
+        env = ApiEnv(engine, Session)
+        env.login(client_id)
+        envs.append(env)
+        return env
+
+    yield make
+    app.dependency_overrides.clear()
+    for env in envs:
+        env.engine.dispose()
@@ -0,0 +1,86 @@
+# Auth Context Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.routers.auth import AUTH_CONTEXTS, get_current_session
+
+
+def bearer(token):
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    now = datetime.utcnow()
+    session.add_all([
+        models.Client(id=1, username="internal", email="ops@example.com", hashed_password="x", accesstype="admin",
+                      is_active=True, google_linked=False),
+        models.Client(id=10, username="client10", email="c10@example.com", hashed_password="x", accesstype="client",
+                      is_active=True, google_linked=True),
+        models.UserSession(id=1, client_id=1, session_token="ops-token", email="ops@example.com",
+                           created_at=now, expires_at=now + timedelta(days=1), is_active=True),
+        models.UserSession(id=2, client_id=10, session_token="c10-token", email="c10@example.com",
+                           created_at=now, expires_at=now + timedelta(days=1), is_active=True),
+        models.UserSession(id=3, client_id=10, session_token="old-token", email="c10@example.com",
+                           created_at=now, expires_at=now - timedelta(minutes=1), is_active=True),
+    ])
+    session.commit()
+    AUTH_CONTEXTS._contexts.clear()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_session_and_client_resolve_in_one_query_then_from_cache(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    context = get_current_session(bearer("c10-token"), db)
+    assert len(statements) == 1 and "JOIN clients" in statements[0]
+    assert (context.client_id, context.client_name, context.client_is_active, context.google_linked) == (10, "client10", True, True)
+    assert not context.is_internal and not context.is_admin
+
+    assert get_current_session(bearer("c10-token"), db) is context
+    assert len(statements) == 1
+
+
+def test_internal_clients_are_flagged(db):
+    context = get_current_session(bearer("ops-token"), db)
+    assert context.is_internal and context.is_admin
+
+
+def test_expired_and_unknown_tokens_are_rejected(db):
+    for token in ("old-token", "missing"):
+        with pytest.raises(HTTPException) as error:
+            get_current_session(bearer(token), db)
+        assert error.value.status_code == 401
+
+
+def test_evicted_contexts_are_reloaded(db):
+    get_current_session(bearer("c10-token"), db)
+    db.query(models.Client).filter(models.Client.id == 10).update({models.Client.is_active: False})
+    db.commit()
+    assert get_current_session(bearer("c10-token"), db).client_is_active
+
+    AUTH_CONTEXTS.evict_client(10)
+    assert not get_current_session(bearer("c10-token"), db).client_is_active
+
+    # A logged-out session is no longer served from the cache
+    db.query(models.UserSession).filter(models.UserSession.id == 2).update({models.UserSession.is_active: False})
+    db.commit()
+    AUTH_CONTEXTS.evict("c10-token")
+    with pytest.raises(HTTPException):
+        get_current_session(bearer("c10-token"), db)
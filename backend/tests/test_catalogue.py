@@ -0,0 +1,93 @@
+# Catalogue Cache Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.utils.catalogue import CATALOGUE
+
+
+def brand(id, name):
+    return models.Brand(id=id, brandname=name, gstin=f"GST{id}", legal_name_of_business=name,
+                        date_of_registration=date(2024, 1, 1), gstdoc={"pages": ["x" * 1000]}, client_id=10)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    session.add_all([brand(1, "Burger King"), brand(2, "Subway")] + [
+        models.Service(id=i, servicename=f"service{i}", servicevariant="standard") for i in range(1, 6)
+    ])
+    session.commit()
+    CATALOGUE.invalidate()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def count_statements(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_reads_are_served_from_the_snapshot(db):
+    statements = count_statements(db)
+    assert CATALOGUE.brand_names(db) == [{"brand_name": "BK", "id": 1}, {"brand_name": "Subway", "id": 2}]
+    assert [service.id for service in CATALOGUE.services(db)] == [1, 2, 3, 4, 5]
+    assert len(statements) == 2  # one per table
+    assert not any("gstdoc" in statement for statement in statements)
+
+    for _ in range(10):
+        CATALOGUE.brand_names(db)
+        CATALOGUE.service(db, 3)
+    assert len(statements) == 2
+
+
+def test_committed_writes_invalidate_the_snapshot(db):
+    version = CATALOGUE.snapshot(db).version
+    db.add(brand(3, "Pizza Hut Express"))
+    db.commit()
+    assert CATALOGUE.brand_names(db)[-1] == {"brand_name": "PHE", "id": 3}
+    assert CATALOGUE.snapshot(db).version > version
+
+    db.delete(db.get(models.Service, 5))
+    db.commit()
+    assert [service.id for service in CATALOGUE.services(db)] == [1, 2, 3, 4]
+
+
+def test_rolled_back_writes_keep_the_snapshot(db):
+    snapshot = CATALOGUE.snapshot(db)
+    db.add(models.Service(id=6, servicename="service6", servicevariant="standard"))
+    db.flush()
+    db.rollback()
+    assert CATALOGUE.snapshot(db) is snapshot
+
+
+def test_unknown_service_is_looked_up_alone(db):
+    CATALOGUE.snapshot(db)
+    loads = CATALOGUE.loads
+    # Written without the ORM, as another worker process would
+    db.execute(models.Service.__table__.insert().values(id=7, servicename="service7", servicevariant="express"))
+    db.commit()
+    statements = count_statements(db)
+    assert CATALOGUE.service(db, 7).servicevariant == "express"
+    assert CATALOGUE.service(db, 99) is None
+    assert len(statements) == 2 and all("services.id = " in statement for statement in statements)
+    assert CATALOGUE.loads == loads
+
+
+def test_load_racing_an_invalidation_is_not_published(db):
+    statements = count_statements(db)
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda *args: len(statements) == 1 and CATALOGUE.invalidate())
+    stale = CATALOGUE.snapshot(db)
+    assert CATALOGUE.snapshot(db) is not stale
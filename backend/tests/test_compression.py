@@ -0,0 +1,77 @@
+# Response Compression Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import gzip
+import zlib
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from api.v1.utils.compression import PRECOMPRESSED, CompressionMiddleware, negotiate
+
+ROWS = [{"id": i, "resshortcode": f"BK - Subzone {i % 40}", "city": "Mumbai", "is_active": True} for i in range(2000)]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/large")
+    async def large(response: Response):
+        response.headers["ETag"] = 'W/"v1"'
+        return ROWS
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse((f'{{"id": {i}}}\n' * 500 for i in range(5)), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+
+def raw(client, url, accept_encoding):
+    # Read the body as sent, without the test client's transparent decoding
+    with client.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_large_json_is_gzipped(client):
+    response, body = raw(client, "/large", "gzip, deflate")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body) < 20000
+    assert gzip.decompress(body) == client.get("/large", headers={"Accept-Encoding": "identity"}).content
+
+
+def test_small_and_unaccepted_bodies_are_left_alone(client):
+    response, _ = raw(client, "/small", "gzip")
+    assert "content-encoding" not in response.headers and response.headers["vary"] == "Accept-Encoding"
+    response, _ = raw(client, "/large", "identity")
+    assert "content-encoding" not in response.headers
+
+
+def test_streams_are_compressed_chunk_by_chunk(client):
+    response, body = raw(client, "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip" and "content-length" not in response.headers
+    assert zlib.decompress(body, 31).decode().count("\n") == 2500
+
+
+def test_etag_responses_are_compressed_once(client):
+    PRECOMPRESSED._entries.clear()
+    hits = PRECOMPRESSED.hits
+    first = raw(client, "/large", "gzip")[1]
+    second = raw(client, "/large", "gzip")[1]
+    assert first == second and PRECOMPRESSED.hits == hits + 1
+
+
+def test_negotiation_honours_quality_values():
+    assert negotiate("gzip;q=0, identity") is None
+    assert negotiate("*") in ("zstd", "br", "gzip")
+    assert negotiate("br;q=0.5, gzip;q=0.8") == "gzip"
+    assert negotiate(None) is None
@@ -0,0 +1,94 @@
+# Conditional GET Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from datetime import date
+from sqlalchemy import update
+
+from api.v1.database import models
+from api.v1.utils import etag as etag_module
+from api.v1.utils.etag import TABLE_VERSIONS
+
+OUTLETS = "/api/v1/admin/outlets/"
+
+
+@pytest.fixture
+def env(api_env, monkeypatch):
+    # No time-based rollover, so a test never straddles one
+    monkeypatch.setattr(etag_module, "ETAG_VERSION_TTL", 0)
+    entities = [
+        models.Client(id=10, username="client10", email="c10@example.com", hashed_password="x", accesstype="client"),
+        models.Client(id=11, username="client11", email="c11@example.com", hashed_password="x", accesstype="client"),
+        models.Brand(id=1, brandname="Burger King", gstin="22ABCDE1234F1Z5", legal_name_of_business="BK",
+                     date_of_registration=date(2024, 1, 1), gstdoc={}, client_id=10),
+    ] + [
+        models.Outlet(id=i, aggregator="Swiggy", resid=str(1000 + i), subzone="Bandra", resshortcode="BK - Bandra",
+                      city="Mumbai", outletnumber="", is_active=True, client_id=10 if i <= 20 else 11, brand_id=1)
+        for i in range(1, 31)
+    ] + [
+        models.User(id=i, username=f"user{i}", usernumber=str(9000 + i), useremail=f"u{i}@example.com", client_id=10)
+        for i in range(1, 6)
+    ]
+    api = api_env(entities, [models.UserOutlet(user_id=u, outlet_id=o, client_id=10) for u in range(1, 6) for o in range(1, 4)])
+    session = api.Session()
+    yield api.client, session, api.statements
+    session.close()
+
+
+def test_unchanged_list_returns_304_without_queries(env):
+    client, _, statements = env
+    first = client.get(OUTLETS, params={"client_id": 10})
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    statements.clear()
+    again = client.get(OUTLETS, params={"client_id": 10}, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b"" and again.headers["ETag"] == etag
+    assert statements == []
+
+    # Another representation of the same table has its own ETag
+    other = client.get(OUTLETS, params={"client_id": 10, "limit": 5}, headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["ETag"] != etag
+
+
+def test_orm_writes_change_only_the_writers_tenant(env):
+    client, session, _ = env
+    etags = {cid: client.get(OUTLETS, params={"client_id": cid}).headers["ETag"] for cid in (10, 11)}
+
+    session.get(models.Outlet, 25).city = "Pune"
+    session.commit()
+    assert client.get(OUTLETS, params={"client_id": 11}, headers={"If-None-Match": etags[11]}).status_code == 200
+    assert client.get(OUTLETS, params={"client_id": 10}, headers={"If-None-Match": etags[10]}).status_code == 304
+
+
+def test_bulk_sql_writes_change_the_etag(env):
+    client, session, _ = env
+    etag = client.get(OUTLETS, params={"client_id": 10}).headers["ETag"]
+    session.execute(update(models.Outlet), [{"id": 1, "city": "Pune"}])
+    session.rollback()
+    assert client.get(OUTLETS, params={"client_id": 10}, headers={"If-None-Match": etag}).status_code == 304
+
+    session.execute(update(models.Outlet), [{"id": 1, "city": "Pune"}])
+    session.commit()
+    response = client.get(OUTLETS, params={"client_id": 10}, headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()[0]["city"] == "Pune"
+
+
+def test_mapping_views_track_joined_tables(env):
+    client, session, _ = env
+    url = "/api/v1/access/user-outlet-mappings/"
+    etag = client.get(url, params={"client_id": 10}).headers["ETag"]
+    assert client.get(url, params={"client_id": 10}, headers={"If-None-Match": etag}).status_code == 304
+
+    session.get(models.User, 1).username = "renamed"
+    session.commit()
+    assert client.get(url, params={"client_id": 10}, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_versions_are_scoped(env):
+    TABLE_VERSIONS.bump("users", [12])
+    assert TABLE_VERSIONS.version("users", 10) != TABLE_VERSIONS.version("users", 12)
+    before = TABLE_VERSIONS.version("users", 10)
+    TABLE_VERSIONS.bump("users")
+    assert TABLE_VERSIONS.version("users", 10) != before
@@ -0,0 +1,59 @@
+# Streaming Export Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import csv
+import io
+import json
+import pytest
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import create_engine, insert, select
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.utils import export
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_ROWS", 10)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": i, "username": f"user, {i}", "usernumber": str(9000 + i), "useremail": f"u{i}@example.com",
+             "is_active": bool(i % 2), "client_id": 1, "created_at": datetime(2024, 1, 1)}
+            for i in range(1, 26)
+        ])
+    yield engine
+    engine.dispose()
+
+
+USERS = select(models.User.id, models.User.username, models.User.is_active, models.User.created_at).order_by(models.User.id)
+
+
+def test_csv_export_streams_in_chunks(engine):
+    chunks = list(export.stream_rows(engine, USERS, "csv"))
+    assert len(chunks) == 3  # header travels with the first 10 rows
+
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == ["id", "username", "is_active", "created_at"]
+    assert rows[1] == ["1", "user, 1", "True", "2024-01-01T00:00:00"]
+    assert len(rows) == 26
+
+
+def test_ndjson_export(engine):
+    lines = "".join(export.stream_rows(engine, USERS.where(models.User.is_active == False), "ndjson")).splitlines()
+    assert len(lines) == 12
+    assert json.loads(lines[0]) == {"id": 2, "username": "user, 2", "is_active": False,
+                                    "created_at": "2024-01-01T00:00:00"}
+
+
+def test_export_response_rejects_unknown_format(engine):
+    with pytest.raises(HTTPException) as exc:
+        export.export_response(engine, USERS, "xml", "users")
+    assert exc.value.status_code == 400
+
+    response = export.export_response(engine, USERS, "ndjson", "users-1")
+    assert response.headers["content-disposition"] == 'attachment; filename="users-1.ndjson"'
@@ -0,0 +1,105 @@
+# GST Document Blob Store Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from datetime import date
+from pydantic import ValidationError
+from sqlalchemy import update
+
+from api.v1.database import models
+from api.v1.schemas import schemas
+from api.v1.utils import blob_store
+from api.v1.utils.blob_store import BLOB_KEY, BlobStore, offload_gstdocs
+
+LARGE_DOC = {"gstin": "22ABCDE1234F1Z5", "pages": ["x" * 1000]}
+SMALL_DOC = {"gstin": "22ABCDE1234F1Z6", "status": "Active"}
+
+
+def brand(id, client_id, gstdoc):
+    return models.Brand(id=id, brandname=f"Brand{id}", gstin=f"22ABCDE123{id}F1Z5", legal_name_of_business=f"B{id}",
+                        date_of_registration=date(2024, 1, 1), gstdoc=gstdoc, client_id=client_id)
+
+
+@pytest.fixture
+def env(api_env, tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "BLOBS", BlobStore(str(tmp_path)))
+    monkeypatch.setattr(blob_store, "GSTDOC_INLINE_MAX", 256)
+    api = api_env([
+        models.Client(id=10, username="client10", email="c10@example.com", hashed_password="x", accesstype="client"),
+        models.Client(id=11, username="client11", email="c11@example.com", hashed_password="x", accesstype="client"),
+        brand(1, 10, LARGE_DOC),
+        brand(2, 10, SMALL_DOC),
+        brand(3, 11, LARGE_DOC),
+    ])
+    return api.client, api.Session, api.statements, tmp_path
+
+
+def test_large_documents_are_stored_once_by_hash(env):
+    _, Session, _, tmp_path = env
+    session = Session()
+    stored = {row.id: row.gstdoc for row in session.query(models.Brand.id, models.Brand.gstdoc)}
+    session.close()
+    assert stored[2] == SMALL_DOC
+    assert set(stored[1]) == {BLOB_KEY, "bytes"} and stored[1] == stored[3]
+    assert [path.name for path in tmp_path.rglob("*") if path.is_file()] == [stored[1][BLOB_KEY]]
+
+
+def test_brand_listing_does_not_load_documents(env):
+    client, _, statements, _ = env
+    response = client.get("/api/v1/admin/brands/", params={"client_id": 10})
+    assert [row["id"] for row in response.json()] == [1, 2]
+    brand_query = [statement for statement in statements if "FROM brands" in statement][-1]
+    assert "gstdoc" not in brand_query
+
+
+def test_document_endpoint_serves_blobs_and_inline_documents(env):
+    client, _, _, _ = env
+    response = client.get("/api/v1/admin/brands/1/gstdoc")
+    assert response.status_code == 200 and response.json() == LARGE_DOC
+    etag = response.headers["etag"]
+    assert client.get("/api/v1/admin/brands/1/gstdoc", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.get("/api/v1/admin/brands/2/gstdoc").json() == SMALL_DOC
+    assert client.get("/api/v1/admin/brands/3/gstdoc").status_code in (403, 404)
+
+
+def test_document_etag_differs_per_encoding(env):
+    client, _, _, _ = env
+    identity = client.get("/api/v1/admin/brands/1/gstdoc", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/api/v1/admin/brands/1/gstdoc", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in identity.headers and gzipped.headers["content-encoding"] == "gzip"
+    assert identity.headers["etag"] != gzipped.headers["etag"]
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+
+    not_modified = client.get("/api/v1/admin/brands/1/gstdoc",
+                              headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]})
+    assert not_modified.status_code == 304 and not_modified.headers["vary"] == "Accept-Encoding"
+    assert client.get("/api/v1/admin/brands/1/gstdoc", headers={
+        "Accept-Encoding": "gzip", "If-None-Match": identity.headers["etag"]}).status_code == 200
+
+
+def test_existing_inline_documents_are_moved(env, monkeypatch):
+    _, Session, _, _ = env
+    monkeypatch.setattr(blob_store, "GSTDOC_INLINE_MAX", 16)
+    session = Session()
+    assert offload_gstdocs(session) == 1
+    assert offload_gstdocs(session) == 0
+    moved = session.query(models.Brand.gstdoc).filter(models.Brand.id == 2).scalar()
+    session.close()
+    assert set(moved) == {BLOB_KEY, "bytes"}
+    assert blob_store.read_gstdoc(moved) == b'{"gstin":"22ABCDE1234F1Z6","status":"Active"}'
+
+
+def test_client_documents_cannot_forge_blob_references(env):
+    client, Session, _, _ = env
+    forged = {**dict.fromkeys(schemas.UpdateBrand.model_fields), "gstdoc": {BLOB_KEY: "0" * 64, "bytes": 1}}
+    with pytest.raises(ValidationError):
+        schemas.UpdateBrand.model_validate(forged)
+
+    # A malformed reference already in the database is a missing document, not a server error
+    session = Session()
+    session.execute(update(models.Brand).where(models.Brand.id == 2).values(gstdoc={BLOB_KEY: "../secret", "bytes": 1}))
+    session.commit()
+    session.close()
+    assert client.get("/api/v1/admin/brands/2/gstdoc").status_code == 404
@@ -0,0 +1,51 @@
+# Composite Index Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+
+from api.v1.database import models
+from api.v1.database.database import Base, apply_index_migrations
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, statement) -> str:
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    return " ".join(str(row[-1]) for row in rows)
+
+
+# ============ EXPLAIN ===============
+@pytest.mark.parametrize("statement, index_name", [
+    (select(models.Outlet.id).where(models.Outlet.client_id == 7, models.Outlet.is_active == True),
+     "ix_outlets_client_active"),
+    (select(models.OutletService.id).where(models.OutletService.client_id == 7),
+     "ix_outlet_services_client_outlet"),
+    (select(models.UserService.id).where(models.UserService.client_id == 7),
+     "ix_user_services_client_user"),
+    (select(models.UserOutlet.id).where(models.UserOutlet.client_id == 7), "ix_user_outlets_client_user"),
+    (select(models.UserSession.id).where(models.UserSession.client_id == 7, models.UserSession.is_active == True),
+     "ix_user_sessions_client_active"),
+])
+def test_tenant_queries_use_composite_indexes(engine, statement, index_name):
+    assert index_name in query_plan(engine, statement)
+
+
+# ============ migrations ===============
+def test_apply_index_migrations_creates_missing_indexes(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_outlets_client_active"))
+
+    assert apply_index_migrations(bind=engine) == ["ix_outlets_client_active"]
+    names = {index["name"] for index in inspect(engine).get_indexes("outlets")}
+    assert "ix_outlets_client_active" in names
+    assert apply_index_migrations(bind=engine) == []
@@ -0,0 +1,52 @@
+# Logging Pipeline Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import logging
+import queue
+
+import logger as log_module
+
+
+def make_record(level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord("test", level, __file__, 1, msg, args, None)
+
+
+# ============ sampling ===============
+def test_parse_sample_rates_ignores_warning_and_garbage():
+    rates = log_module._parse_sample_rates("DEBUG=0, INFO=0.25,WARNING=0,bogus,ERROR=x")
+    assert rates == {logging.DEBUG: 0.0, logging.INFO: 0.25}
+
+
+def test_sampling_filter_drops_and_keeps_by_level():
+    sampler = log_module.LevelSamplingFilter({logging.INFO: 0.0})
+    assert sampler.filter(make_record(logging.INFO)) is False
+    assert sampler.filter(make_record(logging.DEBUG)) is True
+    assert sampler.filter(make_record(logging.ERROR)) is True
+
+
+# ============ deferred formatting ===============
+def test_prepare_keeps_plain_args_unformatted():
+    handler = log_module.DeferredQueueHandler(queue.SimpleQueue())
+    record = handler.prepare(make_record())
+    assert record.msg == "hello %s"
+    assert record.args == ("world",)
+
+
+def test_prepare_renders_mutable_args_eagerly():
+    handler = log_module.DeferredQueueHandler(queue.SimpleQueue())
+    payload = ["123"]
+    record = handler.prepare(make_record(args=(payload,)))
+    payload.append("456")
+    assert record.getMessage() == "hello ['123']"
+
+
+# ============ end to end ===============
+def test_create_logger_writes_through_background_listener(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_module, "ROOT_DIR", str(tmp_path))
+    test_logger = log_module.create_logger("queue_pipeline_test")
+    test_logger.info("outlet %s updated", 42)
+    log_module.stop_logging()
+
+    log_file = tmp_path / "logs" / "queue_pipeline_test" / "queue_pipeline_test.log"
+    assert "outlet 42 updated" in log_file.read_text(encoding="utf-8")
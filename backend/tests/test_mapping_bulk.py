@@ -0,0 +1,111 @@
+# Bulk Mapping Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.schemas import schemas
+from api.v1.utils import mapping_bulk
+from api.v1.utils.mapping_bulk import OUTLET_REFS, SERVICE_REFS, USER_REFS, insert_mappings, reconcile_mappings, resolve_pairs
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        models.Outlet(id=i, aggregator="Swiggy", resid=str(1000 + i), subzone="Zone", resshortcode="BK - Zone",
+                      city="Pune", outletnumber="", is_active=True, client_id=10 if i <= 20 else 11, brand_id=1)
+        for i in range(1, 23)
+    ] + [
+        models.User(id=i, username=f"user{i}", usernumber=str(9000 + i), useremail=f"u{i}@example.com", client_id=10)
+        for i in range(1, 6)
+    ] + [
+        models.Service(id=1, servicename="delivery", servicevariant="std"),
+        models.OutletService(outlet_id=1, service_id=1, client_id=10),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_refs_need_an_id_or_natural_key():
+    assert schemas.UserRef(usernumber=9001).usernumber == "9001"
+    with pytest.raises(ValidationError):
+        schemas.OutletRef(resid="1001")
+
+
+def test_natural_keys_resolve_in_batched_queries(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    users = [schemas.UserRef(usernumber=str(9000 + i)) for i in range(1, 6)]
+    outlets = [schemas.OutletRef(aggregator="Swiggy", resid=str(1000 + i)) for i in range(1, 11)]
+    outlets.append(schemas.OutletRef(id=11))
+    pairs = resolve_pairs(db, 10, USER_REFS, OUTLET_REFS, users, outlets, [])
+
+    assert len(pairs) == 55 and (1, 11) in pairs
+    assert len(statements) == 3  # users by number, outlets by id, outlets by key
+
+
+def test_other_tenants_entities_are_rejected(db):
+    with pytest.raises(HTTPException) as exc:
+        resolve_pairs(db, 10, OUTLET_REFS, SERVICE_REFS, [schemas.OutletRef(id=21)],
+                      [schemas.ServiceRef(servicename="delivery", servicevariant="std")], [])
+    assert exc.value.status_code == 400 and "outlet id 21" in exc.value.detail
+
+
+def test_insert_skips_existing_pairs(db):
+    created, existing = insert_mappings(db, models.OutletService, "outlet_id", "service_id", {(1, 1), (2, 1), (3, 1)}, 10)
+    db.commit()
+    assert (created, existing) == (2, 1)
+    assert db.query(models.OutletService).count() == 3
+
+
+def test_pairs_inserted_concurrently_count_as_existing(db, monkeypatch):
+    insert_rows = mapping_bulk._insert_ignoring_duplicates
+
+    def racing_insert(session, mapping_model, rows):
+        # Another request maps outlet 2 between the existence check and the INSERT
+        session.add(models.OutletService(outlet_id=2, service_id=1, client_id=10))
+        session.flush()
+        return insert_rows(session, mapping_model, rows)
+
+    monkeypatch.setattr(mapping_bulk, "_insert_ignoring_duplicates", racing_insert)
+    created, existing = insert_mappings(db, models.OutletService, "outlet_id", "service_id", {(1, 1), (2, 1), (3, 1)}, 10)
+    db.commit()
+    assert (created, existing) == (1, 2)
+    assert db.query(models.OutletService).count() == 3
+
+
+def test_reconcile_applies_only_the_delta(db):
+    db.add_all([models.UserOutlet(user_id=1, outlet_id=i, client_id=10) for i in (1, 2, 3)])
+    db.commit()
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    added, removed, unchanged = reconcile_mappings(db, models.UserOutlet, "user_id", 1, "outlet_id", OUTLET_REFS,
+                                                   [2, 3, 4, 5], 10)
+    db.commit()
+    assert (added, removed, unchanged) == ([4, 5], [1], 2)
+    assert len(statements) == 4  # current set, validate additions, one DELETE, one INSERT
+    assert sorted(o for (o,) in db.query(models.UserOutlet.outlet_id).filter_by(user_id=1)) == [2, 3, 4, 5]
+
+
+def test_reconcile_dry_run_and_foreign_ids(db):
+    db.add(models.UserOutlet(user_id=1, outlet_id=1, client_id=10))
+    db.commit()
+    assert reconcile_mappings(db, models.UserOutlet, "user_id", 1, "outlet_id", OUTLET_REFS, [], 10, True) == ([], [1], 0)
+    assert db.query(models.UserOutlet).count() == 1
+
+    with pytest.raises(HTTPException) as exc:
+        reconcile_mappings(db, models.UserOutlet, "user_id", 1, "outlet_id", OUTLET_REFS, [21], 10)
+    assert exc.value.status_code == 400
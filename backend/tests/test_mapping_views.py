@@ -0,0 +1,59 @@
+# Mapping List Views Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from datetime import date
+
+from api.v1.database import models
+
+VIEWS = ["/api/v1/access/outlet-service-mappings/", "/api/v1/access/user-service-mappings/",
+         "/api/v1/access/user-outlet-mappings/"]
+
+
+@pytest.fixture
+def env(api_env):
+    entities = [
+        models.Client(id=10, username="client10", email="c10@example.com", hashed_password="x", accesstype="client"),
+        models.Brand(id=1, brandname="Burger King", gstin="22ABCDE1234F1Z5", legal_name_of_business="BK",
+                     date_of_registration=date(2024, 1, 1), gstdoc={}, client_id=10),
+        models.Service(id=1, servicename="delivery", servicevariant="std"),
+        models.Service(id=2, servicename="pickup", servicevariant="exp"),
+    ] + [
+        models.Outlet(id=i, aggregator="Swiggy", resid=str(1000 + i), subzone="Bandra", resshortcode="BK - Bandra",
+                      city="Mumbai", outletnumber="", is_active=True, client_id=10, brand_id=1)
+        for i in range(1, 61)
+    ] + [
+        models.User(id=i, username=f"user{i}", usernumber=str(9000 + i), useremail=f"u{i}@example.com", client_id=10)
+        for i in range(1, 31)
+    ]
+    mappings = [models.OutletService(outlet_id=o, service_id=s, client_id=10) for o in range(1, 61) for s in (1, 2)]
+    mappings += [models.UserService(user_id=u, service_id=s, client_id=10) for u in range(1, 31) for s in (1, 2)]
+    mappings += [models.UserOutlet(user_id=u, outlet_id=o, client_id=10) for u in range(1, 31) for o in range(1, 5)]
+    return api_env(entities, mappings)
+
+
+@pytest.mark.parametrize("url", VIEWS)
+@pytest.mark.parametrize("grouped", ["true", "false"])
+def test_query_count_does_not_grow_with_page_size(env, url, grouped):
+    client, statements = env.client, env.statements
+    counts = []
+    for limit in (5, 50):
+        statements.clear()
+        response = client.get(url, params={"client_id": 10, "grouped": grouped, "limit": limit})
+        assert response.status_code == 200
+        counts.append(len(statements))
+    # The grouped user-outlet view fetches the page's user names with a second query
+    assert counts[0] == counts[1] <= 2
+
+
+def test_grouped_user_outlets_page_by_outlet(env):
+    client = env.client
+    response = client.get(VIEWS[2], params={"client_id": 10, "grouped": "true", "limit": 3, "with_meta": "true"})
+    page = response.json()
+    assert page["total"] == 4
+    assert [group["res_id"] for group in page["items"]] == [1, 2, 3]
+    assert all(len(group["users"]) == 30 for group in page["items"])
+
+    response = client.get(VIEWS[2], params={"client_id": 10, "grouped": "true", "limit": 3, "cursor": page["next_cursor"]})
+    assert [group["res_id"] for group in response.json()] == [4]
@@ -0,0 +1,148 @@
+# Outlet Bulk Import Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import io
+import pytest
+from pydantic import ValidationError
+from datetime import date
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.utils import outlet_bulk
+from api.v1.schemas import schemas
+from api.v1.utils.outlet_bulk import (
+    SKIP_DUPLICATES, OutletImporter, brand_abbreviation, create_outlet_batch, read_outlet_rows
+)
+
+HEADER = "Aggregator,Res_id,Subzone,City,Active/Inactive\n"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        models.Brand(id=1, brandname="Burger King", gstin="22ABCDE1234F1Z5", legal_name_of_business="BK",
+                     date_of_registration=date(2024, 1, 1), gstdoc={}, client_id=10),
+        models.Brand(id=2, brandname="Other", gstin="22ABCDE1234F1Z6", legal_name_of_business="O",
+                     date_of_registration=date(2024, 1, 1), gstdoc={}, client_id=11),
+        models.Client(id=10, username="client10", email="c10@example.com", hashed_password="x", accesstype="client"),
+        models.Outlet(aggregator="Swiggy", resid="1001", subzone="Bandra", resshortcode="BK - Bandra", city="Mumbai",
+                      outletnumber="", is_active=True, client_id=10, brand_id=1),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def upload(text: str, filename: str = "outlets.csv") -> UploadFile:
+    return UploadFile(file=io.BytesIO(text.encode()), filename=filename)
+
+
+def test_brand_abbreviation():
+    assert brand_abbreviation("burger king fresh") == "BKF"
+    assert brand_abbreviation("Faasos") == "Faasos"
+
+
+def test_import_reports_every_row(db):
+    rows = read_outlet_rows(upload(
+        HEADER
+        + "Swiggy,5001,Andheri,Mumbai,Active\n"
+        + "Swiggy,5001,Andheri,Mumbai,Active\n"
+        + "Swiggy,1001,Bandra,Mumbai,Active\n"
+        + ",,,,\n"
+        + "Zomato,12,Powai,Mumbai,Inactive\n"
+    ))
+    report = OutletImporter(db, client_id=10, default_brand_id=1).run(rows)
+    db.commit()
+
+    assert report.created == 1 and report.failed == 3
+    assert [(row.row, row.status) for row in report.rows] == [
+        (2, "created"), (3, "duplicate"), (4, "duplicate"), (6, "error")
+    ]
+    outlet = db.query(models.Outlet).filter(models.Outlet.resid == "5001").one()
+    assert (outlet.resshortcode, outlet.client_id, outlet.brand_id) == ("BK - Andheri", 10, 1)
+
+
+def test_import_batches_queries(db, monkeypatch):
+    monkeypatch.setattr(outlet_bulk, "IMPORT_BATCH_ROWS", 100)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    text = HEADER + "".join(f"Zomato,{10_000 + i},Zone{i % 7},Pune,Active\n" for i in range(1000))
+    report = OutletImporter(db, client_id=10, default_brand_id=1).run(read_outlet_rows(upload(text)))
+
+    assert report.created == 1000
+    # brands once, then one duplicate check and one INSERT per 100-row batch
+    assert len(statements) <= 1 + 2 * 10
+    assert db.query(models.Outlet).count() == 1001
+
+
+def test_import_checks_brand_ownership_and_dry_run(db):
+    text = HEADER + "Swiggy,5002,Andheri,Mumbai,Active\n"
+    report = OutletImporter(db, client_id=10, default_brand_id=2).run(read_outlet_rows(upload(text)))
+    assert report.rows[0].detail == "Brand does not belong to this client"
+
+    report = OutletImporter(db, client_id=10, default_brand_id=1, dry_run=True).run(read_outlet_rows(upload(text)))
+    assert (report.created, report.rows[0].status) == (0, "valid")
+    assert db.query(models.Outlet).count() == 1
+
+
+def test_rejects_unknown_files_and_missing_columns():
+    with pytest.raises(HTTPException) as exc:
+        read_outlet_rows(upload("a,b\n", "outlets.txt"))
+    assert exc.value.status_code == 415
+
+    with pytest.raises(HTTPException) as exc:
+        list(read_outlet_rows(upload("Aggregator,City\nSwiggy,Pune\n")))
+    assert exc.value.status_code == 400
+
+
+def outlet_create(resid: str, **fields) -> schemas.OutletCreate:
+    return schemas.OutletCreate(aggregator="Swiggy", resid=resid, subzone="Powai", city="Mumbai",
+                                outletnumber="", clientid=10, **fields)
+
+
+def test_batch_update_rejects_null_for_not_null_columns():
+    assert schemas.OutletBatchUpdate(id=1, city="Pune").model_dump(exclude_unset=True) == {"id": 1, "city": "Pune"}
+    for field in ("subzone", "city", "outletnumber", "is_active"):
+        with pytest.raises(ValidationError):
+            schemas.OutletBatchUpdate(id=1, **{field: None})
+
+
+# ============ POST /admin/outlets/ BATCH ===============
+def test_batch_is_all_or_nothing_by_default(db):
+    with pytest.raises(HTTPException) as exc:
+        create_outlet_batch(db, [outlet_create("5001"), outlet_create("1001")])
+    assert exc.value.detail == "Res ID already registered"
+    db.rollback()
+    assert db.query(models.Outlet).count() == 1
+
+
+def test_batch_skip_duplicates_uses_fixed_query_count(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    batch = [outlet_create(str(5000 + i)) for i in range(200)] + [outlet_create("1001"), outlet_create("5000")]
+    created = create_outlet_batch(db, batch, SKIP_DUPLICATES)
+
+    assert len(created) == 200
+    assert created[0].resshortcode == "BK - Powai" and created[0].brand_id == 1
+    # clients, brands, existing keys, INSERT, read-back
+    assert len(statements) == 5
+
+
+def test_batch_rejects_unknown_client_and_brand(db):
+    with pytest.raises(HTTPException) as exc:
+        create_outlet_batch(db, [outlet_create("5001", brandid=99)])
+    assert exc.value.status_code == 404
+
+    with pytest.raises(HTTPException) as exc:
+        create_outlet_batch(db, [outlet_create("5001")], "bogus")
+    assert exc.value.status_code == 400
@@ -0,0 +1,88 @@
+# Outlet Feed Sync Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.schemas import schemas
+from api.v1.utils.outlet_sync import OutletFeedSync
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        models.Brand(id=1, brandname="Burger King", gstin="22ABCDE1234F1Z5", legal_name_of_business="BK",
+                     date_of_registration=date(2024, 1, 1), gstdoc={}, client_id=10),
+        models.Brand(id=2, brandname="Other", gstin="22ABCDE1234F1Z6", legal_name_of_business="O",
+                     date_of_registration=date(2024, 1, 1), gstdoc={}, client_id=11),
+    ] + [
+        models.Outlet(id=i, aggregator=aggregator, resid=str(1000 + i), subzone="Bandra", resshortcode="BK - Bandra",
+                      city="Mumbai", outletnumber="", is_active=True, client_id=10, brand_id=1)
+        for i, aggregator in [(1, "Swiggy"), (2, "Swiggy"), (3, "Swiggy"), (4, "Zomato")]
+    ] + [
+        models.Outlet(id=5, aggregator="Swiggy", resid="2005", subzone="Andheri", resshortcode="Other - Andheri",
+                      city="Mumbai", outletnumber="", is_active=True, client_id=11, brand_id=2),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def item(resid: str, subzone: str = "Bandra", city: str = "Mumbai", **extra) -> schemas.OutletFeedItem:
+    return schemas.OutletFeedItem(aggregator="Swiggy", resid=resid, subzone=subzone, city=city, **extra)
+
+
+def test_feed_is_applied_as_a_minimal_diff(db):
+    feed = [item("1001"), item("1002", subzone="Khar"), item("1009"), item("2005")]
+    brand = db.get(models.Brand, 1)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    report = OutletFeedSync(db, brand).run(feed)
+    db.commit()
+
+    assert (report.inserted, report.updated, report.deactivated, report.unchanged) == (1, 1, 1, 1)
+    assert [(c.resid, c.action) for c in report.conflicts] == [("2005", "conflict")]
+    assert {c.resid: c.fields for c in report.changes if c.action == "update"} == {"1002": ["subzone", "resshortcode"]}
+    # current rows, taken keys, INSERT, UPDATE, deactivation
+    assert len(statements) == 5
+    assert db.get(models.Outlet, 2).resshortcode == "BK - Khar"
+    assert db.get(models.Outlet, 3).is_active is False
+    assert db.get(models.Outlet, 4).is_active is True  # Zomato is not in the feed's scope
+    assert db.get(models.Outlet, 5).brand_id == 2
+
+
+def test_dry_run_reports_without_writing(db):
+    report = OutletFeedSync(db, db.get(models.Brand, 1), dry_run=True).run([item("1001"), item("1001"), item("1009")])
+    db.commit()
+    assert (report.inserted, report.deactivated, report.repeated, report.dry_run) == (1, 2, 1, True)
+    assert db.query(models.Outlet).count() == 5
+    assert db.get(models.Outlet, 2).is_active is True
+
+
+def test_deactivation_can_be_switched_off(db):
+    report = OutletFeedSync(db, db.get(models.Brand, 1), deactivate_missing=False).run([item("1001", city="Pune")])
+    db.commit()
+    assert (report.updated, report.deactivated) == (1, 0)
+    assert db.get(models.Outlet, 1).city == "Pune"
+
+
+def test_outlet_numbers_are_synced_only_when_supplied(db):
+    db.get(models.Outlet, 2).outletnumber = "42"
+    db.commit()
+    report = OutletFeedSync(db, db.get(models.Brand, 1), deactivate_missing=False).run([
+        item("1001", outletnumber="9820000001"), item("1002"),
+    ])
+    db.commit()
+    assert {c.resid: c.fields for c in report.changes} == {"1001": ["outletnumber"]}
+    assert db.get(models.Outlet, 1).outletnumber == "9820000001"
+    assert db.get(models.Outlet, 2).outletnumber == "42"
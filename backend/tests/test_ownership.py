@@ -0,0 +1,118 @@
+# Ownership Verification Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.routers.admin import verify_request
+from api.v1.utils import ownership
+from api.v1.utils.ownership import OWNERSHIP_CACHE, verify_ownership
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        models.Outlet(id=i, aggregator="Swiggy", resid=str(1000 + i), subzone="Bandra", resshortcode="BK - Bandra",
+                      city="Mumbai", outletnumber="", is_active=True, client_id=10 if i <= 500 else 11, brand_id=1)
+        for i in range(1, 511)
+    ] + [
+        models.User(id=i, username=f"user{i}", usernumber=str(9000 + i), useremail=f"u{i}@example.com", client_id=10)
+        for i in range(1, 4)
+    ] + [
+        models.UserOutlet(id=1, user_id=1, outlet_id=1, client_id=10),
+        models.UserOutlet(id=2, user_id=1, outlet_id=501, client_id=11),
+    ])
+    session.commit()
+    OWNERSHIP_CACHE.invalidate()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_mixed_entities_take_one_query_per_table(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    owners = verify_ownership(db, 10, {"outlet": range(1, 501), "user": [1, 2, 3], "user_outlet_mapping": [1]})
+
+    assert len(statements) == 3  # one tenant load per table
+    assert all("client_id" in statement and "outlets.resid" not in statement for statement in statements)
+    assert owners["user"] == {1: 10, 2: 10, 3: 10}
+
+
+def test_cached_tenant_checks_skip_the_database(db):
+    verify_ownership(db, 10, {"outlet": [1]})
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    hits = OWNERSHIP_CACHE.hits
+
+    verify_ownership(db, 10, {"outlet": range(1, 501)})
+    assert statements == [] and OWNERSHIP_CACHE.hits == hits + 500
+
+    # Committed ORM deletes drop out of the cache
+    db.delete(db.get(models.Outlet, 3))
+    db.commit()
+    with pytest.raises(HTTPException) as exc:
+        verify_ownership(db, 10, {"outlet": [3]})
+    assert exc.value.status_code == 404
+
+
+def test_missing_ids_are_404_and_foreign_ids_403(db):
+    with pytest.raises(HTTPException) as exc:
+        verify_ownership(db, 10, {"outlet": [1, 2, 9999]})
+    assert exc.value.status_code == 404 and "9999" in exc.value.detail
+
+    with pytest.raises(HTTPException) as exc:
+        verify_ownership(db, 10, {"outlet": [1, 501, 502]})
+    assert exc.value.status_code == 403 and exc.value.detail.endswith("501, 502")
+
+    # Internal clients (client_id None) only need the rows to exist
+    assert verify_ownership(db, None, {"outlet": [1, 501]})["outlet"] == {1: 10, 501: 11}
+
+
+def test_tenant_load_racing_a_commit_is_not_published(db):
+    committed = []
+
+    def commit_during_load(*args):
+        if not committed:
+            committed.append(True)
+            OWNERSHIP_CACHE.remember("outlet", 1, 11)
+
+    event.listen(db.get_bind(), "before_cursor_execute", commit_during_load)
+    loads = OWNERSHIP_CACHE.tenant_loads
+    OWNERSHIP_CACHE.owners(db, "outlet", [2], client_id=10)
+    assert OWNERSHIP_CACHE.tenant_loads == loads
+    assert OWNERSHIP_CACHE.owners(db, "outlet", [1])[1] == 11
+
+
+def test_foreign_entries_expire(db, monkeypatch):
+    assert verify_ownership(db, None, {"outlet": [510]})["outlet"] == {510: 11}
+    db.execute(delete(models.Outlet).where(models.Outlet.id == 510))
+    db.commit()
+    assert verify_ownership(db, None, {"outlet": [510]})["outlet"] == {510: 11}
+
+    monkeypatch.setattr(ownership, "OWNERSHIP_CACHE_TTL", -1)
+    with pytest.raises(HTTPException) as exc:
+        verify_ownership(db, None, {"outlet": [510]})
+    assert exc.value.status_code == 404
+
+
+def test_verify_request_accepts_user_outlet_mapping_id(db):
+    verify_request(client_id=10, user_outlet_mapping_id=1, db=db)
+    with pytest.raises(HTTPException) as exc:
+        verify_request(client_id=10, user_outlet_mapping_id=2, db=db)
+    assert exc.value.status_code == 403 and exc.value.detail == "Forbidden: You don't own this mapping"
+
+
+@pytest.mark.parametrize("client_id, status_code", [(1, 200), (10, 404)])
+def test_cache_stats_are_internal_only(api_env, client_id, status_code):
+    api = api_env(client_id=client_id)
+    assert api.client.get("/cache-stats").status_code == status_code
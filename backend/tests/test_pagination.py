@@ -0,0 +1,98 @@
+# Keyset Pagination Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.utils.pagination import paginate, paginate_list
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    base = datetime(2025, 1, 1)
+    session.add(models.Client(id=1, username="c1", email="c1@example.com", hashed_password="x", accesstype="client"))
+    session.add_all([
+        models.User(id=i, username=f"user{i % 7}", usernumber=str(9000 + i), useremail=f"u{i}@example.com",
+                    client_id=1, created_at=base + timedelta(minutes=i % 4))
+        for i in range(1, 26)
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def walk(db, limit, sort=None):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = paginate(db.query(models.User), models.User.id, limit, cursor=cursor, sort=sort)
+        seen.extend(row.id for row in rows)
+        if cursor is None:
+            return seen
+
+
+def test_cursor_walk_visits_every_row_once(db):
+    assert walk(db, limit=4) == list(range(1, 26))
+
+
+def test_cursor_walk_with_descending_non_unique_sort_key(db):
+    sort = [(models.User.created_at, True)]
+    expected = [u.id for u in db.query(models.User).order_by(models.User.created_at.desc(), models.User.id)]
+    assert walk(db, limit=3, sort=sort) == expected
+
+
+@pytest.mark.parametrize("desc", [False, True])
+def test_cursor_walk_over_null_sort_values(db, desc):
+    db.query(models.User).filter(models.User.id % 3 == 0).update({models.User.created_at: None})
+    db.commit()
+    sort = [(models.User.created_at, desc)]
+    order = models.User.created_at.desc() if desc else models.User.created_at.asc()
+    expected = [u.id for u in db.query(models.User).order_by(order, models.User.id)]
+    assert walk(db, limit=3, sort=sort) == expected
+
+
+def test_cursor_query_uses_keyset_not_offset(db):
+    _, cursor = paginate(db.query(models.User), models.User.id, 5)
+    executed = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cur, statement, parameters, *args: executed.append((statement, parameters)))
+    paginate(db.query(models.User), models.User.id, 5, skip=10, cursor=cursor)
+    statement, parameters = executed[-1]
+    assert "users.id >" in statement
+    # SQLite always renders "LIMIT ? OFFSET ?"; the offset bound must stay 0
+    assert parameters[-1] == 0
+
+
+def test_last_page_has_no_cursor(db):
+    rows, cursor = paginate(db.query(models.User), models.User.id, 100)
+    assert len(rows) == 25 and cursor is None
+
+
+def test_cursor_from_other_ordering_is_rejected(db):
+    _, cursor = paginate(db.query(models.User), models.User.id, 5)
+    with pytest.raises(HTTPException) as exc:
+        paginate(db.query(models.User), models.User.id, 5, cursor=cursor, sort=[(models.User.username, False)])
+    assert exc.value.status_code == 400
+
+    with pytest.raises(HTTPException):
+        paginate(db.query(models.User), models.User.id, 5, cursor="not-a-cursor")
+
+
+def test_in_memory_pages_match_sql_pages(db):
+    rows = db.query(models.User).order_by(models.User.id).all()
+    sql_rows, sql_cursor = paginate(db.query(models.User), models.User.id, 10)
+    list_rows, list_cursor = paginate_list(rows, models.User.id, 10)
+    assert list_rows == sql_rows and list_cursor == sql_cursor
+
+    sql_rows, _ = paginate(db.query(models.User), models.User.id, 10, cursor=sql_cursor)
+    assert paginate_list(rows, models.User.id, 10, cursor=list_cursor)[0] == sql_rows
+    assert paginate_list(rows, models.User.id, 10, skip=20) == (rows[20:], None)
@@ -0,0 +1,94 @@
+# Access Log Middleware Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import logging
+from unittest.mock import patch
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import logger as log_module
+from logger import LevelSamplingFilter, RequestLogContext, current_request_context, request_context_var
+from api.v1.utils import request_logging
+
+app = FastAPI()
+app.add_middleware(request_logging.AccessLogMiddleware)
+
+
+@app.get("/items/{item_id}")
+async def read_item(item_id: int):
+    current_request_context().client_id = 7
+    return {"item_id": item_id}
+
+
+@app.get("/broken")
+async def broken():
+    raise HTTPException(status_code=404, detail="missing")
+
+
+@app.get("/failing")
+async def failing():
+    return Response(status_code=500)
+
+
+client = TestClient(app)
+
+
+def logged_fields(mock_info):
+    return mock_info.call_args.kwargs["extra"]["fields"]
+
+
+def test_request_id_is_generated_and_logged():
+    with patch.object(request_logging.access_logger, "info") as mock_info:
+        resp = client.get("/items/3")
+    assert resp.status_code == 200
+    fields = logged_fields(mock_info)
+    assert fields["request_id"] == resp.headers["x-request-id"]
+    assert fields["route"] == "/items/{item_id}"
+    assert fields["status"] == 200
+    assert fields["client_id"] == 7
+
+
+def test_incoming_request_id_is_propagated():
+    with patch.object(request_logging.access_logger, "info"):
+        resp = client.get("/items/3", headers={"X-Request-ID": "abc-123"})
+    assert resp.headers["x-request-id"] == "abc-123"
+
+
+def test_sampling_drops_success_but_keeps_errors(monkeypatch):
+    monkeypatch.setattr(request_logging, "SUCCESS_SAMPLE_RATE", 0.0)
+    with patch.object(request_logging.access_logger, "info") as mock_info:
+        client.get("/items/3")
+        assert not mock_info.called
+        client.get("/broken")
+    assert logged_fields(mock_info)["status"] == 404
+
+
+def test_level_sampling_never_drops_access_errors(monkeypatch):
+    sampler = next(f for f in log_module._queue_handler.filters if isinstance(f, LevelSamplingFilter))
+    monkeypatch.setattr(sampler, "rates", {logging.INFO: 0.0})
+    written = []
+    for handler in request_logging.access_logger.handlers:
+        if isinstance(handler, log_module.DeferredQueueHandler):
+            monkeypatch.setattr(handler, "enqueue", written.append)
+    client.get("/failing")
+    assert [record.fields["status"] for record in written] == [500]
+
+
+def test_db_timing_survives_failing_statements():
+    engine = create_engine("sqlite://")
+    request_logging.install_db_timing(engine)
+    context = RequestLogContext("db-timing")
+    token = request_context_var.set(context)
+    try:
+        with engine.connect() as conn:
+            try:
+                conn.execute(text("SELECT * FROM missing_table"))
+            except Exception:
+                conn.rollback()
+            conn.execute(text("SELECT 1"))
+    finally:
+        request_context_var.reset(token)
+        engine.dispose()
+    assert context.db_queries == 1 and context.db_time_ms >= 0
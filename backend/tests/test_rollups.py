@@ -0,0 +1,64 @@
+# Client Statistics Rollups Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from datetime import date
+
+from api.v1.database import models
+from api.v1.utils.rollups import ROLLUPS
+
+
+@pytest.fixture
+def env(api_env):
+    entities = [
+        models.Client(id=1, username="internal", email="c1@example.com", hashed_password="x", accesstype="admin"),
+        models.Client(id=10, username="client10", email="c10@example.com", hashed_password="x", accesstype="client"),
+        models.Client(id=11, username="client11", email="c11@example.com", hashed_password="x", accesstype="client",
+                      is_active=False),
+        models.Brand(id=1, brandname="Burger King", gstin="22ABCDE1234F1Z5", legal_name_of_business="BK",
+                     date_of_registration=date(2024, 1, 1), gstdoc={}, client_id=10),
+        models.Service(id=1, servicename="delivery", servicevariant="std"),
+        models.User(id=1, username="Asha", usernumber="9000000001", useremail="asha@example.com", client_id=10),
+    ] + [
+        models.Outlet(id=i, aggregator="Swiggy", resid=str(1000 + i), subzone=f"Zone{i}", resshortcode=f"BK - Zone{i}",
+                      city="Pune", outletnumber="", is_active=True, client_id=10, brand_id=1)
+        for i in range(1, 4)
+    ]
+    api = api_env(entities, [models.OutletService(outlet_id=i, service_id=1, client_id=10) for i in range(1, 4)],
+                  client_id=1)
+    ROLLUPS.invalidate()
+    return api
+
+
+def test_overview_is_one_query_and_cached_until_clients_change(env):
+    client, Session, statements = env.client, env.Session, env.statements
+    expected = {"total_clients": 3, "active_clients": 2, "inactive_clients": 1,
+                "clients_by_access_type": {"admin": 1, "client": 2}}
+    assert client.get("/api/v1/clients/stats/overview").json() == expected
+    assert len([statement for statement in statements if "FROM clients" in statement]) == 1
+
+    statements.clear()
+    assert client.get("/api/v1/clients/stats/overview").json() == expected
+    assert not [statement for statement in statements if "FROM clients" in statement]
+
+    session = Session()
+    session.get(models.Client, 11).is_active = True
+    session.commit()
+    session.close()
+    assert client.get("/api/v1/clients/stats/overview").json()["active_clients"] == 3
+
+
+def test_counts_per_client_in_one_query(env):
+    client, statements = env.client, env.statements
+    counts = client.get("/api/v1/clients/stats/counts").json()
+    assert counts == [{"client_id": 10, "brands": 1, "outlets": 3, "users": 1,
+                       "outlet_services": 3, "user_services": 0, "user_outlets": 0}]
+    assert len([statement for statement in statements if "UNION ALL" in statement]) == 1
+
+
+def test_clients_only_see_their_own_counts(env):
+    env.login(11)
+    counts = env.client.get("/api/v1/clients/stats/counts", params={"client_id": 10}).json()
+    assert counts == [{"client_id": 11, "brands": 0, "outlets": 0, "users": 0,
+                       "outlet_services": 0, "user_services": 0, "user_outlets": 0}]
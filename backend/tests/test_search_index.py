@@ -0,0 +1,132 @@
+# Search Index Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.utils.search_index import OUTLET_SEARCH, NgramIndex, load_ranked
+
+
+def outlet(i, city, subzone, client_id=1, is_active=True):
+    return models.Outlet(id=i, aggregator="Swiggy", resid=str(5000 + i), subzone=subzone,
+                         resshortcode=f"BK - {subzone}", city=city, outletnumber=str(i),
+                         is_active=is_active, client_id=client_id, brand_id=1)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        outlet(1, "Mumbai", "Andheri"),
+        outlet(2, "Pune", "Baner"),
+        outlet(3, "Mumbai", "Bandra", is_active=False),
+        outlet(4, "Delhi", "Saket", client_id=2),
+    ])
+    session.commit()
+    OUTLET_SEARCH.invalidate()
+    yield session
+    session.close()
+    engine.dispose()
+    OUTLET_SEARCH.invalidate()
+
+
+# ============ RANKING ===============
+def test_prefix_and_fuzzy_matches_are_ranked():
+    index = NgramIndex()
+    index.upsert(1, ["Burger King"])
+    index.upsert(2, ["Burgundy Bistro"])
+    index.upsert(3, ["Pizza Hut"])
+
+    assert [doc_id for _, doc_id in index.search("burg")] == [1, 2]
+    assert [doc_id for _, doc_id in index.search("burgr king")][0] == 1
+    assert index.search("pizaa") and index.search("pizaa")[0][1] == 3
+
+
+def test_attribute_filters_and_removal():
+    index = NgramIndex()
+    index.upsert(1, ["Andheri"], {"is_active": True})
+    index.upsert(2, ["Andheri West"], {"is_active": False})
+
+    assert [doc_id for _, doc_id in index.search("andheri", {"is_active": False})] == [2]
+    index.remove(2)
+    assert [doc_id for _, doc_id in index.search("andheri")] == [1]
+    assert index.search("") == []
+
+
+# ============ TENANT INDEX ===============
+def test_search_is_scoped_to_tenant_and_paginated(db):
+    ids, total = OUTLET_SEARCH.search(db, "mumbai", tenant_id=1, limit=1)
+    assert total == 2 and len(ids) == 1
+    assert OUTLET_SEARCH.search(db, "saket", tenant_id=1) == ([], 0)
+    assert OUTLET_SEARCH.search(db, "saket", tenant_id=2)[1] == 1
+    assert OUTLET_SEARCH.search(db, "mumbai", tenant_id=1, filters={"is_active": False})[0] == [3]
+    assert [row.id for row in load_ranked(db, models.Outlet, [3, 1])] == [3, 1]
+
+
+def test_committed_writes_update_loaded_index(db):
+    OUTLET_SEARCH.search(db, "baner", tenant_id=1)
+
+    db.add(outlet(5, "Nagpur", "Sitabuldi"))
+    db.get(models.Outlet, 2).subzone = "Wakad"
+    db.delete(db.get(models.Outlet, 1))
+    db.commit()
+
+    assert OUTLET_SEARCH.search(db, "sitab", tenant_id=1)[0] == [5]
+    assert OUTLET_SEARCH.search(db, "wakad", tenant_id=1)[0] == [2]
+    assert OUTLET_SEARCH.search(db, "andheri", tenant_id=1)[1] == 0
+
+
+def test_rolled_back_writes_are_not_indexed(db):
+    OUTLET_SEARCH.search(db, "baner", tenant_id=1)
+    db.add(outlet(6, "Nashik", "Gangapur"))
+    db.flush()
+    db.rollback()
+    assert OUTLET_SEARCH.search(db, "gangapur", tenant_id=1)[1] == 0
+
+
+def test_writes_committed_while_loading_are_replayed(db, monkeypatch):
+    load = OUTLET_SEARCH._load
+
+    def load_then_write(session, tenant_id):
+        index = load(session, tenant_id)
+        writer = sessionmaker(bind=db.get_bind())()
+        writer.add(outlet(7, "Thane", "Ghodbunder"))
+        writer.commit()
+        writer.close()
+        return index
+
+    monkeypatch.setattr(OUTLET_SEARCH, "_load", load_then_write)
+    assert OUTLET_SEARCH.search(db, "ghodbunder", tenant_id=1)[0] == [7]
+    monkeypatch.setattr(OUTLET_SEARCH, "_load", load)
+    assert OUTLET_SEARCH.search(db, "ghodbunder", tenant_id=1)[0] == [7]
+
+
+def test_row_moved_to_other_tenant_leaves_old_index(db):
+    OUTLET_SEARCH.search(db, "baner", tenant_id=1)
+    OUTLET_SEARCH.search(db, "baner", tenant_id=2)
+    db.get(models.Outlet, 2).client_id = 2
+    db.commit()
+
+    assert 2 not in OUTLET_SEARCH.search(db, "baner", tenant_id=1)[0]
+    assert OUTLET_SEARCH.search(db, "baner", tenant_id=2)[0] == [2]
+
+
+# ============ SCALE ===============
+def test_search_stays_fast_on_large_index():
+    index = NgramIndex()
+    cities = ["Mumbai", "Pune", "Delhi", "Bengaluru", "Chennai", "Hyderabad"]
+    for i in range(100_000):
+        index.upsert(i, [f"BK - Zone{i % 997}", cities[i % 6], str(10_000_000 + i)])
+
+    started = time.perf_counter()
+    results = index.search("10045678")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert results[0][1] == 45678
+    assert elapsed_ms < 500
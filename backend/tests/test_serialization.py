@@ -0,0 +1,39 @@
+# List Serialisation Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+from datetime import datetime
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from api.v1.database import models
+from api.v1.schemas import schemas
+from api.v1.utils.serialization import json_response
+
+
+def outlets():
+    return [
+        models.Outlet(id=i, aggregator="Swiggy", resid=str(1000 + i), subzone="Bandra", resshortcode="BK - Bandra",
+                      city="Mumbai", outletnumber=None, is_active=True, client_id=10, brand_id=1,
+                      created_at=datetime(2025, 1, 1, 10, 30), updated_at=None)
+        for i in range(1, 4)
+    ]
+
+
+def test_adapter_body_matches_the_response_model_encoding():
+    rows = outlets()
+    expected = jsonable_encoder([schemas.DisplayOutlet.model_validate(row) for row in rows])
+    body = json_response(schemas.OUTLET_LIST.validate_python(rows, from_attributes=True)).body
+    assert json.loads(body) == expected
+
+
+def test_injected_headers_are_kept():
+    response = Response()
+    response.headers["ETag"] = 'W/"abc"'
+    response.headers["X-Next-Cursor"] = "next"
+    page = {"items": schemas.OUTLET_LIST.validate_python(outlets(), from_attributes=True), "total": 3, "next_cursor": None}
+    result = json_response(page, response)
+    assert result.headers["etag"] == 'W/"abc"' and result.headers["x-next-cursor"] == "next"
+    assert result.media_type == "application/json" and json.loads(result.body)["total"] == 3
+    assert result.headers["content-length"] == str(len(result.body))
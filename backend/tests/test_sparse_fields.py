@@ -0,0 +1,82 @@
+# Sparse Fieldsets Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from datetime import date
+from itertools import permutations
+
+from api.v1.database import models
+from api.v1.schemas import schemas
+from api.v1.utils import table_query
+from api.v1.utils.table_query import SparseFields
+
+
+@pytest.fixture
+def env(api_env):
+    entities = [
+        models.Client(id=10, username="client10", email="c10@example.com", hashed_password="x", accesstype="client"),
+        models.Brand(id=1, brandname="Burger King", gstin="22ABCDE1234F1Z5", legal_name_of_business="BK",
+                     date_of_registration=date(2024, 1, 1), gstdoc={"pages": ["x" * 5000]}, client_id=10),
+        models.Service(id=1, servicename="delivery", servicevariant="std"),
+    ] + [
+        models.Outlet(id=i, aggregator="Swiggy", resid=str(1000 + i), subzone=f"Zone{i}", resshortcode=f"BK - Zone{i}",
+                      city="Mumbai" if i % 2 else "Pune", outletnumber="", is_active=True, client_id=10, brand_id=1)
+        for i in range(1, 11)
+    ]
+    api = api_env(entities, [models.OutletService(outlet_id=i, service_id=1, client_id=10) for i in range(1, 11)])
+    return api.client, api.statements
+
+
+def test_brand_dropdown_selects_only_id_and_name(env):
+    client, statements = env
+    response = client.get("/api/v1/admin/brands/", params={"fields": "id,brandname"})
+    assert response.json() == [{"id": 1, "brandname": "Burger King"}]
+    brand_query = [statement for statement in statements if "FROM brands" in statement][-1]
+    assert "gstdoc" not in brand_query and "gstin" not in brand_query
+
+
+def test_outlet_fields_follow_schema_order_and_sort_columns_are_loaded(env):
+    client, statements = env
+    response = client.get("/api/v1/admin/outlets/", params={"client_id": 10, "fields": "resshortcode,id",
+                                                             "sort": "city", "limit": 3})
+    assert list(response.json()[0].items()) == [("id", 1), ("resshortcode", "BK - Zone1")]
+    assert "x-next-cursor" in response.headers
+    page_query = [statement for statement in statements if "FROM outlets" in statement][-1]
+    assert "outlets.city" in page_query and "outlets.subzone" not in page_query
+
+    page = client.get("/api/v1/admin/outlets/", params={"client_id": 10, "fields": "id", "with_meta": "true"}).json()
+    assert page["total"] == 10 and page["items"][0] == {"id": 1}
+
+
+def test_flat_mapping_view_joins_only_requested_relationships(env):
+    client, statements = env
+    statements.clear()
+    response = client.get("/api/v1/access/outlet-service-mappings/",
+                          params={"client_id": 10, "grouped": "false", "fields": "id,service"})
+    assert response.json()[0] == {"id": 1, "service": response.json()[0]["service"]}
+    assert response.json()[0]["service"]["servicename"] == "delivery"
+    assert len(statements) == 1 and "JOIN services" in statements[0] and "outlets" not in statements[0]
+
+
+def test_grouped_views_keep_requested_keys(env):
+    client, _ = env
+    rows = client.get("/api/v1/access/outlet-service-mappings/",
+                      params={"client_id": 10, "fields": "mapping_id,resshortcode", "limit": 2}).json()
+    assert rows == [{"mapping_id": 1, "resshortcode": "BK - Zone1"}, {"mapping_id": 2, "resshortcode": "BK - Zone2"}]
+
+
+def test_unknown_fields_are_rejected(env):
+    client, _ = env
+    response = client.get("/api/v1/admin/outlets/", params={"client_id": 10, "fields": "id,hashed_password"})
+    assert response.status_code == 400 and "hashed_password" in response.json()["detail"]
+
+
+def test_field_permutations_share_one_bounded_adapter_cache(monkeypatch):
+    monkeypatch.setattr(table_query, "SPARSE_FIELDS_CACHE_SIZE", 2)
+    fields = SparseFields(schemas.DisplayOutlet, models.Outlet)
+    adapters = {fields.adapter(fields.parse(",".join(order))) for order in permutations(["city", "id", "resid"])}
+    assert len(adapters) == 1
+    for names in ("id", "city", "resid", "city,id"):
+        fields.adapter(fields.parse(names))
+    assert len(fields._adapters) == 2
@@ -0,0 +1,71 @@
+# Table Query Helpers Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.utils.table_query import FilterSet, count_rows, csv_ints, facet_counts, parse_sort, search_clause
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        models.Outlet(id=i, aggregator="Swiggy", resid=str(100 + i), subzone="Zone", resshortcode="BK - Zone",
+                      city=["Mumbai", "Pune", "Delhi"][i % 3], outletnumber=str(i), is_active=bool(i % 2),
+                      client_id=1, brand_id=1)
+        for i in range(1, 10)
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_parse_sort_directions_and_whitelist():
+    keys = parse_sort("city,-resid", {"city": models.Outlet.city, "resid": models.Outlet.resid})
+    assert keys == [(models.Outlet.city, False), (models.Outlet.resid, True)]
+    with pytest.raises(HTTPException) as exc:
+        parse_sort("hashed_password", {"city": models.Outlet.city})
+    assert exc.value.status_code == 400
+
+
+def test_csv_ints_rejects_non_numeric():
+    assert csv_ints("1, 2,", "brand") == [1, 2]
+    with pytest.raises(HTTPException):
+        csv_ints("1,two", "brand")
+
+
+def test_facets_leave_out_their_own_filter(db):
+    filters = FilterSet()
+    filters.add_in("city", models.Outlet.city, ["Pune"])
+    filters.add("is_active", models.Outlet.is_active == True)
+
+    assert count_rows(filters.apply(db.query(models.Outlet)), models.Outlet.id) == 2
+    facets = facet_counts(lambda: db.query(models.Outlet), filters,
+                          {"city": models.Outlet.city, "is_active": models.Outlet.is_active}, models.Outlet.id)
+    # city counts ignore the city filter but respect is_active, and vice versa
+    assert facets["city"] == {"Mumbai": 2, "Pune": 2, "Delhi": 1}
+    assert facets["is_active"] == {"False": 1, "True": 2}
+
+
+def test_search_wildcards_match_literally(db):
+    db.add(models.Outlet(id=10, aggregator="Swiggy", resid="110", subzone="Zone", resshortcode="BK - Zone",
+                         city="100%_Pune", outletnumber="10", is_active=True, client_id=1, brand_id=1))
+    db.commit()
+
+    def matches(term):
+        query = db.query(models.Outlet.id).filter(search_clause(term, [models.Outlet.city]))
+        return sorted(row.id for row in query)
+
+    assert matches("%") == [10]
+    assert matches("0%_p") == [10]
+    assert matches("_") == [10]
+    assert matches("pune") == [1, 4, 7, 10]
@@ -0,0 +1,56 @@
+# User Batch Create Test
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from api.v1.database import models
+from api.v1.database.database import Base
+from api.v1.schemas import schemas
+from api.v1.utils.outlet_bulk import SKIP_DUPLICATES
+from api.v1.utils.user_bulk import create_user_batch
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        models.Client(id=10, username="client10", email="c10@example.com", hashed_password="x", accesstype="client"),
+        models.User(id=1, username="Existing", usernumber="9000000001", useremail="taken@example.com", client_id=10),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def user(number: int, email: str = None, clientid: int = 10) -> schemas.UserCreate:
+    return schemas.UserCreate(username=f"User {number}", usernumber=number,
+                              useremail=email or f"u{number}@example.com", clientid=clientid)
+
+
+def test_all_or_nothing_reports_and_inserts_nothing(db):
+    report, created = create_user_batch(db, [
+        user(9000000002), user(9000000003, "TAKEN@example.com"), user(9000000002), user(9000000004, clientid=99)
+    ])
+    assert not report.committed and created == []
+    assert [row.status for row in report.rows] == ["rolled_back", "duplicate", "duplicate", "error"]
+    assert db.query(models.User).count() == 1
+
+
+def test_skip_duplicates_inserts_valid_rows_in_one_statement(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    batch = [user(9100000000 + i) for i in range(100)] + [user(9000000001)]
+    report, created = create_user_batch(db, batch, SKIP_DUPLICATES)
+
+    # clients, existing numbers/emails, INSERT, read-back
+    assert len(statements) == 4
+    assert (report.created, report.failed, report.committed) == (100, 1, True)
+    assert report.rows[0].user_id == created[0].id
+    assert report.rows[-1].detail == "User is already registered"
@@ -5,6 +5,12 @@ export async function fetchOutlets(params) {
   return await get.get('/admin/outlets/', { params })
 }
 
+// Server-side page with total and facet counts:
+// { page, limit, sort, search, city, subzone, aggregator, brand, status }
+export async function fetchOutletPage(params) {
+  return await get.get('/admin/outlets/', { params: { ...params, with_meta: true } })
+}
+
 export async function updateOutlet({ outlet_id, payload }) {
   return await get.put(`/admin/outlets/${outlet_id}`, payload);
 }
@@ -19,4 +19,13 @@ export async function mapUserToOutlet(payload) {
 
 export async function unmapUserFromOutlet(mapping_id) {
   return get.delete(`/access/user-outlet-mappings/${mapping_id}`)
+}
+
+// Replaces a user's outlets with exactly `ids` in one request; returns { added, removed, unchanged }
+export async function setUserOutlets(user_id, ids, dry_run = false) {
+  return get.put(`/access/users/${user_id}/outlets`, { ids, dry_run })
+}
+
+export async function setOutletUsers(outlet_id, ids, dry_run = false) {
+  return get.put(`/access/outlets/${outlet_id}/users`, { ids, dry_run })
 }
\ No newline at end of file
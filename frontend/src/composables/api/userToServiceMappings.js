@@ -15,3 +15,8 @@ export async function mapUserToService(payload) {
 export async function unmapUserFromService(mapping_id) {
   return get.delete(`/access/user-service-mappings/${mapping_id}`)
 }
+
+// Replaces a user's services with exactly `ids` in one request; returns { added, removed, unchanged }
+export async function setUserServices(user_id, ids, dry_run = false) {
+  return get.put(`/access/users/${user_id}/services`, { ids, dry_run })
+}
\ No newline at end of file